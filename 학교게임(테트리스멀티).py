@@ -5,10 +5,24 @@ import json
 import os
 import math
 import socket
+import errno
 import threading
 import pickle
+import selectors
+import struct
+import time
+import zlib
+import heapq
+from array import array
+from bisect import bisect
+from collections import OrderedDict, deque
+from enum import IntEnum
 from datetime import datetime
 
+# 개발용 명령(--net-test 등)은 창 없이 실행
+if len(sys.argv) > 1 and sys.argv[1].startswith('--'):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
 pygame.init()
 
 # ==================== 디버그 로그 시스템 ====================
@@ -75,6 +89,7 @@ COLORS = {
 
 # 게임 상태
 MENU, GAME_2048, GAME_BREAKOUT, GAME_TYPING, GAME_TETRIS, GAME_BLOCKBLAST, LEADERBOARD = "menu", "2048", "breakout", "typing", "tetris", "blockblast", "leaderboard"
+GAME_TETRIS_MULTI = "tetris_multi"
 
 # 관리자 모드 전역 변수
 ADMIN_MODE = False
@@ -83,43 +98,66 @@ ADMIN_MODE = False
 CURRENT_STUDENT_ID = None
 
 # ==================== 파티클 효과 시스템 ====================
-class EffectParticle:
-    """개별 파티클 클래스 (효과용)"""
-    def __init__(self, x, y, vx, vy, color, size, lifetime):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-        self.color = color
-        self.size = size
-        self.lifetime = lifetime
-        self.age = 0
-
-    def update(self):
-        """파티클 업데이트"""
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.3  # 중력 효과
-        self.age += 1
-        return self.age < self.lifetime
-
-    def draw(self, surface):
-        """파티클 그리기"""
-        alpha = int(255 * (1 - self.age / self.lifetime))
-        color = (*self.color[:3], alpha)
-        size = int(self.size * (1 - self.age / self.lifetime))
-        if size > 0:
-            surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(surf, color, (size, size), size)
-            surface.blit(surf, (int(self.x - size), int(self.y - size)))
-
 class ParticleSystem:
-    """파티클 시스템 관리"""
-    def __init__(self):
-        self.particles = []
+    """파티클 시스템 (구조체 배열): 파티클마다 객체를 만들지 않고 속성별 배열의 같은 칸에 담음
+
+    CAPACITY칸씩 미리 잡아 둔 array에 출발 위치, 속도, 태어난/사라질 스텝, 크기, 색(0xRRGGBB)을 둔다.
+    중력이 일정하므로 위치는 나이(t)로 바로 계산한다: x = x0 + vx*t, y = y0 + vy*t + g*t*(t-1)/2
+    (스텝마다 vy += g 하던 것과 같은 값). 그래서 update()는 스텝 수를 늘리고 수명이 다한 칸을
+    마지막 칸과 바꿔 지우기만 한다. 꽉 차면 가장 오래된 파티클부터 밀어낸다.
+    """
+    CAPACITY = 1500
+    GRAVITY = 0.3
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.count = 0    # 살아 있는 파티클 수 (0 ~ count-1 칸)
+        self.now = 0      # 지금까지 진행한 스텝 수
+        self.evicted = 0  # 꽉 차서 밀려난 수
+        self.x0 = array('d', [0.0]) * capacity
+        self.y0 = array('d', [0.0]) * capacity
+        self.vx = array('d', [0.0]) * capacity
+        self.vy = array('d', [0.0]) * capacity
+        self.size = array('d', [0.0]) * capacity
+        self.birth = array('q', [0]) * capacity
+        self.death = array('q', [0]) * capacity
+        self.color = array('L', [0]) * capacity
+        self.columns = (self.x0, self.y0, self.vx, self.vy, self.size, self.birth, self.death, self.color)
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, count):
+        """count개 넣을 자리 만들기 (모자라면 가장 오래된 것부터 지움)"""
+        overflow = min(self.count, self.count + count - self.capacity)
+        if overflow > 0:
+            oldest = heapq.nsmallest(overflow, range(self.count), key=self.birth.__getitem__)
+            for i in sorted(oldest, reverse=True):
+                self._remove(i)
+            self.evicted += overflow
+
+    def _put(self, x, y, vx, vy, color, size, lifetime):
+        """파티클 하나 추가 (_reserve로 자리를 만든 뒤)"""
+        if self.count == self.capacity:
+            return  # 한 번에 CAPACITY보다 많이 만들면 나머지는 버림
+        i = self.count
+        self.x0[i], self.y0[i], self.vx[i], self.vy[i] = x, y, vx, vy
+        self.size[i] = size
+        self.birth[i], self.death[i] = self.now, self.now + lifetime
+        self.color[i] = color[0] << 16 | color[1] << 8 | color[2]
+        self.count = i + 1
+
+    def _remove(self, i):
+        """i칸을 마지막 칸으로 덮어서 지움 (순서는 바뀜)"""
+        last = self.count - 1
+        if i != last:
+            for column in self.columns:
+                column[i] = column[last]
+        self.count = last
 
     def add_explosion(self, x, y, color, count=20):
         """폭발 효과"""
+        self._reserve(count)
         for _ in range(count):
             angle = random.uniform(0, 2 * math.pi)
             speed = random.uniform(2, 8)
@@ -127,11 +165,12 @@ class ParticleSystem:
             vy = math.sin(angle) * speed
             size = random.uniform(3, 8)
             lifetime = random.randint(20, 40)
-            self.particles.append(EffectParticle(x, y, vx, vy, color, size, lifetime))
+            self._put(x, y, vx, vy, color, size, lifetime)
 
     def add_sparkle(self, x, y, count=10):
         """반짝임 효과"""
         colors = [(255, 255, 0), (255, 215, 0), (255, 255, 255)]
+        self._reserve(count)
         for _ in range(count):
             angle = random.uniform(0, 2 * math.pi)
             speed = random.uniform(1, 3)
@@ -140,39 +179,67 @@ class ParticleSystem:
             size = random.uniform(2, 5)
             lifetime = random.randint(15, 30)
             color = random.choice(colors)
-            self.particles.append(EffectParticle(x, y, vx, vy, color, size, lifetime))
+            self._put(x, y, vx, vy, color, size, lifetime)
 
     def add_confetti(self, x, y, count=30):
         """색종이 효과"""
         colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0),
                   (255, 0, 255), (0, 255, 255), (255, 165, 0)]
+        self._reserve(count)
         for _ in range(count):
             vx = random.uniform(-5, 5)
             vy = random.uniform(-10, -3)
             size = random.uniform(4, 10)
             lifetime = random.randint(40, 80)
             color = random.choice(colors)
-            self.particles.append(EffectParticle(x, y, vx, vy, color, size, lifetime))
+            self._put(x, y, vx, vy, color, size, lifetime)
 
     def update(self):
-        """모든 파티클 업데이트"""
-        self.particles = [p for p in self.particles if p.update()]
+        """한 스텝 진행 (수명이 다한 파티클 제거)"""
+        self.now += 1
+        now, death = self.now, self.death
+        i = 0
+        while i < self.count:
+            if death[i] <= now:
+                self._remove(i)  # 마지막 칸이 i로 왔으니 i는 다시 확인
+            else:
+                i += 1
 
     def draw(self, surface):
-        """모든 파티클 그리기"""
-        for p in self.particles:
-            p.draw(surface)
+        """모든 파티클 그리기 (나이에 따라 작아지고 투명해짐, StampCache 도장을 한꺼번에 blit)"""
+        now, gravity = self.now, self.GRAVITY
+        x0, y0, vx, vy, sizes, birth, death, colors = self.columns
+        stamps = []
+        for i in range(self.count):
+            t = now - birth[i]
+            fade = 1 - t / (death[i] - birth[i])
+            size = int(sizes[i] * fade)
+            if size > 0:
+                c = colors[i]
+                x = x0[i] + vx[i] * t
+                y = y0[i] + vy[i] * t + gravity * t * (t - 1) / 2
+                stamp = StampCache.get(size, (c >> 16, c >> 8 & 0xFF, c & 0xFF), int(255 * fade))
+                stamps.append((stamp, (int(x - size), int(y - size))))
+        StampCache.blit_all(surface, stamps)
 
     def clear(self):
         """모든 파티클 제거"""
-        self.particles.clear()
+        self.count = 0
 
 # 전역 파티클 시스템
 PARTICLE_SYSTEM = ParticleSystem()
 
 # ==================== 떠오르는 텍스트 시스템 ====================
 class FloatingText:
-    """떠오르는 점수 텍스트"""
+    """떠오르는 점수 텍스트
+
+    글자는 만들 때 한 번만 래스터화(TextCache)하고, 나이마다 쓸 확대본(처음 1.3배 → 1배)을
+    미리 만들어 둔다(scale_chain). 같은 크기가 되는 나이끼리는 확대본 하나를 같이 쓰고,
+    같은 글자/색/크기의 텍스트끼리도 같이 쓴다. 투명도는 그릴 때 set_alpha로만 바꾼다.
+    """
+    MAX_CHAINS = 32
+    scale_chains = OrderedDict()
+
     def __init__(self, x, y, text, color, size='medium'):
         self.x = x
         self.y = y
@@ -182,6 +249,31 @@ class FloatingText:
         self.age = 0
         self.size = size
         self.vy = -2  # 위로 떠오르는 속도
+        self.frames = self.scale_chain(text, color, size, self.lifetime)
+
+    @classmethod
+    def scale_chain(cls, text, color, size, lifetime):
+        """나이(0 ~ lifetime-1)별 확대된 글자 Surface 목록 (최근에 쓴 MAX_CHAINS개만 보관)"""
+        key = (text, color, size, lifetime)
+        chain = cls.scale_chains.get(key)
+        if chain is not None:
+            cls.scale_chains.move_to_end(key)
+            return chain
+
+        base = TextCache.render(size, text, color)
+        width, height = base.get_size()
+        scaled = {}
+        chain = []
+        for age in range(lifetime):
+            scale = 1.0 + (1 - age / lifetime) * 0.3
+            dims = (int(width * scale), int(height * scale))
+            if dims not in scaled:
+                scaled[dims] = pygame.transform.scale(base, dims)
+            chain.append(scaled[dims])
+        cls.scale_chains[key] = chain
+        while len(cls.scale_chains) > cls.MAX_CHAINS:
+            cls.scale_chains.popitem(last=False)
+        return chain
 
     def update(self):
         self.y += self.vy
@@ -191,16 +283,10 @@ class FloatingText:
     def draw(self, surface):
         alpha = int(255 * (1 - self.age / self.lifetime))
         if alpha > 0:
-            font = FONTS[self.size]
-            text_surf = font.render(self.text, True, self.color)
-            # 알파 적용
+            # 크기 애니메이션 (처음에 크게 나타났다가 작아짐): 미리 만든 확대본 사용
+            text_surf = self.frames[self.age]
+            # 알파 적용 (확대본은 다른 텍스트와 공유하므로 그리기 직전에 설정)
             text_surf.set_alpha(alpha)
-            # 크기 애니메이션 (처음에 크게 나타났다가 작아짐)
-            scale = 1.0 + (1 - self.age / self.lifetime) * 0.3
-            if scale != 1.0:
-                new_width = int(text_surf.get_width() * scale)
-                new_height = int(text_surf.get_height() * scale)
-                text_surf = pygame.transform.scale(text_surf, (new_width, new_height))
             surface.blit(text_surf, (int(self.x - text_surf.get_width() // 2), int(self.y)))
 
 class FloatingTextSystem:
@@ -247,11 +333,11 @@ class StudentIDInput:
         WINDOW.fill(COLORS['bg'])
 
         # 제목
-        title = FONTS['huge'].render("학번 입력", True, COLORS['font'])
+        title = TextCache.render('huge', "학번 입력", COLORS['font'])
         WINDOW.blit(title, (WIDTH//2 - title.get_width()//2, 150))
 
         # 설명
-        desc = FONTS['small'].render("게임 시작 전 학번을 입력해주세요", True, COLORS['font'])
+        desc = TextCache.render('small', "게임 시작 전 학번을 입력해주세요", COLORS['font'])
         WINDOW.blit(desc, (WIDTH//2 - desc.get_width()//2, 220))
 
         # 입력 박스
@@ -262,14 +348,14 @@ class StudentIDInput:
 
         # 입력된 학번 표시
         if self.student_id:
-            id_text = FONTS['large'].render(self.student_id, True, COLORS['font'])
+            id_text = TextCache.render('large', self.student_id, COLORS['font'])
         else:
-            id_text = FONTS['medium'].render("학번 입력...", True, (150, 150, 150))
+            id_text = TextCache.render('medium', "학번 입력...", (150, 150, 150))
         WINDOW.blit(id_text, (WIDTH//2 - id_text.get_width()//2, 320))
 
         # 에러 메시지
         if self.error_msg:
-            error_surf = FONTS['small'].render(self.error_msg, True, COLORS['red'])
+            error_surf = TextCache.render('small', self.error_msg, COLORS['red'])
             WINDOW.blit(error_surf, (WIDTH//2 - error_surf.get_width()//2, 400))
 
         # 안내 문구
@@ -278,12 +364,12 @@ class StudentIDInput:
             "ENTER: 확인 | ESC: 취소"
         ]
         for i, text in enumerate(help_texts):
-            surf = FONTS['small'].render(text, True, (100, 100, 100))
+            surf = TextCache.render('small', text, (100, 100, 100))
             WINDOW.blit(surf, (WIDTH//2 - surf.get_width()//2, 450 + i * 30))
 
         # 경고문
         warning_text = "부적절한 학번 입력 시 기록이 삭제될 수 있습니다"
-        warning_surf = FONTS['small'].render(warning_text, True, (200, 50, 50))
+        warning_surf = TextCache.render('small', warning_text, (200, 50, 50))
         WINDOW.blit(warning_surf, (WIDTH//2 - warning_surf.get_width()//2, 520))
 
         pygame.display.update()
@@ -374,6 +460,8 @@ PasswordManager.initialize()
 # ==================== 2048 설정 ====================
 GRID_SIZE = 4
 TILE_SIZE = GAME_WIDTH // GRID_SIZE
+AUTOPLAY_MOVE_MS = 150  # 자동 플레이 한 수 간격
+HINT_ARROWS = {'left': '왼쪽', 'right': '오른쪽', 'up': '위', 'down': '아래'}
 
 TILE_COLORS = {
     0: (205, 193, 180), 2: (237, 229, 218), 4: (238, 225, 201),
@@ -388,6 +476,7 @@ TETRIS_GRID_HEIGHT = 20
 TETRIS_BLOCK_SIZE = 35
 TETRIS_OFFSET_X = (GAME_WIDTH - TETRIS_GRID_WIDTH * TETRIS_BLOCK_SIZE) // 2
 TETRIS_OFFSET_Y = 20
+TETRIS_FULL_MASK = (1 << TETRIS_GRID_WIDTH) - 1  # 비트보드에서 꽉 찬 줄
 
 # 테트리스 블록 모양
 TETRIS_SHAPES = {
@@ -411,11 +500,48 @@ TETRIS_COLORS = {
     'L': COLORS['orange']  # 주황색
 }
 
+# 쓰레기 줄 (멀티플레이 공격)
+TETRIS_GARBAGE_COLOR = (110, 110, 110)
+TETRIS_GARBAGE_CAP = 8  # 블록 하나 고정할 때 들어오는 최대 쓰레기 줄 수
+
+# 테트리스 입력 비트 (한 틱의 입력을 1바이트로 표현, 락스텝 입력 로그용)
+TETRIS_INPUT_LEFT = 1        # 누르고 있는 키
+TETRIS_INPUT_RIGHT = 2
+TETRIS_INPUT_DOWN = 4
+TETRIS_INPUT_HARD_DROP = 8   # 이번 틱에 누른 키
+TETRIS_INPUT_ROTATE_CW = 16
+TETRIS_INPUT_ROTATE_CCW = 32
+TETRIS_INPUT_ROTATE_180 = 64
+TETRIS_INPUT_HOLD = 128
+TETRIS_HELD_MASK = TETRIS_INPUT_LEFT | TETRIS_INPUT_RIGHT | TETRIS_INPUT_DOWN
+# 한 틱에 여러 키를 눌렀을 때 적용 순서
+TETRIS_ACTION_ORDER = [TETRIS_INPUT_HOLD, TETRIS_INPUT_ROTATE_CW, TETRIS_INPUT_ROTATE_CCW,
+                       TETRIS_INPUT_ROTATE_180, TETRIS_INPUT_HARD_DROP]
+
+TETRIS_ACTION_KEYS = {
+    # 하드 드롭 (SPACE, NUMPAD8)
+    pygame.K_SPACE: TETRIS_INPUT_HARD_DROP, pygame.K_KP8: TETRIS_INPUT_HARD_DROP,
+    # 시계방향 회전 (UP, X, NUMPAD1, NUMPAD5, NUMPAD9)
+    pygame.K_UP: TETRIS_INPUT_ROTATE_CW, pygame.K_x: TETRIS_INPUT_ROTATE_CW,
+    pygame.K_KP1: TETRIS_INPUT_ROTATE_CW, pygame.K_KP5: TETRIS_INPUT_ROTATE_CW,
+    pygame.K_KP9: TETRIS_INPUT_ROTATE_CW,
+    # 반시계방향 회전 (CTRL, Z, NUMPAD3, NUMPAD7)
+    pygame.K_LCTRL: TETRIS_INPUT_ROTATE_CCW, pygame.K_RCTRL: TETRIS_INPUT_ROTATE_CCW,
+    pygame.K_z: TETRIS_INPUT_ROTATE_CCW, pygame.K_KP3: TETRIS_INPUT_ROTATE_CCW,
+    pygame.K_KP7: TETRIS_INPUT_ROTATE_CCW,
+    # 180도 회전 (A)
+    pygame.K_a: TETRIS_INPUT_ROTATE_180,
+    # 홀드 (SHIFT, C, NUMPAD0)
+    pygame.K_LSHIFT: TETRIS_INPUT_HOLD, pygame.K_RSHIFT: TETRIS_INPUT_HOLD,
+    pygame.K_c: TETRIS_INPUT_HOLD, pygame.K_KP0: TETRIS_INPUT_HOLD,
+}
+
 # ==================== 블록블라스트 설정 ====================
 BLOCKBLAST_GRID_SIZE = 8
 BLOCKBLAST_CELL_SIZE = 60
 BLOCKBLAST_OFFSET_X = (GAME_WIDTH - BLOCKBLAST_GRID_SIZE * BLOCKBLAST_CELL_SIZE) // 2
 BLOCKBLAST_OFFSET_Y = 30
+BLOCKBLAST_IDLE_REDRAW_MS = 100  # 효과가 없을 때 배경 물결만 다시 그리는 간격
 
 # 블록블라스트 블록 모양들 (난이도별 분류)
 
@@ -498,6 +624,27 @@ BLOCKBLAST_SHAPES_HARD = [
 # 호환성을 위한 전체 블록 리스트
 BLOCKBLAST_SHAPES = BLOCKBLAST_SHAPES_EASY + BLOCKBLAST_SHAPES_NORMAL + BLOCKBLAST_SHAPES_LSHAPE + BLOCKBLAST_SHAPES_HARD
 
+def _build_blockblast_masks(shape):
+    """모양 → (칸별 비트 오프셋, 놓을 수 있는 원점 비트들, (행, 열) → 그 자리에 놓았을 때의 비트)
+
+    보드의 (r, c) 칸은 r * BLOCKBLAST_GRID_SIZE + c번 비트. 모양은 위/왼쪽 빈 줄 없이 주어진다고 가정.
+    """
+    size = BLOCKBLAST_GRID_SIZE
+    cells = [(r, c) for r, row in enumerate(shape) for c, cell in enumerate(row) if cell]
+    height = max(r for r, _ in cells) + 1
+    width = max(c for _, c in cells) + 1
+    deltas = tuple(r * size + c for r, c in cells)
+    piece_mask = sum(1 << d for d in deltas)
+    origins = 0
+    masks = {}
+    for r in range(size - height + 1):
+        for c in range(size - width + 1):
+            origins |= 1 << (r * size + c)
+            masks[(r, c)] = piece_mask << (r * size + c)
+    return deltas, origins, masks
+
+BLOCKBLAST_PLACEMENTS = {tuple(map(tuple, shape)): _build_blockblast_masks(shape) for shape in BLOCKBLAST_SHAPES}
+
 # 블록 출현 가중치 (높을수록 자주 출현)
 BLOCKBLAST_WEIGHTS = {
     'easy': 5,      # 쉬운 블록 (5배 확률)
@@ -505,6 +652,21 @@ BLOCKBLAST_WEIGHTS = {
     'lshape': 1,    # 니은자/L자형 (1배 확률 - 낮음)
     'hard': 1       # 매우 어려운 블록 (1배 확률 - 낮음)
 }
+BLOCKBLAST_WEIGHTS_FILE = "blockblast_weights.json"  # 있으면 위 가중치를 덮어씀 (예: {"hard": 2})
+
+# 점수 구간별로 나오는 블록 종류 (점수 < 상한, 마지막은 상한 없음)
+BLOCKBLAST_SHAPE_GROUPS = {
+    'easy': BLOCKBLAST_SHAPES_EASY,
+    'normal': BLOCKBLAST_SHAPES_NORMAL,
+    'lshape': BLOCKBLAST_SHAPES_LSHAPE,
+    'hard': BLOCKBLAST_SHAPES_HARD,
+}
+BLOCKBLAST_SCORE_BRACKETS = [
+    (150, ['easy']),                               # 초반: 쉬운 블록만
+    (400, ['easy', 'normal']),                     # 중반: 쉬운 블록 많이, 보통 블록 조금
+    (700, ['easy', 'normal', 'lshape', 'hard']),   # 후반: 쉬운, 보통, L자형, 어려운 블록 균형있게
+    (None, ['easy', 'normal', 'lshape', 'hard']),  # 최후반: 모든 블록 (가중치 적용)
+]
 
 # 블록블라스트 색상 (더 밝고 화려하게 개선)
 BLOCKBLAST_COLORS = [
@@ -527,6 +689,7 @@ BLOCKBLAST_GRID_COLOR = (200, 210, 220) # 부드러운 회색
 PADDLE_CONFIG = {'width': 120, 'height': 20, 'speed': 8}
 BALL_CONFIG = {'radius': 8, 'speed': 6}
 BRICK_CONFIG = {'cols': 10, 'margin': 1, 'height': 30, 'width': GAME_WIDTH // 10}
+BRICK_TOP = 50  # 첫 벽돌 줄의 y
 
 BRICK_COLORS = {1: (46, 204, 113), 2: (241, 196, 15), 3: (231, 76, 60)}
 
@@ -649,6 +812,112 @@ FONTS = init_fonts()
 WINDOW = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("게임모음집")
 
+# ==================== 글자/도장 캐시 ====================
+class TextCache:
+    """글자 Surface 캐시: (폰트, 글자, 색, 안티앨리어싱) → 그려 둔 Surface
+
+    라벨/점수/순위표처럼 거의 안 바뀌는 글자를 매 프레임 다시 래스터화하지 않는다.
+    오래 안 쓴 것부터 버리고(LRU) 픽셀 메모리 합이 MAX_BYTES를 넘지 않게 한다.
+    돌려주는 Surface는 공유되므로 set_alpha 등으로 바꾸지 말 것.
+    """
+    MAX_BYTES = 8 * 1024 * 1024
+    surfaces = OrderedDict()
+    total_bytes = 0
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @classmethod
+    def render(cls, font, text, color, antialias=True):
+        """FONTS[font].render(text, antialias, color)와 같은 결과 (캐시 사용)"""
+        key = (font, text, color, antialias)
+        surf = cls.surfaces.get(key)
+        if surf is not None:
+            cls.surfaces.move_to_end(key)
+            cls.hits += 1
+            return surf
+
+        cls.misses += 1
+        surf = FONTS[font].render(text, antialias, color)
+        cls.surfaces[key] = surf
+        cls.total_bytes += surf.get_bytesize() * surf.get_width() * surf.get_height()
+        while cls.total_bytes > cls.MAX_BYTES and len(cls.surfaces) > 1:
+            _, old = cls.surfaces.popitem(last=False)
+            cls.total_bytes -= old.get_bytesize() * old.get_width() * old.get_height()
+            cls.evictions += 1
+        return surf
+
+    @classmethod
+    def stats(cls):
+        """적중/실패 횟수와 캐시 크기"""
+        return {'hits': cls.hits, 'misses': cls.misses, 'evictions': cls.evictions,
+                'items': len(cls.surfaces), 'bytes': cls.total_bytes}
+
+    @classmethod
+    def clear(cls):
+        cls.surfaces.clear()
+        cls.total_bytes = 0
+        cls.hits = cls.misses = cls.evictions = 0
+
+class StampCache:
+    """반투명 원 도장 캐시: (반지름, 색, 알파 단계, 선 두께) → 그려 둔 SRCALPHA Surface
+
+    파티클이나 펄스처럼 같은 모양을 수백~수천 번 찍는 효과가 매번 Surface를 만들지 않고
+    미리 그린 도장을 blit만 하게 한다. 알파는 ALPHA_LEVELS단계로 묶어서 도장 수를 줄인다.
+    처음 쓸 때 그리고 오래 안 쓴 것부터 버린다(LRU). 돌려주는 Surface는 공유되므로 바꾸지 말 것.
+    """
+    MAX_BYTES = 4 * 1024 * 1024
+    ALPHA_LEVELS = 16
+    stamps = OrderedDict()
+    total_bytes = 0
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @classmethod
+    def get(cls, radius, color, alpha, width=0):
+        """반지름 radius, 색 color(RGB), 투명도 alpha(0~255)인 원 (width > 0이면 테두리만)"""
+        level = min(cls.ALPHA_LEVELS - 1, alpha * cls.ALPHA_LEVELS // 256)
+        key = (radius, color, level, width)
+        stamp = cls.stamps.get(key)
+        if stamp is not None:
+            cls.stamps.move_to_end(key)
+            cls.hits += 1
+            return stamp
+
+        cls.misses += 1
+        stamp = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        stamp_alpha = level * 255 // (cls.ALPHA_LEVELS - 1)
+        pygame.draw.circle(stamp, (*color[:3], stamp_alpha), (radius, radius), radius, width)
+        cls.stamps[key] = stamp
+        cls.total_bytes += 4 * radius * radius * 4
+        while cls.total_bytes > cls.MAX_BYTES and len(cls.stamps) > 1:
+            (old_radius, *_), _ = cls.stamps.popitem(last=False)
+            cls.total_bytes -= 4 * old_radius * old_radius * 4
+            cls.evictions += 1
+        return stamp
+
+    @classmethod
+    def stats(cls):
+        """적중/실패 횟수와 캐시 크기"""
+        return {'hits': cls.hits, 'misses': cls.misses, 'evictions': cls.evictions,
+                'items': len(cls.stamps), 'bytes': cls.total_bytes}
+
+    @classmethod
+    def clear(cls):
+        cls.stamps.clear()
+        cls.total_bytes = 0
+        cls.hits = cls.misses = cls.evictions = 0
+
+    @staticmethod
+    def blit_all(surface, stamps):
+        """[(Surface, (x, y))] 한꺼번에 그리기 (Surface.blits가 없는 pygame에서는 하나씩)"""
+        if hasattr(surface, 'blits'):
+            surface.blits(stamps, doreturn=False)
+        else:
+            for stamp, pos in stamps:
+                surface.blit(stamp, pos)
+
 # ==================== 이미지 로드 ====================
 def load_typing_images():
     """타이핑 게임용 이미지 로드"""
@@ -814,18 +1083,149 @@ class LeaderboardManager:
                 return True
         return False
 
+# ==================== 프레임 조절 ====================
+class FrameScheduler:
+    """턴제 화면(메뉴, 2048 등)용 프레임 조절기: 다시 그릴 이유가 있을 때만 그림
+
+    입력 이벤트가 왔을 때, 애니메이션 중일 때, 타이머 시각이 됐을 때만 redraw가 True가 되고
+    나머지 시간은 pygame.event.wait(timeout)으로 잠들어 CPU를 쓰지 않는다.
+    REPORT_INTERVAL초마다 그린/건너뛴 프레임 수와 CPU 사용률을 로그로 남긴다.
+    """
+    IDLE_WAIT_MS = 1000     # 할 일이 없어도 이 간격으로는 깨어남
+    REPORT_INTERVAL = 30.0
+
+    def __init__(self, name, fps=FPS):
+        self.name = name
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.redraw = True    # 이번 프레임에 다시 그려야 하는지
+        self.pending = True   # 다음 wait()에서 잠들지 않음 (첫 프레임)
+        self.dt = 0           # 지난 wait() 이후 흐른 시간 (ms)
+        self.ticks = 1        # dt를 FPS 기준 프레임 수로 (잠든 동안 밀린 애니메이션 진행용)
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+        self.last_ticks = pygame.time.get_ticks()
+        self.report_wall = time.perf_counter()
+        self.report_cpu = time.process_time()
+        self.report_drawn = self.report_skipped = 0
+
+    def request_redraw(self):
+        """이벤트 없이 화면이 바뀌었을 때 (다음 프레임을 바로 그림)"""
+        self.pending = True
+
+    def wait(self, animating=False, timeout_ms=None):
+        """다음 프레임까지 기다렸다가 그동안 온 이벤트 목록 반환
+
+        animating이면 FPS에 맞춰 바로 진행하고, 아니면 이벤트가 오거나
+        timeout_ms(다음 타이머까지 남은 시간)가 지날 때까지 잠든다.
+        """
+        timer_due = False
+        if animating or self.pending:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+        else:
+            wait_ms = self.IDLE_WAIT_MS if timeout_ms is None else min(max(1, int(timeout_ms)), self.IDLE_WAIT_MS)
+            event = pygame.event.wait(wait_ms)
+            events = [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+            self.clock.tick()  # 잠든 시간이 다음 tick()의 대기 시간에 섞이지 않도록
+            timer_due = timeout_ms is not None and not events and wait_ms == max(1, int(timeout_ms))
+
+        now = pygame.time.get_ticks()
+        self.dt = now - self.last_ticks
+        self.last_ticks = now
+        self.ticks = max(1, round(self.dt * self.fps / 1000))
+        self.redraw = animating or self.pending or timer_due or bool(events)
+        self.pending = False
+        if self.redraw:
+            self.frames_drawn += 1
+            self.frames_skipped += self.ticks - 1
+        else:
+            self.frames_skipped += self.ticks
+        if time.perf_counter() - self.report_wall >= self.REPORT_INTERVAL:
+            self.report()
+        return events
+
+    def cpu_percent(self):
+        """마지막 보고 이후 이 프로세스의 CPU 사용률 (%)"""
+        wall = time.perf_counter() - self.report_wall
+        return (time.process_time() - self.report_cpu) / wall * 100 if wall > 0 else 0.0
+
+    def report(self):
+        """그린/건너뛴 프레임 수와 CPU 사용률 로그 후 구간 초기화"""
+        debug_log('GAME', f"{self.name} 화면: 그림 {self.frames_drawn - self.report_drawn}프레임, "
+                          f"건너뜀 {self.frames_skipped - self.report_skipped}프레임, CPU {self.cpu_percent():.1f}%")
+        self.report_wall = time.perf_counter()
+        self.report_cpu = time.process_time()
+        self.report_drawn, self.report_skipped = self.frames_drawn, self.frames_skipped
+
+class FixedStepLoop(FrameScheduler):
+    """실시간 게임용 고정 간격 루프: 게임 진행은 STEP_MS 간격 스텝으로, 그리기는 프레임마다
+
+    흐른 시간을 모아 두었다가 STEP_MS마다 한 스텝씩 진행하므로 프레임이 떨어져도 게임 속도는
+    그대로다 (한 스텝 = 예전 60 FPS의 한 프레임). 한 번에 따라잡는 시간은 MAX_CATCHUP_MS까지이고
+    더 밀린 시간은 버린다. 그릴 때는 마지막 두 스텝 사이를 alpha(0~1)만큼 보간한 위치에 그린다.
+    """
+    STEP_MS = 1000 / FPS
+    MAX_CATCHUP_MS = 250
+
+    def __init__(self, name, fps=FPS):
+        super().__init__(name, fps)
+        self.accumulator = 0.0  # 아직 스텝으로 진행하지 않은 시간 (ms)
+        self.steps = 0          # 이번 프레임에 진행할 스텝 수
+        self.alpha = 0.0
+        self.dropped_ms = 0.0   # 따라잡지 못하고 버린 시간 합
+        self.drawn = []         # interpolate()로 옮겨 둔 물체와 원래 위치
+
+    def wait(self, animating=True, timeout_ms=None):
+        """FrameScheduler.wait 후 이번 프레임의 스텝 수(steps)와 보간 비율(alpha) 계산
+
+        다시 그리지 않는 프레임(잠들었다 깬 경우 등)은 시간만 모아 두고 스텝을 진행하지 않는다.
+        """
+        events = super().wait(animating, timeout_ms)
+        self.accumulator += self.dt
+        if self.accumulator > self.MAX_CATCHUP_MS:
+            self.dropped_ms += self.accumulator - self.MAX_CATCHUP_MS
+            self.accumulator = self.MAX_CATCHUP_MS
+        self.steps = int(self.accumulator // self.STEP_MS) if self.redraw else 0
+        self.accumulator -= self.steps * self.STEP_MS
+        self.alpha = min(1.0, self.accumulator / self.STEP_MS)
+        return events
+
+    @staticmethod
+    def snapshot(*groups):
+        """스텝 진행 전 위치 저장 (보간의 출발점)"""
+        for group in groups:
+            for obj in group:
+                obj.prev_x, obj.prev_y = obj.x, obj.y
+
+    def interpolate(self, *groups):
+        """그리기 전에 물체를 직전 스텝과 이번 스텝 사이(alpha) 위치로 옮김. 그린 뒤 restore()"""
+        alpha = self.alpha
+        for group in groups:
+            for obj in group:
+                x, y = obj.x, obj.y
+                self.drawn.append((obj, x, y))
+                obj.x = obj.prev_x + (x - obj.prev_x) * alpha
+                obj.y = obj.prev_y + (y - obj.prev_y) * alpha
+
+    def restore(self):
+        """interpolate()로 옮긴 물체를 실제 위치로 되돌림"""
+        for obj, x, y in self.drawn:
+            obj.x, obj.y = x, y
+        self.drawn.clear()
+
 # ==================== UI 유틸리티 ====================
 class UIDrawer:
     @staticmethod
     def button(rect, text, font='medium'):
         pygame.draw.rect(WINDOW, (237, 229, 218), rect, border_radius=10)
         pygame.draw.rect(WINDOW, COLORS['outline'], rect, 3, border_radius=10)
-        txt = FONTS[font].render(text, True, COLORS['font'])
+        txt = TextCache.render(font, text, COLORS['font'])
         WINDOW.blit(txt, txt.get_rect(center=rect.center))
     
     @staticmethod
     def text_centered(text, y, font='medium', color=None):
-        txt = FONTS[font].render(text, True, color or COLORS['font'])
+        txt = TextCache.render(font, text, color or COLORS['font'])
         WINDOW.blit(txt, (WIDTH//2 - txt.get_width()//2, y))
     
     @staticmethod
@@ -834,8 +1234,8 @@ class UIDrawer:
     
     @staticmethod
     def panel_header(label, value, y=20):
-        WINDOW.blit(FONTS['small'].render(label, True, COLORS['font']), (GAME_WIDTH + 10, y))
-        WINDOW.blit(FONTS['small'].render(str(value), True, COLORS['font']), (GAME_WIDTH + 10, y + 25))
+        WINDOW.blit(TextCache.render('small', label, COLORS['font']), (GAME_WIDTH + 10, y))
+        WINDOW.blit(TextCache.render('small', str(value), COLORS['font']), (GAME_WIDTH + 10, y + 25))
         return y + 60
     
     @staticmethod
@@ -843,7 +1243,7 @@ class UIDrawer:
         """리더보드 표시 (학번 포함)"""
         # 제목
         title = "최고 기록" if is_time or is_typing else "순위표"
-        title_surf = FONTS['medium'].render(title, True, COLORS['font'])
+        title_surf = TextCache.render('medium', title, COLORS['font'])
         WINDOW.blit(title_surf, (GAME_WIDTH + 10, y))
         y += 35
 
@@ -852,7 +1252,7 @@ class UIDrawer:
         y += 15
 
         # ESC 안내
-        esc_surf = FONTS['tiny'].render("ESC: 메뉴", True, (120, 120, 120))
+        esc_surf = TextCache.render('tiny', "ESC: 메뉴", (120, 120, 120))
         WINDOW.blit(esc_surf, (GAME_WIDTH + 10, y))
         y += 25
 
@@ -867,7 +1267,7 @@ class UIDrawer:
 
             # 순위 배지
             medal_color = medal_colors[i] if i < 3 else COLORS['font']
-            rank_surf = FONTS['medium'].render(f"{i+1}", True, medal_color)
+            rank_surf = TextCache.render('medium', f"{i+1}", medal_color)
             WINDOW.blit(rank_surf, (GAME_WIDTH + 15, y))
 
             if isinstance(s, dict):
@@ -877,22 +1277,22 @@ class UIDrawer:
                     stage = s.get('stage', 0)
                     score = s.get('score', 0)
                     # 학번
-                    id_surf = FONTS['small'].render(student_id, True, COLORS['font'])
+                    id_surf = TextCache.render('small', student_id, COLORS['font'])
                     WINDOW.blit(id_surf, (GAME_WIDTH + 50, y + 3))
                     # 상세 정보
-                    detail_surf = FONTS['tiny'].render(f"{stage}단계  {score:,}점", True, (100, 100, 100))
+                    detail_surf = TextCache.render('tiny', f"{stage}단계  {score:,}점", (100, 100, 100))
                     WINDOW.blit(detail_surf, (GAME_WIDTH + 50, y + 22))
                 else:
                     score = s.get('score', 0)
                     # 학번
-                    id_surf = FONTS['small'].render(student_id, True, COLORS['font'])
+                    id_surf = TextCache.render('small', student_id, COLORS['font'])
                     WINDOW.blit(id_surf, (GAME_WIDTH + 50, y + 3))
                     # 점수/시간
                     if is_time:
                         detail_text = f"{score}초"
                     else:
                         detail_text = f"{score:,}점" if score < 10000 else f"{score//1000}k점"
-                    detail_surf = FONTS['tiny'].render(detail_text, True, (100, 100, 100))
+                    detail_surf = TextCache.render('tiny', detail_text, (100, 100, 100))
                     WINDOW.blit(detail_surf, (GAME_WIDTH + 50, y + 22))
             else:
                 # 하위 호환성
@@ -900,7 +1300,7 @@ class UIDrawer:
                     txt = f"{s}초"
                 else:
                     txt = f"{s:,}점" if s < 10000 else f"{s//1000}k점"
-                score_surf = FONTS['small'].render(txt, True, COLORS['font'])
+                score_surf = TextCache.render('small', txt, COLORS['font'])
                 WINDOW.blit(score_surf, (GAME_WIDTH + 50, y + 8))
 
             y += 50
@@ -913,7 +1313,7 @@ class UIDrawer:
         overlay.fill((255, 100, 100))
         WINDOW.blit(overlay, (WIDTH - 260, 10))
         
-        txt = FONTS['small'].render("관리자 모드 ON", True, COLORS['white'])
+        txt = TextCache.render('small', "관리자 모드 ON", COLORS['white'])
         WINDOW.blit(txt, (WIDTH - 250, 15))
     
     @staticmethod
@@ -934,7 +1334,7 @@ class UIDrawer:
             ("ESC: 취소, ENTER: 확인", 'tiny')
         ]
         for i, (text, font) in enumerate(texts):
-            surf = FONTS[font].render(text, True, COLORS['font'])
+            surf = TextCache.render(font, text, COLORS['font'])
             WINDOW.blit(surf, (WIDTH//2 - surf.get_width()//2, HEIGHT//2 - 40 + i * 30))
     
     @staticmethod
@@ -954,7 +1354,7 @@ class UIDrawer:
             ("ESC: 취소, ENTER: 확인", 'tiny')
         ]
         for i, (text, font) in enumerate(texts):
-            surf = FONTS[font].render(text, True, COLORS['font'])
+            surf = TextCache.render(font, text, COLORS['font'])
             WINDOW.blit(surf, (WIDTH//2 - surf.get_width()//2, HEIGHT//2 - 40 + i * 30))
     
     @staticmethod
@@ -974,46 +1374,47 @@ def run_menu():
     global ADMIN_MODE, CURRENT_STUDENT_ID
     entering_admin_pw = False
     admin_pw_input = ""
-    clock = pygame.time.Clock()
+    frames = FrameScheduler("메뉴")
 
-    while True:
-        clock.tick(FPS)
+    games = [
+        (GAME_2048, "1. 2048 게임", pygame.K_1),
+        (GAME_BREAKOUT, "2. 블록깨기", pygame.K_2),
+        (GAME_TYPING, "3. 케이크던지기", pygame.K_3),
+        (GAME_TETRIS, "4. 테트리스", pygame.K_4),
+        (GAME_BLOCKBLAST, "5. 블록블라스트", pygame.K_5),
+        (LEADERBOARD, "6. 리더보드", pygame.K_6),
+        (GAME_TETRIS_MULTI, "7. 테트리스 멀티", pygame.K_7)
+    ]
 
-        # 배경
-        WINDOW.fill(COLORS['bg'])
+    buttons = [pygame.Rect(WIDTH//2 - 200, 110 + i * 70, 400, 60) for i in range(len(games))]
 
-        # 제목
-        UIDrawer.text_centered("게임 선택", 40, 'large')
-
-        games = [
-            (GAME_2048, "1. 2048 게임", pygame.K_1),
-            (GAME_BREAKOUT, "2. 블록깨기", pygame.K_2),
-            (GAME_TYPING, "3. 케이크던지기", pygame.K_3),
-            (GAME_TETRIS, "4. 테트리스", pygame.K_4),
-            (GAME_BLOCKBLAST, "5. 블록블라스트", pygame.K_5),
-            (LEADERBOARD, "6. 리더보드", pygame.K_6)
-        ]
+    while True:
+        # 입력이 있을 때만 다시 그림
+        if frames.redraw:
+            # 배경
+            WINDOW.fill(COLORS['bg'])
 
-        buttons = [pygame.Rect(WIDTH//2 - 200, 110 + i * 70, 400, 60) for i in range(len(games))]
+            # 제목
+            UIDrawer.text_centered("게임 선택", 40, 'large')
 
-        # 버튼 그리기
-        for btn, (_, name, _) in zip(buttons, games):
-            UIDrawer.button(btn, name)
+            # 버튼 그리기
+            for btn, (_, name, _) in zip(buttons, games):
+                UIDrawer.button(btn, name)
 
-        # 안내 문구
-        UIDrawer.text_centered("클릭하거나 숫자키를 눌러 선택하세요", 660, 'small')
+            # 안내 문구
+            UIDrawer.text_centered("클릭하거나 숫자키를 눌러 선택하세요", 660, 'small')
 
-        # 관리자 모드
-        if ADMIN_MODE:
-            UIDrawer.admin_mode_overlay()
+            # 관리자 모드
+            if ADMIN_MODE:
+                UIDrawer.admin_mode_overlay()
 
-        # 비밀번호 입력
-        if entering_admin_pw:
-            UIDrawer.admin_password_overlay(admin_pw_input)
+            # 비밀번호 입력
+            if entering_admin_pw:
+                UIDrawer.admin_password_overlay(admin_pw_input)
 
-        pygame.display.update()
+            pygame.display.update()
 
-        for event in pygame.event.get():
+        for event in frames.wait():
             if event.type == pygame.QUIT:
                 return None
 
@@ -1075,8 +1476,24 @@ def run_menu():
 
 # ==================== 리더보드 화면 ====================
 def run_leaderboard():
-    """전체 리더보드 화면"""
+    """전체 리더보드 화면 (입력이 있을 때만 다시 그림)"""
+    frames = FrameScheduler("리더보드")
     while True:
+        for event in frames.wait():
+            if event.type == pygame.QUIT:
+                return None
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return MENU
+                elif event.key == pygame.K_F10 and ADMIN_MODE:
+                    # 편집 모드 진입
+                    PARTICLE_SYSTEM.add_confetti(WIDTH//2, HEIGHT//2, 50)
+                    result = run_admin_leaderboard_editor()
+                    if result == MENU:
+                        return MENU
+        if not frames.redraw:
+            continue
+
         WINDOW.fill(COLORS['bg'])
         UIDrawer.text_centered("전체 리더보드", 30, 'large')
         
@@ -1097,7 +1514,7 @@ def run_leaderboard():
         pygame.draw.rect(WINDOW, (237, 229, 218), box_2048.inflate(-16, -16), border_radius=12)
         pygame.draw.rect(WINDOW, COLORS['outline'], box_2048, 4, border_radius=15)
         
-        title_2048 = FONTS['medium'].render("2048", True, (100, 80, 60))
+        title_2048 = TextCache.render('medium', "2048", (100, 80, 60))
         WINDOW.blit(title_2048, (x1 + box_width//2 - title_2048.get_width()//2, y_start + 12))
         pygame.draw.line(WINDOW, COLORS['outline'], (x1 + 15, y_start + 45), (x1 + box_width - 15, y_start + 45), 2)
         
@@ -1108,11 +1525,11 @@ def run_leaderboard():
                 score = entry.get('score', 0)
                 txt = f"{i+1}. {student_id[:6]}"
                 txt2 = f"   {score:,}점"
-                WINDOW.blit(FONTS['tiny'].render(txt, True, COLORS['font']), (x1 + 10, y_pos))
-                WINDOW.blit(FONTS['tiny'].render(txt2, True, (100, 100, 100)), (x1 + 10, y_pos + 14))
+                WINDOW.blit(TextCache.render('tiny', txt, COLORS['font']), (x1 + 10, y_pos))
+                WINDOW.blit(TextCache.render('tiny', txt2, (100, 100, 100)), (x1 + 10, y_pos + 14))
             else:
                 txt = f"{i+1}. {entry:,}점"
-                WINDOW.blit(FONTS['tiny'].render(txt, True, COLORS['font']), (x1 + 10, y_pos))
+                WINDOW.blit(TextCache.render('tiny', txt, COLORS['font']), (x1 + 10, y_pos))
         
         # 블록깨기 리더보드 (2번째)
         x2 = start_x + box_width + margin
@@ -1122,7 +1539,7 @@ def run_leaderboard():
         pygame.draw.rect(WINDOW, (237, 242, 247), box_break.inflate(-16, -16), border_radius=12)
         pygame.draw.rect(WINDOW, COLORS['outline'], box_break, 4, border_radius=15)
         
-        title_break = FONTS['medium'].render("블록깨기", True, (60, 80, 100))
+        title_break = TextCache.render('medium', "블록깨기", (60, 80, 100))
         WINDOW.blit(title_break, (x2 + box_width//2 - title_break.get_width()//2, y_start + 12))
         pygame.draw.line(WINDOW, COLORS['outline'], (x2 + 15, y_start + 45), (x2 + box_width - 15, y_start + 45), 2)
         
@@ -1133,7 +1550,7 @@ def run_leaderboard():
             lb_break = LeaderboardManager.load(GAME_BREAKOUT, diff)
             y_diff = y_start + 58 + j * 130
             
-            diff_title = FONTS['small'].render(f"[{diff_name}]", True, color)
+            diff_title = TextCache.render('small', f"[{diff_name}]", color)
             WINDOW.blit(diff_title, (x2 + 15, y_diff))
             
             for i, entry in enumerate(lb_break[:5]):
@@ -1143,7 +1560,7 @@ def run_leaderboard():
                     txt = f"{i+1}. {student_id[:6]}: {time}초"
                 else:
                     txt = f"{i+1}. {entry}초"
-                WINDOW.blit(FONTS['tiny'].render(txt, True, COLORS['font']), (x2 + 12, y_diff + 25 + i * 20))
+                WINDOW.blit(TextCache.render('tiny', txt, COLORS['font']), (x2 + 12, y_diff + 25 + i * 20))
         
         # 케이크던지기 리더보드 (3번째)
         lb_typing = LeaderboardManager.load(GAME_TYPING)
@@ -1154,7 +1571,7 @@ def run_leaderboard():
         pygame.draw.rect(WINDOW, (247, 237, 242), box_typing.inflate(-16, -16), border_radius=12)
         pygame.draw.rect(WINDOW, COLORS['outline'], box_typing, 4, border_radius=15)
         
-        title_typing = FONTS['medium'].render("케이크", True, (100, 60, 80))
+        title_typing = TextCache.render('medium', "케이크", (100, 60, 80))
         WINDOW.blit(title_typing, (x3 + box_width//2 - title_typing.get_width()//2, y_start + 12))
         pygame.draw.line(WINDOW, COLORS['outline'], (x3 + 15, y_start + 45), (x3 + box_width - 15, y_start + 45), 2)
         
@@ -1166,11 +1583,11 @@ def run_leaderboard():
                 score = entry.get('score', 0)
                 txt1 = f"{i+1}. {student_id[:6]}"
                 txt2 = f"   {stage}단계 {score:,}점"
-                WINDOW.blit(FONTS['tiny'].render(txt1, True, COLORS['font']), (x3 + 10, y_pos))
-                WINDOW.blit(FONTS['tiny'].render(txt2, True, (100, 100, 100)), (x3 + 10, y_pos + 14))
+                WINDOW.blit(TextCache.render('tiny', txt1, COLORS['font']), (x3 + 10, y_pos))
+                WINDOW.blit(TextCache.render('tiny', txt2, (100, 100, 100)), (x3 + 10, y_pos + 14))
             else:
                 txt = f"{i+1}. {entry:,}"
-                WINDOW.blit(FONTS['tiny'].render(txt, True, COLORS['font']), (x3 + 10, y_pos))
+                WINDOW.blit(TextCache.render('tiny', txt, COLORS['font']), (x3 + 10, y_pos))
         
         # 테트리스 리더보드 (4번째)
         lb_tetris = LeaderboardManager.load(GAME_TETRIS)
@@ -1181,7 +1598,7 @@ def run_leaderboard():
         pygame.draw.rect(WINDOW, (230, 247, 237), box_tetris.inflate(-16, -16), border_radius=12)
         pygame.draw.rect(WINDOW, COLORS['outline'], box_tetris, 4, border_radius=15)
         
-        title_tetris = FONTS['small'].render("테트리스", True, (40, 100, 80))
+        title_tetris = TextCache.render('small', "테트리스", (40, 100, 80))
         WINDOW.blit(title_tetris, (x4 + box_width//2 - title_tetris.get_width()//2, y_start + 12))
         pygame.draw.line(WINDOW, COLORS['outline'], (x4 + 15, y_start + 40), (x4 + box_width - 15, y_start + 40), 2)
         
@@ -1192,11 +1609,11 @@ def run_leaderboard():
                 score = entry.get('score', 0)
                 txt = f"{i+1}. {student_id[:6]}"
                 txt2 = f"   {score:,}점"
-                WINDOW.blit(FONTS['tiny'].render(txt, True, COLORS['font']), (x4 + 10, y_pos))
-                WINDOW.blit(FONTS['tiny'].render(txt2, True, (100, 100, 100)), (x4 + 10, y_pos + 14))
+                WINDOW.blit(TextCache.render('tiny', txt, COLORS['font']), (x4 + 10, y_pos))
+                WINDOW.blit(TextCache.render('tiny', txt2, (100, 100, 100)), (x4 + 10, y_pos + 14))
             else:
                 txt = f"{i+1}. {entry:,}점"
-                WINDOW.blit(FONTS['tiny'].render(txt, True, COLORS['font']), (x4 + 10, y_pos))
+                WINDOW.blit(TextCache.render('tiny', txt, COLORS['font']), (x4 + 10, y_pos))
         
         # 블록블라스트 리더보드 (5번째)
         lb_blast = LeaderboardManager.load(GAME_BLOCKBLAST)
@@ -1207,7 +1624,7 @@ def run_leaderboard():
         pygame.draw.rect(WINDOW, (247, 240, 230), box_blast.inflate(-16, -16), border_radius=12)
         pygame.draw.rect(WINDOW, COLORS['outline'], box_blast, 4, border_radius=15)
         
-        title_blast = FONTS['small'].render("블록블라스트", True, (100, 80, 60))
+        title_blast = TextCache.render('small', "블록블라스트", (100, 80, 60))
         WINDOW.blit(title_blast, (x5 + box_width//2 - title_blast.get_width()//2, y_start + 12))
         pygame.draw.line(WINDOW, COLORS['outline'], (x5 + 15, y_start + 40), (x5 + box_width - 15, y_start + 40), 2)
         
@@ -1218,11 +1635,11 @@ def run_leaderboard():
                 score = entry.get('score', 0)
                 txt = f"{i+1}. {student_id[:6]}"
                 txt2 = f"   {score:,}점"
-                WINDOW.blit(FONTS['tiny'].render(txt, True, COLORS['font']), (x5 + 10, y_pos))
-                WINDOW.blit(FONTS['tiny'].render(txt2, True, (100, 100, 100)), (x5 + 10, y_pos + 14))
+                WINDOW.blit(TextCache.render('tiny', txt, COLORS['font']), (x5 + 10, y_pos))
+                WINDOW.blit(TextCache.render('tiny', txt2, (100, 100, 100)), (x5 + 10, y_pos + 14))
             else:
                 txt = f"{i+1}. {entry:,}점"
-                WINDOW.blit(FONTS['tiny'].render(txt, True, COLORS['font']), (x5 + 10, y_pos))
+                WINDOW.blit(TextCache.render('tiny', txt, COLORS['font']), (x5 + 10, y_pos))
         
         # 안내 문구
         help_y = 720
@@ -1234,19 +1651,6 @@ def run_leaderboard():
 
         pygame.display.update()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return None
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return MENU
-                elif event.key == pygame.K_F10 and ADMIN_MODE:
-                    # 편집 모드 진입
-                    PARTICLE_SYSTEM.add_confetti(WIDTH//2, HEIGHT//2, 50)
-                    result = run_admin_leaderboard_editor()
-                    if result == MENU:
-                        return MENU
-
 # ==================== 관리자 리더보드 편집 ====================
 def run_admin_leaderboard_editor():
     """관리자 리더보드 편집 모드"""
@@ -1286,7 +1690,7 @@ def run_admin_leaderboard_editor():
                 btn = pygame.Rect(WIDTH//2 - 200, y_offset + i * 50, 400, 45)
                 pygame.draw.rect(WINDOW, (255, 220, 220), btn, border_radius=10)
                 pygame.draw.rect(WINDOW, (200, 0, 0), btn, 3, border_radius=10)
-                txt = FONTS['small'].render(f"{i+1}. {name}", True, COLORS['font'])
+                txt = TextCache.render('small', f"{i+1}. {name}", COLORS['font'])
                 WINDOW.blit(txt, txt.get_rect(center=btn.center))
 
             UIDrawer.text_centered("ESC: 돌아가기", 700, 'small')
@@ -1315,7 +1719,7 @@ def run_admin_leaderboard_editor():
                     txt = f"{i+1}. {entry:,}"
 
                 color = (255, 200, 200) if selected_index == i else COLORS['font']
-                surf = FONTS['tiny'].render(txt, True, color)
+                surf = TextCache.render('tiny', txt, color)
                 WINDOW.blit(surf, (WIDTH//2 - 250, y))
 
             # 안내
@@ -1327,13 +1731,13 @@ def run_admin_leaderboard_editor():
             ]
             y_help = 600
             for i, text in enumerate(help_texts):
-                surf = FONTS['tiny'].render(text, True, (100, 100, 100))
+                surf = TextCache.render('tiny', text, (100, 100, 100))
                 WINDOW.blit(surf, (WIDTH//2 - 150, y_help + i * 20))
 
             # 선택된 항목 표시
             if selected_index is not None:
                 txt = f"선택: {selected_index + 1}번 항목"
-                surf = FONTS['small'].render(txt, True, (255, 0, 0))
+                surf = TextCache.render('small', txt, (255, 0, 0))
                 WINDOW.blit(surf, (WIDTH//2 - surf.get_width()//2, 550))
 
             # 학번 수정 모드
@@ -1354,12 +1758,12 @@ def run_admin_leaderboard_editor():
                 ]
                 for i, (text, font) in enumerate(texts):
                     color = COLORS['font'] if i != 1 else (0, 0, 255)
-                    surf = FONTS[font].render(text, True, color)
+                    surf = TextCache.render(font, text, color)
                     WINDOW.blit(surf, (WIDTH//2 - surf.get_width()//2, HEIGHT//2 - 60 + i * 40))
 
         # 메시지 표시
         if message and message_time > 0:
-            msg_surf = FONTS['medium'].render(message, True, (0, 200, 0))
+            msg_surf = TextCache.render('medium', message, (0, 200, 0))
             WINDOW.blit(msg_surf, (WIDTH//2 - msg_surf.get_width()//2, HEIGHT - 50))
             message_time -= 1
 
@@ -1431,26 +1835,311 @@ def run_admin_leaderboard_editor():
                             selected_index = idx
 
 # ==================== 2048 게임 ====================
+class Board2048:
+    """4x4 2048 보드를 int 하나로 다루는 엔진
+
+    칸마다 값의 지수(빈칸 0, 2 → 1, 4 → 2, ...)를 4비트로 담는다. r행 c열은 (r*4 + c)*4번째
+    비트부터이고 한 줄(16비트)의 0번 니블이 왼쪽 칸이다. 16비트 줄 65536개를 왼쪽/오른쪽으로
+    밀었을 때의 결과와 점수를 표로 만들어 두고, 위/아래는 보드를 전치해서 같은 표를 쓴다.
+    4비트라 32768끼리는 합치지 않는다 (65536 타일은 만들 수 없음).
+    """
+    row_left = row_right = score_left = score_right = None
+
+    @classmethod
+    def tables(cls):
+        """줄 이동 표 (처음 쓸 때 한 번 계산, 약 0.3초)"""
+        if cls.row_left is None:
+            left = [0] * 65536
+            score = [0] * 65536
+            for row in range(65536):
+                tiles = [e for e in (row & 0xF, row >> 4 & 0xF, row >> 8 & 0xF, row >> 12) if e]
+                merged, gained, i = [], 0, 0
+                while i < len(tiles):
+                    e = tiles[i]
+                    if i + 1 < len(tiles) and tiles[i + 1] == e and e < 15:
+                        merged.append(e + 1)
+                        gained += 2 << e
+                        i += 2
+                    else:
+                        merged.append(e)
+                        i += 1
+                result = 0
+                for k, e in enumerate(merged):
+                    result |= e << (4 * k)
+                left[row] = result
+                score[row] = gained
+            # 오른쪽 = 줄을 뒤집어 왼쪽으로 민 뒤 다시 뒤집기
+            rev = [(r & 0xF) << 12 | (r >> 4 & 0xF) << 8 | (r >> 8 & 0xF) << 4 | r >> 12 for r in range(65536)]
+            cls.row_right = [rev[left[rev[r]]] for r in range(65536)]
+            cls.score_right = [score[rev[r]] for r in range(65536)]
+            cls.row_left, cls.score_left = left, score
+        return cls.row_left, cls.row_right, cls.score_left, cls.score_right
+
+    @staticmethod
+    def encode(grid):
+        """값 격자 → 보드 int"""
+        board = 0
+        for i, val in enumerate(val for row in grid for val in row):
+            if val:
+                board |= (val.bit_length() - 1) << (4 * i)
+        return board
+
+    @staticmethod
+    def decode(board):
+        """보드 int → 값 격자 (리스트의 리스트)"""
+        grid = []
+        for r in range(GRID_SIZE):
+            row = board >> (16 * r)
+            grid.append([1 << e if e else 0 for e in (row & 0xF, row >> 4 & 0xF, row >> 8 & 0xF, row >> 12 & 0xF)])
+        return grid
+
+    @staticmethod
+    def transpose(board):
+        """행과 열 바꾸기 (니블 단위 4x4 전치)"""
+        a1 = board & 0xF0F00F0FF0F00F0F
+        a2 = board & 0x0000F0F00000F0F0
+        a3 = board & 0x0F0F00000F0F0000
+        a = a1 | (a2 << 12) | (a3 >> 12)
+        b1 = a & 0xFF00FF0000FF00FF
+        b2 = a & 0x00FF00FF00000000
+        b3 = a & 0x00000000FF00FF00
+        return b1 | (b2 >> 24) | (b3 << 24)
+
+    @classmethod
+    def move(cls, board, direction):
+        """한 방향으로 밀기. (새 보드, 얻은 점수) 반환 (안 움직였으면 새 보드 == board)"""
+        row_left, row_right, score_left, score_right = cls.tables()
+        vertical = direction in ('up', 'down')
+        if vertical:
+            board = cls.transpose(board)
+        if direction in ('left', 'up'):
+            rows, scores = row_left, score_left
+        else:
+            rows, scores = row_right, score_right
+        result = gained = 0
+        for shift in (0, 16, 32, 48):
+            row = board >> shift & 0xFFFF
+            result |= rows[row] << shift
+            gained += scores[row]
+        if vertical:
+            result = cls.transpose(result)
+        return result, gained
+
+    @classmethod
+    def moves(cls, board):
+        """네 방향으로 민 보드 (left, right, up, down 순서, 점수 없이). 탐색용으로 전치는 한 번만 함"""
+        row_left, row_right = cls.tables()[:2]
+        columns = cls.transpose(board)
+        r0, r1, r2, r3 = board & 0xFFFF, board >> 16 & 0xFFFF, board >> 32 & 0xFFFF, board >> 48
+        c0, c1, c2, c3 = columns & 0xFFFF, columns >> 16 & 0xFFFF, columns >> 32 & 0xFFFF, columns >> 48
+        return (row_left[r0] | row_left[r1] << 16 | row_left[r2] << 32 | row_left[r3] << 48,
+                row_right[r0] | row_right[r1] << 16 | row_right[r2] << 32 | row_right[r3] << 48,
+                cls.transpose(row_left[c0] | row_left[c1] << 16 | row_left[c2] << 32 | row_left[c3] << 48),
+                cls.transpose(row_right[c0] | row_right[c1] << 16 | row_right[c2] << 32 | row_right[c3] << 48))
+
+    @classmethod
+    def can_move(cls, board):
+        """어느 방향으로든 움직일 수 있는지 (빈칸이 있거나 이웃한 같은 값이 있음)"""
+        row_left, row_right = cls.tables()[:2]
+        transposed = cls.transpose(board)
+        for shift in (0, 16, 32, 48):
+            for line in (board >> shift & 0xFFFF, transposed >> shift & 0xFFFF):
+                if row_left[line] != line or row_right[line] != line:
+                    return True
+        return False
+
+    @staticmethod
+    def empty_cells(board):
+        """빈칸 번호 목록 (r*4 + c, 왼쪽 위부터)"""
+        return [i for i in range(16) if not board >> (4 * i) & 0xF]
+
+class Solver2048:
+    """2048 힌트/자동 플레이: Board2048 보드 위에서 기대값 탐색(expectimax)
+
+    내 차례에는 네 방향 중 가장 좋은 값, 타일이 생기는 차례에는 빈칸마다 2가 생긴 경우의
+    평균을 잡는다 (이 게임은 2만 생김). 같은 보드는 치환표(dict)에서 다시 꺼내 쓰고,
+    깊이 1부터 하나씩 늘려 가다가 시간 예산을 넘기면 마지막으로 끝까지 본 깊이의 답을 쓴다.
+    보드 평가는 16비트 줄 65536개에 대해 미리 계산한 점수표를 행 4개 + 열 4개에서 더한 값이다.
+    """
+    DIRECTIONS = ('left', 'right', 'up', 'down')
+    TIME_BUDGET_MS = 30        # 한 수에 쓰는 시간 (넘기면 이전 깊이의 답, 50ms 안에 끝나도록 여유를 둠)
+    MAX_DEPTH = 8              # 내 차례 수 기준
+    MIN_PROBABILITY = 0.0001   # 이보다 드문 갈래는 더 보지 않고 평가
+    # 줄 평가 가중치: 빈칸, 합칠 수 있는 이웃, 단조성 위반, 큰 타일 합
+    EMPTY_WEIGHT = 270.0
+    MERGES_WEIGHT = 700.0
+    MONOTONICITY_WEIGHT = 47.0
+    MONOTONICITY_POWER = 4.0
+    SUM_WEIGHT = 11.0
+    SUM_POWER = 3.5
+    LOST_PENALTY = 200000.0    # 줄마다 더하는 기본값 (움직일 수 없는 보드는 0점)
+    heuristic = None
+
+    def __init__(self, budget_ms=TIME_BUDGET_MS):
+        # 이동표/평가표는 처음 만들 때 한 번 계산 (힌트/자동 플레이를 처음 켤 때, 한 수 시간에는 안 들어감)
+        Board2048.tables()
+        self.tables()
+        self.budget_ms = float(budget_ms)
+        self.cache = {}
+        self.deadline = 0.0
+        self.timed_out = False
+        self.decisions = 0
+        self.think_ms = 0.0      # 결정에 걸린 시간 합
+        self.max_think_ms = 0.0
+        self.depth_total = 0     # 끝까지 본 깊이 합 (평균 깊이 계산용)
+
+    @classmethod
+    def tables(cls):
+        """줄 평가표 (처음 쓸 때 한 번 계산)"""
+        if cls.heuristic is None:
+            table = [0.0] * 65536
+            for row in range(65536):
+                tiles = (row & 0xF, row >> 4 & 0xF, row >> 8 & 0xF, row >> 12)
+                empty = merges = 0
+                prev = counter = 0
+                total = 0.0
+                for e in tiles:
+                    total += e ** cls.SUM_POWER
+                    if not e:
+                        empty += 1
+                    elif prev == e:
+                        counter += 1
+                    else:
+                        if counter:
+                            merges += 1 + counter
+                        counter = 0
+                        prev = e
+                if counter:
+                    merges += 1 + counter
+                mono_left = mono_right = 0.0
+                for a, b in zip(tiles, tiles[1:]):
+                    if a > b:
+                        mono_left += a ** cls.MONOTONICITY_POWER - b ** cls.MONOTONICITY_POWER
+                    else:
+                        mono_right += b ** cls.MONOTONICITY_POWER - a ** cls.MONOTONICITY_POWER
+                table[row] = (cls.LOST_PENALTY + cls.EMPTY_WEIGHT * empty + cls.MERGES_WEIGHT * merges
+                              - cls.MONOTONICITY_WEIGHT * min(mono_left, mono_right) - cls.SUM_WEIGHT * total)
+            cls.heuristic = table
+        return cls.heuristic
+
+    @classmethod
+    def evaluate(cls, board):
+        """보드 평가 점수 (행 4개 + 열 4개)"""
+        table = cls.tables()
+        columns = Board2048.transpose(board)
+        return (table[board & 0xFFFF] + table[board >> 16 & 0xFFFF]
+                + table[board >> 32 & 0xFFFF] + table[board >> 48]
+                + table[columns & 0xFFFF] + table[columns >> 16 & 0xFFFF]
+                + table[columns >> 32 & 0xFFFF] + table[columns >> 48])
+
+    def _best_move(self, board, depth, probability):
+        """내 차례: 움직일 수 있는 방향 중 가장 큰 기대값 (움직일 수 없으면 0)"""
+        best = 0.0
+        for moved in Board2048.moves(board):
+            if moved != board:
+                value = self._spawn(moved, depth - 1, probability)
+                if value > best:
+                    best = value
+        return best
+
+    def _spawn(self, board, depth, probability):
+        """타일이 생기는 차례: 빈칸마다 2가 생긴 경우의 평균"""
+        if depth <= 0 or probability < self.MIN_PROBABILITY:
+            return self.evaluate(board)
+        cached = self.cache.get(board)
+        if cached is not None and cached[0] >= depth:
+            return cached[1]
+        if self.timed_out or time.perf_counter() > self.deadline:
+            self.timed_out = True
+            return 0.0
+        empties = [1 << (4 * i) for i in range(16) if not board >> (4 * i) & 0xF]
+        probability /= len(empties)
+        value = sum(self._best_move(board | tile, depth, probability) for tile in empties) / len(empties)
+        self.cache[board] = (depth, value)
+        return value
+
+    def choose(self, board):
+        """다음 방향 ('left' 등, 움직일 수 없으면 None)"""
+        start = time.perf_counter()
+        self.deadline = start + self.budget_ms / 1000
+        self.cache = {}
+        moves = [(direction, moved) for direction, moved in zip(self.DIRECTIONS, Board2048.moves(board))
+                 if moved != board]
+        best, depth = (moves[0][0] if moves else None), 0
+        for search_depth in range(1, self.MAX_DEPTH + 1):
+            if len(moves) <= 1:
+                break  # 고를 것이 없음
+            self.timed_out = False
+            values = [(self._spawn(moved, search_depth - 1, 1.0), direction) for direction, moved in moves]
+            if self.timed_out:
+                break
+            best, depth = max(values)[1], search_depth
+        elapsed = (time.perf_counter() - start) * 1000
+        self.decisions += 1
+        self.think_ms += elapsed
+        self.max_think_ms = max(self.max_think_ms, elapsed)
+        self.depth_total += depth
+        return best
+
+class TileAtlas:
+    """2048 타일 그림 모음 (값 → 배경, 둥근 모서리, 숫자까지 그려 둔 Surface)
+
+    TILE_COLORS에 있는 값은 처음 쓸 때 한꺼번에, 2048보다 큰 값은 처음 나올 때 만든다.
+    """
+    tiles = {}
+
+    @classmethod
+    def get(cls, val):
+        if not cls.tiles:
+            for tile_val in TILE_COLORS:
+                cls.tiles[tile_val] = cls._make(tile_val)
+        tile = cls.tiles.get(val)
+        if tile is None:
+            tile = cls.tiles[val] = cls._make(val)
+        return tile
+
+    @staticmethod
+    def _make(val):
+        tile = pygame.Surface((TILE_SIZE - 20, TILE_SIZE - 20)).convert()
+        tile.fill(COLORS['bg'])  # 둥근 모서리 바깥은 보드 배경색
+        rect = tile.get_rect()
+        pygame.draw.rect(tile, TILE_COLORS.get(val, (100, 80, 40)), rect, border_radius=8)
+        if val:
+            txt = FONTS['large'].render(str(val), True, COLORS['font'])
+            tile.blit(txt, txt.get_rect(center=rect.center))
+        return tile
+
 class Game2048:
     def __init__(self):
-        self.grid = [[0] * GRID_SIZE for _ in range(GRID_SIZE)]
+        self.packed = 0  # 실제 보드 (Board2048 형식)
+        self.grid = [[0] * GRID_SIZE for _ in range(GRID_SIZE)]  # 화면용 값 격자 (packed를 풀어 둔 것)
         self.score = 0
         self.game_over = False
-        self.game_over_timer = 0
+        self.game_over_timer = 0  # 게임 오버 후 흐른 시간 (ms)
         self.entering_pw = False
         self.pw_input = ""
         self.leaderboard = LeaderboardManager.load(GAME_2048)
+        self.board = None  # 타일을 합성해 둔 보드 (타일이 움직였을 때만 다시 합성)
+        self.board_dirty = True
+        self.solver = None     # Solver2048 (힌트나 자동 플레이를 처음 쓸 때 만듦)
+        self.hint = None       # H키로 받은 추천 방향
+        self.autoplay = False  # A키: 자동 플레이
+        self.autoplay_timer = 0
+        self.assisted = False  # 자동 플레이를 쓴 판은 순위에 올리지 않음
 
         for _ in range(2):
             self.add_tile()
     
     def add_tile(self):
-        empties = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE) if not self.grid[r][c]]
+        empties = Board2048.empty_cells(self.packed)
         if empties:
-            r, c = random.choice(empties)
-            self.grid[r][c] = 2
+            i = random.choice(empties)
+            self.packed |= 1 << (4 * i)
+            self.grid[i // GRID_SIZE][i % GRID_SIZE] = 2
     
-    def compress_merge(self, line):
+    @staticmethod
+    def compress_merge(line):
+        """리스트로 한 줄 밀기 (Board2048 표의 기준 구현, --bench-2048에서 비교)"""
         new = [v for v in line if v]
         merged, gained, i = [], 0, 0
         while i < len(new):
@@ -1465,75 +2154,71 @@ class Game2048:
         return merged + [0] * (GRID_SIZE - len(merged)), gained
     
     def move(self, direction):
-        moved, total_gained = False, 0
-        new_grid = [row[:] for row in self.grid]
-        
-        if direction in ('left', 'right'):
-            for r in range(GRID_SIZE):
-                row = self.grid[r][::-1] if direction == 'right' else self.grid[r][:]
-                compressed, gained = self.compress_merge(row)
-                new_grid[r] = compressed[::-1] if direction == 'right' else compressed
-                if new_grid[r] != self.grid[r]:
-                    moved = True
-                total_gained += gained
-        else:
-            for c in range(GRID_SIZE):
-                col = [self.grid[r][c] for r in range(GRID_SIZE)]
-                if direction == 'down':
-                    col = col[::-1]
-                compressed, gained = self.compress_merge(col)
-                if direction == 'down':
-                    compressed = compressed[::-1]
-                for r in range(GRID_SIZE):
-                    new_grid[r][c] = compressed[r]
-                if [new_grid[r][c] for r in range(GRID_SIZE)] != [self.grid[r][c] for r in range(GRID_SIZE)]:
-                    moved = True
-                total_gained += gained
+        packed, total_gained = Board2048.move(self.packed, direction)
+        moved = packed != self.packed
         
         if moved:
-            self.grid = new_grid
+            self.packed = packed
+            self.grid = Board2048.decode(packed)
             self.score += total_gained
             self.add_tile()
+            self.board_dirty = True
+            self.hint = None
             
             if not self.can_move():
                 self.game_over = True
-                self.leaderboard = LeaderboardManager.update(GAME_2048, self.score, student_id=CURRENT_STUDENT_ID)
+                self.autoplay = False
+                if not self.assisted:
+                    self.leaderboard = LeaderboardManager.update(GAME_2048, self.score, student_id=CURRENT_STUDENT_ID)
         
         return moved
     
     def can_move(self):
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                if not self.grid[r][c]:
-                    return True
-                if c < GRID_SIZE-1 and self.grid[r][c] == self.grid[r][c+1]:
-                    return True
-                if r < GRID_SIZE-1 and self.grid[r][c] == self.grid[r+1][c]:
-                    return True
-        return False
+        return Board2048.can_move(self.packed)
+
+    def suggest(self):
+        """지금 보드에서 추천 방향"""
+        if self.solver is None:
+            self.solver = Solver2048()
+        return self.solver.choose(self.packed)
+
+    def update_autoplay(self, dt):
+        """자동 플레이 중이면 AUTOPLAY_MOVE_MS마다 한 수 둠. 움직였으면 True"""
+        if not self.autoplay or self.game_over or self.entering_pw:
+            return False
+        self.autoplay_timer += dt
+        if self.autoplay_timer < AUTOPLAY_MOVE_MS:
+            return False
+        self.autoplay_timer = 0
+        direction = self.suggest()
+        return direction is not None and self.move(direction)
     
-    def draw(self):
-        WINDOW.fill(COLORS['bg'])
-        
+    def compose_board(self):
+        """타일 그림을 붙여서 보드 Surface 만들기"""
+        board = pygame.Surface((GAME_WIDTH, HEIGHT)).convert()
+        board.fill(COLORS['bg'])
         for r in range(GRID_SIZE):
             for c in range(GRID_SIZE):
-                val = self.grid[r][c]
-                color = TILE_COLORS.get(val, (100, 80, 40))
-                rect = pygame.Rect(c * TILE_SIZE + 10, r * TILE_SIZE + 10, 
-                                 TILE_SIZE - 20, TILE_SIZE - 20)
-                pygame.draw.rect(WINDOW, color, rect, border_radius=8)
-                
-                if val:
-                    txt = FONTS['large'].render(str(val), True, COLORS['font'])
-                    WINDOW.blit(txt, txt.get_rect(center=rect.center))
-        
-        pygame.draw.rect(WINDOW, COLORS['outline'], (0, 0, GAME_WIDTH, HEIGHT), 8, border_radius=8)
+                board.blit(TileAtlas.get(self.grid[r][c]), (c * TILE_SIZE + 10, r * TILE_SIZE + 10))
+        pygame.draw.rect(board, COLORS['outline'], (0, 0, GAME_WIDTH, HEIGHT), 8, border_radius=8)
+        self.board = board
+        self.board_dirty = False
+
+    def draw(self):
+        if self.board_dirty:
+            self.compose_board()
+        WINDOW.blit(self.board, (0, 0))
+        WINDOW.fill(COLORS['bg'], (GAME_WIDTH, 0, WIDTH - GAME_WIDTH, HEIGHT))
         pygame.draw.line(WINDOW, COLORS['outline'], (GAME_WIDTH, 0), (GAME_WIDTH, HEIGHT), 3)
         
         if ADMIN_MODE:
             UIDrawer.admin_mode_overlay()
         
         y = UIDrawer.panel_header("점수:", self.score)
+        if self.autoplay or self.hint:
+            status = "자동 플레이 중" if self.autoplay else f"힌트: {HINT_ARROWS[self.hint]}"
+            WINDOW.blit(TextCache.render('small', status, COLORS['font']), (GAME_WIDTH + 10, y))
+            y += 30
         UIDrawer.panel_separator(y)
         UIDrawer.leaderboard(self.leaderboard, y + 10)
         
@@ -1567,6 +2252,12 @@ class Game2048:
                 return MENU
             elif event.key == pygame.K_F12 and not self.game_over:
                 self.entering_pw = True
+            elif event.key == pygame.K_h and not self.game_over:
+                self.hint = self.suggest()
+            elif event.key == pygame.K_a and not self.game_over:
+                self.autoplay = not self.autoplay
+                self.assisted = True
+                self.autoplay_timer = AUTOPLAY_MOVE_MS
             else:
                 dirs = {pygame.K_LEFT: 'left', pygame.K_RIGHT: 'right',
                        pygame.K_UP: 'up', pygame.K_DOWN: 'down'}
@@ -1577,43 +2268,280 @@ class Game2048:
 
 def run_2048():
     game = Game2048()
-    clock = pygame.time.Clock()
+    frames = FrameScheduler("2048")
 
     while True:
-        clock.tick(FPS)
+        # 입력이 없으면 잠듦 (게임 오버 후에는 메뉴 복귀 시각까지만)
+        timeout = 5000 - game.game_over_timer if game.game_over else None
+        events = frames.wait(animating=game.autoplay, timeout_ms=timeout)
 
         # 게임 오버 후 5초 자동 메뉴 복귀
         if game.game_over:
-            game.game_over_timer += 1
-            if game.game_over_timer >= 300:  # 5초 (60 FPS * 5)
+            game.game_over_timer += frames.dt
+            if game.game_over_timer >= 5000:  # 5초 (ms)
                 return MENU
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 return None
             result = game.handle_event(event)
             if result != GAME_2048:
                 return result
-        game.draw()
+        game.update_autoplay(frames.dt)
+        if frames.redraw:
+            game.draw()
+
+def run_idle_benchmark(seconds=3):
+    """입력이 없을 때 CPU 사용률: 60 FPS로 계속 그리기 vs FrameScheduler (2048, 블록블라스트)"""
+    seconds = float(seconds)
+    screens = [('2048', Game2048, lambda game: None),
+               ('블록블라스트', BlockBlast, lambda game: game.update_animation())]
+    ok = True
+    for name, make_game, animate in screens:
+        game = make_game()
+        clock = pygame.time.Clock()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        drawn = 0
+        while time.perf_counter() - start_wall < seconds:
+            clock.tick(FPS)
+            pygame.event.get()
+            animate(game)
+            game.draw()
+            drawn += 1
+        old_cpu = (time.process_time() - start_cpu) / (time.perf_counter() - start_wall) * 100
+
+        frames = FixedStepLoop(name) if isinstance(game, BlockBlast) else FrameScheduler(name)
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        while time.perf_counter() - start_wall < seconds:
+            if isinstance(game, BlockBlast):
+                frames.wait(animating=game.is_animating(), timeout_ms=BLOCKBLAST_IDLE_REDRAW_MS)
+                for _ in range(frames.steps):
+                    game.update_animation()
+            else:
+                frames.wait()
+            if frames.redraw:
+                game.draw()
+        new_cpu = (time.process_time() - start_cpu) / (time.perf_counter() - start_wall) * 100
+        print(f"  {name}: 매 프레임 {old_cpu:.1f}% ({drawn}프레임) → 이벤트 방식 {new_cpu:.1f}% "
+              f"(그림 {frames.frames_drawn}, 건너뜀 {frames.frames_skipped}프레임)")
+        ok &= new_cpu <= old_cpu
+    return ok
+
+def _reference_2048_move(grid, direction):
+    """리스트 기반 2048 이동 (예전 Game2048.move 방식). (새 격자, 얻은 점수) 반환"""
+    lines = grid if direction in ('left', 'right') else [list(col) for col in zip(*grid)]
+    result, total_gained = [], 0
+    for line in lines:
+        if direction in ('right', 'down'):
+            compressed, gained = Game2048.compress_merge(line[::-1])
+            compressed = compressed[::-1]
+        else:
+            compressed, gained = Game2048.compress_merge(line)
+        result.append(compressed)
+        total_gained += gained
+    if direction in ('up', 'down'):
+        result = [list(row) for row in zip(*result)]
+    return result, total_gained
+
+def run_2048_benchmark(games=200, seed=1):
+    """2048 이동 속도: 리스트 기반 vs Board2048 (무작위 게임에서 나온 보드로 결과도 비교)"""
+    games, rng = int(games), random.Random(int(seed))
+    start = time.perf_counter()
+    Board2048.tables()
+    table_ms = (time.perf_counter() - start) * 1000
+
+    # 무작위로 끝까지 둔 게임들에서 (보드, 방향) 모으기
+    samples, directions = [], ('left', 'right', 'up', 'down')
+    for _ in range(games):
+        board = 0
+        for _ in range(2):
+            board |= 1 << (4 * rng.choice(Board2048.empty_cells(board)))
+        while Board2048.can_move(board):
+            direction = rng.choice(directions)
+            samples.append((board, direction))
+            moved, _ = Board2048.move(board, direction)
+            if moved != board:
+                board = moved | 1 << (4 * rng.choice(Board2048.empty_cells(moved)))
+    grids = [(Board2048.decode(board), direction) for board, direction in samples]
+
+    mismatches = 0
+    for (board, direction), (grid, _) in zip(samples, grids):
+        packed, gained = Board2048.move(board, direction)
+        expected, expected_gained = _reference_2048_move(grid, direction)
+        can_move = any(_reference_2048_move(grid, d)[0] != grid for d in directions)
+        if (Board2048.decode(packed) != expected or gained != expected_gained
+                or Board2048.encode(expected) != packed or Board2048.can_move(board) != can_move):
+            mismatches += 1
+
+    start = time.perf_counter()
+    for grid, direction in grids:
+        _reference_2048_move(grid, direction)
+    list_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for board, direction in samples:
+        Board2048.move(board, direction)
+    packed_time = time.perf_counter() - start
+
+    count = len(samples)
+    print(f"  표 계산 {table_ms:.0f} ms, 게임 {games}판에서 이동 {count}번, 불일치 {mismatches}")
+    print(f"  리스트: {count / list_time:,.0f} moves/s, Board2048: {count / packed_time:,.0f} moves/s "
+          f"({list_time / packed_time:.1f}배)")
+    return mismatches == 0
+
+def run_2048_autoplay(games=10, budget_ms=Solver2048.TIME_BUDGET_MS, seed=1):
+    """Solver2048로 화면 없이 N판 두고 점수 분포, 최고 타일, 초당 결정 수 보고 (한 수 50ms 미만인지)"""
+    games, rng = int(games), random.Random(int(seed))
+    solver = Solver2048(budget_ms)
+    scores, best_tiles = [], []
+    start = time.perf_counter()
+    for number in range(games):
+        board, score = 0, 0
+        for _ in range(2):
+            board |= 1 << (4 * rng.choice(Board2048.empty_cells(board)))
+        while True:
+            direction = solver.choose(board)
+            if direction is None:
+                break
+            board, gained = Board2048.move(board, direction)
+            score += gained
+            board |= 1 << (4 * rng.choice(Board2048.empty_cells(board)))
+        best_tile = 1 << max(board >> (4 * i) & 0xF for i in range(16))
+        scores.append(score)
+        best_tiles.append(best_tile)
+        print(f"  {number + 1}판: 점수 {score}, 최고 타일 {best_tile}")
+    elapsed = time.perf_counter() - start
+
+    scores.sort()
+    print(f"  점수: 최소 {scores[0]}, 중앙값 {scores[len(scores) // 2]}, "
+          f"평균 {sum(scores) / len(scores):.0f}, 최대 {scores[-1]}")
+    print("  최고 타일: " + ", ".join(f"{tile} x{best_tiles.count(tile)}" for tile in sorted(set(best_tiles))))
+    average_ms = solver.think_ms / max(1, solver.decisions)
+    print(f"  결정 {solver.decisions}번, {solver.decisions / elapsed:.1f}번/초, 평균 {average_ms:.1f} ms, "
+          f"최대 {solver.max_think_ms:.1f} ms, 평균 깊이 {solver.depth_total / max(1, solver.decisions):.1f}")
+    return solver.max_think_ms < 50
 
 # ==================== 테트리스 게임 ====================
+# SRS 회전: 0 = 스폰, 1 = R(시계 90도), 2 = 180도, 3 = L(반시계 90도)
+# 킥 오프셋 (x, y)는 SRS 표기(위쪽이 +y) 그대로 적고 테이블을 만들 때 y를 뒤집는다
+SRS_KICKS_JLSTZ = {
+    (0, 1): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
+    (1, 0): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
+    (1, 2): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
+    (2, 1): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
+    (2, 3): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],
+    (3, 2): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
+    (3, 0): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
+    (0, 3): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],
+}
+SRS_KICKS_I = {
+    (0, 1): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
+    (1, 0): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
+    (1, 2): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)],
+    (2, 1): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
+    (2, 3): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
+    (3, 2): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
+    (3, 0): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
+    (0, 3): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)],
+}
+# 180도 회전 (Tetrio 방식)
+SRS_KICKS_180 = {
+    (0, 2): [(0, 0), (0, 1), (1, 1), (-1, 1), (1, 0), (-1, 0)],
+    (2, 0): [(0, 0), (0, -1), (-1, -1), (1, -1), (-1, 0), (1, 0)],
+    (1, 3): [(0, 0), (1, 0), (1, 2), (1, 1), (0, 2), (0, 1)],
+    (3, 1): [(0, 0), (-1, 0), (-1, 2), (-1, 1), (0, 2), (0, 1)],
+}
+
+def _build_tetris_rotations():
+    """모든 블록의 4방향 모양과 줄 비트마스크를 미리 계산 (import 때 한 번)
+
+    SRS 기준 상자(I는 4x4, O는 2x2, 나머지는 3x3) 안에서 회전시키므로
+    회전해도 중심이 흔들리지 않는다. I는 상자의 둘째 줄에서 시작한다.
+    """
+    rotations = {}
+    for name, base in TETRIS_SHAPES.items():
+        size = 4 if name == 'I' else 2 if name == 'O' else 3
+        top = 1 if name == 'I' else 0
+        shape = [[0] * size for _ in range(size)]
+        for y, row in enumerate(base):
+            for x, cell in enumerate(row):
+                shape[top + y][x] = cell
+
+        orientations = []
+        for _ in range(4):
+            cols = [x for row in shape for x, cell in enumerate(row) if cell]
+            min_x, max_x = min(cols), max(cols)
+            masks = [(dy, sum(1 << (x - min_x) for x, cell in enumerate(row) if cell))
+                     for dy, row in enumerate(shape) if any(row)]
+            bottoms = [(x, max(y for y, row in enumerate(shape) if row[x]))
+                       for x in range(size) if any(row[x] for row in shape)]
+            orientations.append((shape, (masks, min_x, max_x), bottoms))
+            shape = [list(row) for row in zip(*shape[::-1])]  # 시계방향 90도
+        rotations[name] = orientations
+    return rotations
+
+def _build_tetris_kicks():
+    """블록별 (회전 전, 회전 후) → 킥 목록 (화면 좌표, 아래쪽이 +y)"""
+    kicks = {}
+    for name in TETRIS_SHAPES:
+        table = SRS_KICKS_I if name == 'I' else SRS_KICKS_JLSTZ
+        kicks[name] = {}
+        for key, offsets in list(table.items()) + list(SRS_KICKS_180.items()):
+            if name == 'O':
+                offsets = [(0, 0)]  # O는 회전해도 모양이 같음
+            kicks[name][key] = [(dx, -dy) for dx, dy in offsets]
+    return kicks
+
+TETRIS_ROTATIONS = _build_tetris_rotations()  # 이름 → [(모양, (줄 마스크, 왼쪽, 오른쪽), 열별 바닥)] x 4
+TETRIS_KICKS = _build_tetris_kicks()
+
 class TetrisBlock:
     def __init__(self, shape_name):
         self.shape_name = shape_name
-        self.shape = [row[:] for row in TETRIS_SHAPES[shape_name]]
+        self.rotation = 0  # SRS 회전 상태 (0~3)
         self.color = TETRIS_COLORS[shape_name]
-        self.x = TETRIS_GRID_WIDTH // 2 - len(self.shape[0]) // 2
-        self.y = 0
-        
-    def rotate(self):
-        """블록 회전"""
-        self.shape = list(zip(*self.shape[::-1]))
-        self.shape = [list(row) for row in self.shape]
-
-class Tetris:
-    def __init__(self, is_multiplayer=False):
+        spawn = TETRIS_ROTATIONS[shape_name][0][0]
+        self.x = (TETRIS_GRID_WIDTH - len(spawn[0])) // 2
+        self.y = -next(dy for dy, row in enumerate(spawn) if any(row))  # 첫 줄이 보드 맨 위
+
+    @property
+    def shape(self):
+        """현재 회전 상태의 모양 (미리 계산된 표를 공유하므로 수정하지 말 것)"""
+        return TETRIS_ROTATIONS[self.shape_name][self.rotation][0]
+
+    def row_masks(self):
+        """줄별 비트마스크 [(dy, mask)]와 가장 왼쪽/오른쪽 칸
+
+        mask의 0번 비트 = 가장 왼쪽 칸이므로 (x + min_x)만큼 밀면 보드 위치가 된다.
+        """
+        return TETRIS_ROTATIONS[self.shape_name][self.rotation][1]
+
+    def column_bottoms(self):
+        """열마다 가장 아래 칸 [(dx, dy)] (낙하 거리 계산용)"""
+        return TETRIS_ROTATIONS[self.shape_name][self.rotation][2]
+
+    def rotate(self, turns=1):
+        """블록 회전 (시계방향 90도 x turns, 벽 킥 없이 상태만 변경)"""
+        self.rotation = (self.rotation + turns) % 4
+
+class TetrisEngine:
+    """테트리스 규칙 엔진 (pygame 없이 동작)
+
+    시간은 update/step에 넘긴 dt로만, 입력은 입력 비트로만 받으므로
+    화면 없이 수천 배 빠르게 돌리거나 봇/테스트에서 그대로 쓸 수 있다.
+    화면과 키보드는 Tetris가 담당한다.
+    """
+    def __init__(self, is_multiplayer=False, seed=None, bitboard=True):
         self.is_multiplayer = is_multiplayer
-        self.grid = [[0] * TETRIS_GRID_WIDTH for _ in range(TETRIS_GRID_HEIGHT)]
+        self.grid = [[0] * TETRIS_GRID_WIDTH for _ in range(TETRIS_GRID_HEIGHT)]  # 칸 색
+        # 비트보드: 줄마다 int 하나 (x번 비트 = x열). grid와 항상 같이 갱신. None이면 grid만 사용
+        self.row_bits = [0] * TETRIS_GRID_HEIGHT if bitboard else None
+        # 보드가 바뀔 때마다 증가 (열 높이/낙하 거리 캐시 무효화)
+        self.grid_version = 0
+        self._tops_version = -1
+        self._column_tops = None
+        self._drop_cache = (None, 0)
+        self.rng = random.Random(seed)  # 플레이어별 난수 (같은 seed면 같은 블록 순서)
+        self.tick = 0  # step()으로 진행한 틱 수
         self.bag = []  # 7bag 시스템
         self.next_pieces = []  # 다음 4개 블록 미리보기
 
@@ -1627,20 +2555,25 @@ class Tetris:
         self.lines_cleared = 0
         self.level = 1
         self.game_over = False
-        self.game_over_timer = 0
-        self.entering_pw = False
-        self.pw_input = ""
-        self.leaderboard = LeaderboardManager.load(GAME_TETRIS) if not is_multiplayer else None
 
         self.fall_time = 0
         self.fall_speed = 1000  # 초기 낙하 속도 (1초) - 500에서 1000으로 증가
-        self.game_start_time = pygame.time.get_ticks()  # 게임 시작 시간
+        self.elapsed_ms = 0  # 게임 시작 후 흐른 시간 (update에 넘긴 dt 합)
         self.time_limit = 60 if not is_multiplayer else None  # 멀티플레이는 시간 제한 없음
 
         # 테트리오 점수 시스템
         self.combo = -1  # 콤보 카운터 (-1은 콤보 없음)
         self.back_to_back = False  # Back-to-Back 활성화
 
+        # 공격/쓰레기 줄 (멀티플레이)
+        self.last_move_rotated = False  # 마지막 성공한 조작이 회전인지 (T스핀 판정)
+        self.last_kick = 0  # 마지막 회전에 쓴 킥 번호 (4 = T스핀 미니를 T스핀으로 올리는 킥)
+        self.garbage_queue = GarbageQueue()  # 받을 쓰레기 줄
+        self.outgoing_attack = 0  # 아직 보내지 않은 공격 줄 수 (대전 루프가 가져감)
+        self.total_attack = 0  # 보낸 공격 줄 수 합계
+        self.clear_label = ""  # 최근 클리어 이름 (T-SPIN DOUBLE 등)
+        self.clear_label_timer = 0
+
         # 하드드롭 타이머 (0.5초 지속 누름 필요)
         self.down_hold_time = 0
         self.hard_drop_threshold = 500  # 0.5초 = 500ms
@@ -1676,7 +2609,7 @@ class Tetris:
     def _refill_bag(self):
         """7개 블록을 섞어서 bag에 추가"""
         pieces = list(TETRIS_SHAPES.keys())  # ['I', 'O', 'T', 'S', 'Z', 'J', 'L']
-        random.shuffle(pieces)
+        self.rng.shuffle(pieces)
         self.bag.extend(pieces)
 
     def _get_next_piece(self):
@@ -1707,10 +2640,83 @@ class Tetris:
         """7bag 시스템으로 새로운 블록 생성 (하위 호환성을 위해 유지)"""
         return self._get_next_piece()
     
+    def mark_grid_changed(self):
+        """grid를 직접 고친 뒤 호출 (비트보드와 열 높이 캐시를 다시 맞춤)"""
+        self.grid_version += 1
+        if self.row_bits is not None:
+            self.row_bits = [sum(1 << x for x, cell in enumerate(row) if cell) for row in self.grid]
+
+    def column_tops(self):
+        """열마다 가장 위 블록의 y (빈 열은 보드 높이). 보드가 바뀔 때만 다시 계산"""
+        if self._tops_version != self.grid_version:
+            tops = [TETRIS_GRID_HEIGHT] * TETRIS_GRID_WIDTH
+            rows = self.row_bits
+            if rows is not None:
+                seen = 0
+                for y, bits in enumerate(rows):
+                    new = bits & ~seen
+                    while new:
+                        low = new & -new
+                        tops[low.bit_length() - 1] = y
+                        new ^= low
+                    seen |= bits
+                    if seen == TETRIS_FULL_MASK:
+                        break
+            else:
+                for y in range(TETRIS_GRID_HEIGHT - 1, -1, -1):
+                    for x, cell in enumerate(self.grid[y]):
+                        if cell:
+                            tops[x] = y
+            self._column_tops = tops
+            self._tops_version = self.grid_version
+        return self._column_tops
+
+    def drop_distance(self):
+        """현재 블록이 떨어질 수 있는 칸 수 (블록이 움직이거나 보드가 바뀔 때까지 캐시)
+
+        열 높이로 계산하므로 O(블록 폭). 블록이 튀어나온 곳 아래에 있는
+        경우(스핀 후 등)만 그 열을 직접 내려가며 확인한다.
+        """
+        block = self.current_block
+        key = (self.grid_version, block, block.x, block.y, block.rotation)
+        if self._drop_cache[0] == key:
+            return self._drop_cache[1]
+
+        tops = self.column_tops()
+        distance = TETRIS_GRID_HEIGHT
+        for dx, dy in block.column_bottoms():
+            x, y = block.x + dx, block.y + dy
+            if tops[x] > y:
+                gap = tops[x] - y - 1
+            else:
+                gap = 0
+                while y + gap + 1 < TETRIS_GRID_HEIGHT and not self.grid[y + gap + 1][x]:
+                    gap += 1
+            if gap < distance:
+                distance = gap
+        self._drop_cache = (key, distance)
+        return distance
+
     def valid_position(self, block=None, offset_x=0, offset_y=0):
         """블록 위치가 유효한지 확인"""
         if block is None:
             block = self.current_block
+
+        rows = self.row_bits
+        if rows is not None:
+            # 비트보드: 블록 줄 마스크와 보드 줄의 AND
+            masks, min_x, max_x = block.row_masks()
+            left = block.x + offset_x + min_x
+            if left < 0 or left + max_x - min_x >= TETRIS_GRID_WIDTH:
+                return False
+            top = block.y + offset_y
+            for dy, mask in masks:
+                y = top + dy
+                if y >= TETRIS_GRID_HEIGHT:
+                    return False
+                if y >= 0 and rows[y] & (mask << left):
+                    return False
+            return True
             
         for y, row in enumerate(block.shape):
             for x, cell in enumerate(row):
@@ -1726,8 +2732,61 @@ class Tetris:
                         return False
         return True
     
+    def detect_t_spin(self):
+        """T스핀 판정 (3코너 규칙). 'full', 'mini' 또는 None
+
+        고정 직전에 호출. 마지막 조작이 회전이고 T 중심의 대각선 4칸 중 3칸 이상이
+        막혀 있으면 T스핀, 그중 T가 향한 쪽 두 칸이 모두 막혀 있지 않으면 미니.
+        마지막 킥(5번째 시도)으로 들어간 경우는 미니가 아닌 T스핀.
+        """
+        block = self.current_block
+        if block.shape_name != 'T' or not self.last_move_rotated:
+            return None
+        # T의 중심은 3x3 상자 가운데, 향한 방향은 회전 상태로 정해짐
+        dx, dy = ((0, -1), (1, 0), (0, 1), (-1, 0))[block.rotation]
+        gx, gy = block.x + 1, block.y + 1
+
+        def blocked(x, y):
+            return (x < 0 or x >= TETRIS_GRID_WIDTH or y >= TETRIS_GRID_HEIGHT
+                    or (y >= 0 and bool(self.grid[y][x])))
+
+        corners = sum(blocked(gx + ox, gy + oy) for ox in (-1, 1) for oy in (-1, 1))
+        if corners < 3:
+            return None
+        front = (blocked(gx + dx + dy, gy + dy + dx) and blocked(gx + dx - dy, gy + dy - dx))
+        return 'full' if front or self.last_kick == 4 else 'mini'
+
+    def receive_garbage(self, lines):
+        """상대 공격을 대기열에 추가 (구멍 위치는 공격 하나마다 무작위)"""
+        self.garbage_queue.push(lines, self.rng.randrange(TETRIS_GRID_WIDTH))
+
+    def insert_garbage(self, max_lines=TETRIS_GARBAGE_CAP):
+        """대기 중인 쓰레기 줄을 한 번에 아래에서 밀어 올림. 올린 줄 수 반환"""
+        batches = self.garbage_queue.take(max_lines)
+        if not batches:
+            return 0
+        rows = []
+        for lines, hole in batches:
+            row = [TETRIS_GARBAGE_COLOR] * TETRIS_GRID_WIDTH
+            row[hole] = 0
+            rows.extend(row[:] for _ in range(lines))
+        count = len(rows)
+        # 위로 밀려나는 줄에 블록이 있으면 게임 오버
+        if any(any(row) for row in self.grid[:count]):
+            self.game_over = True
+        del self.grid[:count]
+        self.grid.extend(rows)
+        self.grid_version += 1
+        if self.row_bits is not None:
+            del self.row_bits[:count]
+            self.row_bits.extend(TETRIS_FULL_MASK ^ (1 << hole)
+                                 for lines, hole in batches for _ in range(lines))
+        debug_log('ATTACK', f"쓰레기 줄 {count}줄 받음 (남은 대기 {self.garbage_queue.total}줄)")
+        return count
+
     def lock_block(self):
         """현재 블록을 그리드에 고정"""
+        t_spin = self.detect_t_spin()
         for y, row in enumerate(self.current_block.shape):
             for x, cell in enumerate(row):
                 if cell:
@@ -1735,19 +2794,34 @@ class Tetris:
                     grid_x = self.current_block.x + x
                     if 0 <= grid_y < TETRIS_GRID_HEIGHT and 0 <= grid_x < TETRIS_GRID_WIDTH:
                         self.grid[grid_y][grid_x] = self.current_block.color
+                        if self.row_bits is not None:
+                            self.row_bits[grid_y] |= 1 << grid_x
+        self.grid_version += 1
         
         # 줄 제거 확인
         lines = self.clear_lines()
         
         if lines > 0:
             self.lines_cleared += lines
+
+            # 공격 계산 (콤보/B2B는 아래에서 갱신되기 전 값 기준)
+            all_clear = not any(any(row) for row in self.grid)
+            attack = TetrisAttack.calculate(lines, t_spin, self.combo + 1,
+                                            self.back_to_back, all_clear)
+            self.clear_label = TetrisAttack.label(lines, t_spin, all_clear)
+            self.clear_label_timer = 1500
+            if self.is_multiplayer and attack > 0:
+                # 받을 쓰레기 줄부터 상쇄하고 남은 만큼 공격
+                attack = self.garbage_queue.cancel(attack)
+                self.outgoing_attack += attack
+                self.total_attack += attack
             
             # 테트리오 점수 계산
             base_scores = {1: 100, 2: 300, 3: 500, 4: 800}
             points = base_scores.get(lines, 0)
             
-            # 4줄 클리어는 어려운 클리어
-            is_difficult = (lines == 4)
+            # 4줄 클리어와 T스핀 클리어는 어려운 클리어
+            is_difficult = TetrisAttack.is_difficult(lines, t_spin)
             
             # Back-to-Back 보너스 (이전에도 어려운 클리어를 했고 지금도 어려운 클리어일 때)
             if is_difficult and self.back_to_back:
@@ -1773,10 +2847,13 @@ class Tetris:
         else:
             # 줄을 제거하지 못하면 콤보 리셋
             self.combo = -1
+            # 대기 중인 쓰레기 줄은 줄을 못 지웠을 때 들어옴
+            self.insert_garbage()
         
         # 다음 블록
         self.current_block = self._get_next_piece()
         self.can_hold = True  # 새 블록이 나오면 다시 홀드 가능
+        self.last_move_rotated = False
 
         # 키 상태 초기화 (가속 버그 수정)
         self.key_pressed = {
@@ -1795,22 +2872,30 @@ class Tetris:
             'down': 0
         }
 
-        # 게임 오버 확인
-        if not self.valid_position():
-            self.game_over = True
-            if not self.is_multiplayer:
-                self.leaderboard = LeaderboardManager.update(GAME_TETRIS, self.score, student_id=CURRENT_STUDENT_ID)
+        # 게임 오버 확인 (쓰레기 줄에 밀려 넘친 경우 포함)
+        if self.game_over or not self.valid_position():
+            self.end_game()
     
     def clear_lines(self):
         """완성된 줄 제거"""
-        lines_to_clear = []
-        for y in range(TETRIS_GRID_HEIGHT):
-            if all(self.grid[y]):
-                lines_to_clear.append(y)
+        rows = self.row_bits
+        if rows is not None:
+            # 비트보드: 꽉 찬 줄 = FULL_MASK
+            lines_to_clear = [y for y, bits in enumerate(rows) if bits == TETRIS_FULL_MASK]
+            for y in lines_to_clear:
+                del rows[y]
+                rows.insert(0, 0)
+        else:
+            lines_to_clear = []
+            for y in range(TETRIS_GRID_HEIGHT):
+                if all(self.grid[y]):
+                    lines_to_clear.append(y)
         
         for y in lines_to_clear:
             del self.grid[y]
             self.grid.insert(0, [0] * TETRIS_GRID_WIDTH)
+        if lines_to_clear:
+            self.grid_version += 1
         
         return len(lines_to_clear)
     
@@ -1819,6 +2904,7 @@ class Tetris:
         if self.valid_position(offset_x=dx, offset_y=dy):
             self.current_block.x += dx
             self.current_block.y += dy
+            self.last_move_rotated = False
             # 좌우 이동 시 착지 지연 리셋 (이동 횟수 제한 적용)
             if dx != 0 and self.is_on_ground and self.lock_delay_moves < self.lock_delay_max_moves:
                 self.lock_delay_time = 0
@@ -1828,51 +2914,32 @@ class Tetris:
     
     def rotate_block(self, clockwise=True):
         """블록 회전 (시계방향 또는 반시계방향)"""
-        original_shape = [row[:] for row in self.current_block.shape]
-
-        if clockwise:
-            # 시계방향: 90도
-            self.current_block.rotate()
-        else:
-            # 반시계방향: 270도 (시계방향 3번)
-            for _ in range(3):
-                self.current_block.rotate()
-
-        # 회전 후 위치가 유효하지 않으면 원래대로
-        if not self.valid_position():
-            # 벽 킥 시도 (좌우로 1칸씩)
-            for offset in [1, -1, 2, -2]:
-                if self.valid_position(offset_x=offset):
-                    self.current_block.x += offset
-                    # 회전 성공 시 착지 지연 리셋
-                    if self.is_on_ground and self.lock_delay_moves < self.lock_delay_max_moves:
-                        self.lock_delay_time = 0
-                        self.lock_delay_moves += 1
-                    return
-            # 벽 킥 실패시 원래 모양으로
-            self.current_block.shape = original_shape
-        else:
-            # 회전 성공 시 착지 지연 리셋
-            if self.is_on_ground and self.lock_delay_moves < self.lock_delay_max_moves:
-                self.lock_delay_time = 0
-                self.lock_delay_moves += 1
+        return self._rotate(1 if clockwise else 3)
     
     def rotate_180(self):
         """180도 회전"""
-        original_shape = [row[:] for row in self.current_block.shape]
-        
-        # 180도 회전 (90도 2번)
-        for _ in range(2):
-            self.current_block.rotate()
-        
-        # 회전 후 위치가 유효하지 않으면 원래대로
-        if not self.valid_position():
-            # 벽 킥 시도
-            for offset in [1, -1, 2, -2]:
-                if self.valid_position(offset_x=offset):
-                    self.current_block.x += offset
-                    return
-            self.current_block.shape = original_shape
+        return self._rotate(2)
+
+    def _rotate(self, turns):
+        """SRS 회전: 회전 상태 표에서 모양을 바꾸고 킥 목록을 순서대로 시도"""
+        block = self.current_block
+        before = block.rotation
+        after = (before + turns) % 4
+        block.rotation = after
+        for index, (dx, dy) in enumerate(TETRIS_KICKS[block.shape_name][(before, after)]):
+            if self.valid_position(offset_x=dx, offset_y=dy):
+                block.x += dx
+                block.y += dy
+                self.last_move_rotated = True
+                self.last_kick = index
+                # 회전 성공 시 착지 지연 리셋
+                if self.is_on_ground and self.lock_delay_moves < self.lock_delay_max_moves:
+                    self.lock_delay_time = 0
+                    self.lock_delay_moves += 1
+                return True
+        # 모든 킥 실패시 원래 회전 상태로
+        block.rotation = before
+        return False
     
     def hold_piece(self):
         """현재 블록을 홀드"""
@@ -1880,6 +2947,7 @@ class Tetris:
             return
 
         self.can_hold = False
+        self.last_move_rotated = False
 
         if self.hold_block is None:
             # 처음 홀드하는 경우
@@ -1910,14 +2978,15 @@ class Tetris:
 
         # 위치 초기화
         if not self.valid_position():
-            self.game_over = True
-            if not self.is_multiplayer:
-                self.leaderboard = LeaderboardManager.update(GAME_TETRIS, self.score, student_id=CURRENT_STUDENT_ID)
+            self.end_game()
     
     def hard_drop(self):
         """하드 드롭 (한번에 떨어뜨리기)"""
-        while self.move(0, 1):
-            self.score += 2  # 하드 드롭 보너스
+        distance = self.drop_distance()
+        if distance:
+            self.current_block.y += distance
+            self.last_move_rotated = False
+            self.score += 2 * distance  # 하드 드롭 보너스 (칸당 2점)
         self.lock_block()
     
     def soft_drop(self):
@@ -1927,17 +2996,55 @@ class Tetris:
             return True
         return False
     
-    def update(self, dt):
-        """게임 업데이트"""
+    def end_game(self):
+        """게임 오버 처리"""
+        self.game_over = True
+        self.on_game_over()
+
+    def on_game_over(self):
+        """게임 오버 시 호출 (화면 쪽에서 재정의)"""
+        pass
+
+    def apply_action(self, action):
+        """단발 입력 처리 (하드 드롭/회전/홀드)"""
+        if action == TETRIS_INPUT_HARD_DROP:
+            self.hard_drop()
+        elif action == TETRIS_INPUT_ROTATE_CW:
+            self.rotate_block(clockwise=True)
+        elif action == TETRIS_INPUT_ROTATE_CCW:
+            self.rotate_block(clockwise=False)
+        elif action == TETRIS_INPUT_ROTATE_180:
+            self.rotate_180()
+        elif action == TETRIS_INPUT_HOLD:
+            self.hold_piece()
+
+    def step(self, inputs, dt):
+        """한 틱 진행 (입력 비트 + 고정 dt). 같은 seed와 입력이면 항상 같은 결과"""
+        for action in TETRIS_ACTION_ORDER:
+            if inputs & action and not self.game_over:
+                self.apply_action(action)
+        self.update(dt, held=inputs & TETRIS_HELD_MASK)
+        self.tick += 1
+
+    def checksum(self):
+        """보드 + 현재 블록 + 점수 체크섬 (락스텝 비동기 검출용)"""
+        status = TetrisProtocol.pack_status(_tetris_state_message(self, 0, None))
+        return zlib.crc32(TetrisProtocol.pack_grid(self.grid) + status)
+
+    def update(self, dt, held=0):
+        """dt(ms)만큼 진행. held는 누르고 있는 이동 키 입력 비트"""
         if self.game_over:
             return
 
+        self.elapsed_ms += dt
+        if self.clear_label_timer > 0:
+            self.clear_label_timer -= dt
+
         # 시간 제한 확인 (싱글플레이만)
         if not self.is_multiplayer:
-            elapsed_seconds = (pygame.time.get_ticks() - self.game_start_time) / 1000
+            elapsed_seconds = self.elapsed_ms / 1000
             if elapsed_seconds >= self.time_limit:
-                self.game_over = True
-                self.leaderboard = LeaderboardManager.update(GAME_TETRIS, self.score, student_id=CURRENT_STUDENT_ID)
+                self.end_game()
                 return
 
             # 시간에 따른 낙하 속도 증가 (1분 안에 점점 빨라짐, 최소 300ms)
@@ -1948,7 +3055,7 @@ class Tetris:
             current_fall_speed = 500
         
         # 블록이 바닥에 닿았는지 확인
-        if not self.valid_position(offset_y=1):
+        if self.drop_distance() == 0:
             # 바닥에 닿음
             if not self.is_on_ground:
                 # 처음 바닥에 닿았을 때 초기화
@@ -1978,10 +3085,8 @@ class Tetris:
                 self.move(0, 1)
         
         # 키 반복 입력 처리
-        keys = pygame.key.get_pressed()
-        
         # 좌우 이동
-        if keys[pygame.K_LEFT] or keys[pygame.K_KP4]:
+        if held & TETRIS_INPUT_LEFT:
             if not self.key_pressed['left']:
                 self.move(-1, 0)
                 self.key_pressed['left'] = True
@@ -2001,7 +3106,7 @@ class Tetris:
             self.key_timers['left'] = 0
             self.key_repeat_count['left'] = 0
 
-        if keys[pygame.K_RIGHT] or keys[pygame.K_KP6]:
+        if held & TETRIS_INPUT_RIGHT:
             if not self.key_pressed['right']:
                 self.move(1, 0)
                 self.key_pressed['right'] = True
@@ -2022,7 +3127,7 @@ class Tetris:
             self.key_repeat_count['right'] = 0
 
         # 소프트 드롭
-        if keys[pygame.K_DOWN] or keys[pygame.K_KP2]:
+        if held & TETRIS_INPUT_DOWN:
             if not self.key_pressed['down']:
                 self.soft_drop()
                 self.key_pressed['down'] = True
@@ -2041,92 +3146,268 @@ class Tetris:
             self.key_timers['down'] = 0
             self.key_repeat_count['down'] = 0
 
-    def draw(self):
-        """게임 화면 그리기"""
-        WINDOW.fill(COLORS['bg'])
-        
-        # 그리드 배경
-        grid_rect = pygame.Rect(TETRIS_OFFSET_X, TETRIS_OFFSET_Y,
-                               TETRIS_GRID_WIDTH * TETRIS_BLOCK_SIZE,
-                               TETRIS_GRID_HEIGHT * TETRIS_BLOCK_SIZE)
-        pygame.draw.rect(WINDOW, (40, 40, 40), grid_rect)
-        
-        # 그리드 선
+class TetrisRenderer:
+    """테트리스 화면을 바뀐 부분만 다시 그리는 렌더러
+
+    - 배경: 창 배경, 보드 칸과 선, 테두리 (처음에 한 번 그려 둔 Surface)
+    - 고정 블록 층: 보드 크기 Surface. 블록 고정/줄 제거로 바뀐 줄만 다시 그림
+    - 움직이는 블록: 지난 자리를 고정 블록 층으로 덮고 새 자리에 그림 (고스트 포함)
+    - 쓰레기 줄 게이지, 오른쪽 패널: 보이는 값이 바뀔 때만 다시 그림
+    """
+    BOARD_RECT = pygame.Rect(TETRIS_OFFSET_X, TETRIS_OFFSET_Y,
+                             TETRIS_GRID_WIDTH * TETRIS_BLOCK_SIZE,
+                             TETRIS_GRID_HEIGHT * TETRIS_BLOCK_SIZE)
+    GARBAGE_RECT = pygame.Rect(TETRIS_OFFSET_X - 12, TETRIS_OFFSET_Y, 8, TETRIS_GRID_HEIGHT * TETRIS_BLOCK_SIZE)
+    PANEL_RECT = pygame.Rect(WIDTH - 260, 0, 260, HEIGHT)  # 오른쪽 패널 + 관리자 모드 표시 (패널 왼쪽으로 삐져나옴)
+
+    def __init__(self):
+        self.background = self._make_background()
+        self.board_layer = self.background.subsurface(self.BOARD_RECT).copy()
+        self.rows = [None] * TETRIS_GRID_HEIGHT  # 고정 블록 층에 그려 둔 줄
+        self.grid_version = None
+        self.piece_key = None
+        self.piece_rects = []  # 지난 프레임에 블록/고스트를 그린 사각형
+        self.garbage_key = None
+        self.panel_key = None
+        self.stale = True  # 화면 내용을 믿을 수 없음 (처음, 또는 지난 프레임에 위에 덮어 그림)
+
+    @classmethod
+    def _make_background(cls):
+        background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        background.fill(COLORS['bg'])
+        grid_rect = cls.BOARD_RECT
+        pygame.draw.rect(background, (40, 40, 40), grid_rect)
         for x in range(TETRIS_GRID_WIDTH + 1):
-            pygame.draw.line(WINDOW, (60, 60, 60),
-                           (TETRIS_OFFSET_X + x * TETRIS_BLOCK_SIZE, TETRIS_OFFSET_Y),
-                           (TETRIS_OFFSET_X + x * TETRIS_BLOCK_SIZE, 
-                            TETRIS_OFFSET_Y + TETRIS_GRID_HEIGHT * TETRIS_BLOCK_SIZE))
+            px = grid_rect.x + x * TETRIS_BLOCK_SIZE
+            pygame.draw.line(background, (60, 60, 60), (px, grid_rect.y), (px, grid_rect.bottom))
         for y in range(TETRIS_GRID_HEIGHT + 1):
-            pygame.draw.line(WINDOW, (60, 60, 60),
-                           (TETRIS_OFFSET_X, TETRIS_OFFSET_Y + y * TETRIS_BLOCK_SIZE),
-                           (TETRIS_OFFSET_X + TETRIS_GRID_WIDTH * TETRIS_BLOCK_SIZE,
-                            TETRIS_OFFSET_Y + y * TETRIS_BLOCK_SIZE))
-        
-        # 고정된 블록들
-        for y in range(TETRIS_GRID_HEIGHT):
-            for x in range(TETRIS_GRID_WIDTH):
-                if self.grid[y][x]:
-                    rect = pygame.Rect(
-                        TETRIS_OFFSET_X + x * TETRIS_BLOCK_SIZE + 1,
-                        TETRIS_OFFSET_Y + y * TETRIS_BLOCK_SIZE + 1,
-                        TETRIS_BLOCK_SIZE - 2,
-                        TETRIS_BLOCK_SIZE - 2
-                    )
-                    pygame.draw.rect(WINDOW, self.grid[y][x], rect)
-                    pygame.draw.rect(WINDOW, COLORS['white'], rect, 2)
-        
-        # 현재 블록
-        if not self.game_over:
-            for y, row in enumerate(self.current_block.shape):
-                for x, cell in enumerate(row):
-                    if cell:
-                        rect = pygame.Rect(
-                            TETRIS_OFFSET_X + (self.current_block.x + x) * TETRIS_BLOCK_SIZE + 1,
-                            TETRIS_OFFSET_Y + (self.current_block.y + y) * TETRIS_BLOCK_SIZE + 1,
-                            TETRIS_BLOCK_SIZE - 2,
-                            TETRIS_BLOCK_SIZE - 2
-                        )
-                        pygame.draw.rect(WINDOW, self.current_block.color, rect)
-                        pygame.draw.rect(WINDOW, COLORS['white'], rect, 2)
-        
-        # 테두리
-        pygame.draw.rect(WINDOW, COLORS['outline'], grid_rect, 4)
-        pygame.draw.line(WINDOW, COLORS['outline'], (GAME_WIDTH, 0), (GAME_WIDTH, HEIGHT), 3)
+            py = grid_rect.y + y * TETRIS_BLOCK_SIZE
+            pygame.draw.line(background, (60, 60, 60), (grid_rect.x, py), (grid_rect.right, py))
+        pygame.draw.rect(background, COLORS['outline'], grid_rect, 4)
+        pygame.draw.line(background, COLORS['outline'], (GAME_WIDTH, 0), (GAME_WIDTH, HEIGHT), 3)
+        return background
+
+    @staticmethod
+    def draw_cell(surface, color, px, py, outline_only=False):
+        """한 칸 그리기 (px, py는 칸의 왼쪽 위 픽셀)"""
+        rect = pygame.Rect(px + 1, py + 1, TETRIS_BLOCK_SIZE - 2, TETRIS_BLOCK_SIZE - 2)
+        if outline_only:
+            pygame.draw.rect(surface, color, rect, 2)
+        else:
+            pygame.draw.rect(surface, color, rect)
+            pygame.draw.rect(surface, COLORS['white'], rect, 2)
+
+    def render(self, game, full=False):
+        """화면에 그리고 바뀐 사각형 목록 반환 (full이면 전체를 다시 그림)"""
+        if full or self.stale:
+            self.stale = full  # 이번 프레임 위에 다른 것이 그려지면 다음 프레임도 전체
+            WINDOW.blit(self.background, (0, 0))
+            self._sync_board(game)
+            WINDOW.blit(self.board_layer, self.BOARD_RECT)
+            self.piece_key = self._piece_key(game)
+            self.piece_rects = self._draw_piece(game)
+            self.garbage_key = self._draw_garbage(game)
+            self.panel_key = game.panel_key()
+            game.draw_panel()
+            return [WINDOW.get_rect()]
+
+        rects = []
+        changed_rows = self._sync_board(game)
+        piece_key = self._piece_key(game)
+        if changed_rows or piece_key != self.piece_key:
+            for rect in changed_rows:
+                WINDOW.blit(self.board_layer, rect, rect.move(-TETRIS_OFFSET_X, -TETRIS_OFFSET_Y))
+            for rect in self.piece_rects:
+                self._restore(rect)
+            rects += changed_rows + self.piece_rects
+            self.piece_key = piece_key
+            self.piece_rects = self._draw_piece(game)
+            rects += self.piece_rects
+
+        if min(game.garbage_queue.total, TETRIS_GRID_HEIGHT) != self.garbage_key:
+            WINDOW.blit(self.background, self.GARBAGE_RECT, self.GARBAGE_RECT)
+            self.garbage_key = self._draw_garbage(game)
+            rects.append(self.GARBAGE_RECT)
+
+        panel_key = game.panel_key()
+        if panel_key != self.panel_key:
+            self.panel_key = panel_key
+            WINDOW.blit(self.background, self.PANEL_RECT, self.PANEL_RECT)
+            game.draw_panel()
+            rects.append(self.PANEL_RECT)
+        return rects
+
+    def _sync_board(self, game):
+        """고정 블록 층에서 바뀐 줄만 다시 그림. 바뀐 줄의 화면 사각형 목록 반환"""
+        if game.grid_version == self.grid_version:
+            return []
+        self.grid_version = game.grid_version
+        changed = []
+        for y, row in enumerate(game.grid):
+            row = tuple(row)
+            if row == self.rows[y]:
+                continue
+            self.rows[y] = row
+            strip = pygame.Rect(0, y * TETRIS_BLOCK_SIZE, self.BOARD_RECT.width, TETRIS_BLOCK_SIZE)
+            self.board_layer.blit(self.background, strip, strip.move(TETRIS_OFFSET_X, TETRIS_OFFSET_Y))
+            for x, color in enumerate(row):
+                if color:
+                    self.draw_cell(self.board_layer, color, x * TETRIS_BLOCK_SIZE, y * TETRIS_BLOCK_SIZE)
+            changed.append(strip.move(TETRIS_OFFSET_X, TETRIS_OFFSET_Y))
+        if changed:
+            pygame.draw.rect(self.board_layer, COLORS['outline'], self.board_layer.get_rect(), 4)
+        return changed
+
+    @staticmethod
+    def _piece_key(game):
+        if game.game_over:
+            return None
+        block = game.current_block
+        return (block.shape_name, block.rotation, block.x, block.y, block.y + game.drop_distance())
+
+    def _draw_piece(self, game):
+        """고스트와 현재 블록 그리기. 그린 사각형 (고스트, 블록) 반환"""
+        if game.game_over:
+            return []
+        block = game.current_block
+        cells = [(x, y) for y, row in enumerate(block.shape) for x, cell in enumerate(row) if cell]
+        ghost_y = block.y + game.drop_distance()
+        drawn = []
+        for top, outline_only in ((ghost_y, True), (block.y, False)):
+            left = TETRIS_OFFSET_X + block.x * TETRIS_BLOCK_SIZE
+            upper = TETRIS_OFFSET_Y + top * TETRIS_BLOCK_SIZE
+            for x, y in cells:
+                if outline_only and top + y < 0:
+                    continue
+                self.draw_cell(WINDOW, block.color, left + x * TETRIS_BLOCK_SIZE,
+                               upper + y * TETRIS_BLOCK_SIZE, outline_only)
+            size = len(block.shape) * TETRIS_BLOCK_SIZE
+            drawn.append(pygame.Rect(left, upper, size, size).clip(WINDOW.get_rect()))
+        pygame.draw.rect(WINDOW, COLORS['outline'], self.BOARD_RECT, 4)  # 테두리가 블록 위에 오도록
+        return drawn
+
+    def _restore(self, rect):
+        """rect 자리를 배경 + 고정 블록 층으로 되돌림"""
+        WINDOW.blit(self.background, rect, rect)
+        board = rect.clip(self.BOARD_RECT)
+        if board:
+            WINDOW.blit(self.board_layer, board, board.move(-TETRIS_OFFSET_X, -TETRIS_OFFSET_Y))
+
+    def _draw_garbage(self, game):
+        """받을 쓰레기 줄 게이지 (보드 왼쪽)"""
+        pending = min(game.garbage_queue.total, TETRIS_GRID_HEIGHT)
+        if pending:
+            meter_h = pending * TETRIS_BLOCK_SIZE
+            pygame.draw.rect(WINDOW, COLORS['red'],
+                             (self.GARBAGE_RECT.x, self.BOARD_RECT.bottom - meter_h, 8, meter_h))
+        return pending
+
+class Tetris(TetrisEngine):
+    """테트리스 화면/키보드/리더보드 (규칙은 TetrisEngine)"""
+    def __init__(self, is_multiplayer=False, seed=None, bitboard=True):
+        super().__init__(is_multiplayer, seed, bitboard)
+        self.game_over_timer = 0
+        self.entering_pw = False
+        self.pw_input = ""
+        self.leaderboard = LeaderboardManager.load(GAME_TETRIS) if not is_multiplayer else None
+        self.renderer = TetrisRenderer()
+
+    @staticmethod
+    def read_held_keys():
+        """현재 누르고 있는 이동 키를 입력 비트로 변환"""
+        keys = pygame.key.get_pressed()
+        held = 0
+        if keys[pygame.K_LEFT] or keys[pygame.K_KP4]:
+            held |= TETRIS_INPUT_LEFT
+        if keys[pygame.K_RIGHT] or keys[pygame.K_KP6]:
+            held |= TETRIS_INPUT_RIGHT
+        if keys[pygame.K_DOWN] or keys[pygame.K_KP2]:
+            held |= TETRIS_INPUT_DOWN
+        return held
+
+    def on_game_over(self):
+        """싱글플레이는 리더보드에 기록"""
+        if not self.is_multiplayer:
+            self.leaderboard = LeaderboardManager.update(GAME_TETRIS, self.score, student_id=CURRENT_STUDENT_ID)
+
+    def update(self, dt, held=None):
+        """게임 업데이트 (held가 없으면 키보드 상태를 직접 읽음)"""
+        if held is None:
+            held = self.read_held_keys()
+        super().update(dt, held)
+
+    def draw(self, update_display=True):
+        """게임 화면 그리기 (update_display=False면 화면 갱신은 호출한 쪽에서)
+
+        바뀐 부분만 다시 그려서 그 사각형만 화면에 올린다.
+        위에 덮어 그리는 화면(비밀번호 입력, 게임 오버, 대전 화면)이 있으면 전체를 다시 그린다.
+        """
+        overlay = self.entering_pw or (self.game_over and not self.is_multiplayer)
+        full = overlay or not update_display
+        rects = self.renderer.render(self, full)
+
+        # 오버레이
+        if self.entering_pw:
+            UIDrawer.password_overlay(self.pw_input)
+        elif self.game_over and not self.is_multiplayer:
+            UIDrawer.game_over_screen()
         
+        if update_display:
+            if full:
+                pygame.display.update()
+            elif rects:
+                pygame.display.update(rects)
+
+    def panel_key(self):
+        """오른쪽 패널에 보이는 값들 (바뀌었을 때만 패널을 다시 그림)"""
+        remaining = None
+        if self.time_limit is not None:
+            remaining = int(max(0, self.time_limit - self.elapsed_ms / 1000))
+        label = self.clear_label if self.clear_label_timer > 0 else ""
+        return (self.score, self.level, self.lines_cleared, remaining, self.combo, self.back_to_back,
+                label, self.hold_block, self.can_hold, tuple(self.next_pieces[:4]),
+                self.leaderboard, ADMIN_MODE)
+
+    def draw_panel(self):
+        """오른쪽 패널 (점수, 홀드, 다음 블록, 조작법, 순위표)"""
         # 관리자 모드 표시
         if ADMIN_MODE:
             UIDrawer.admin_mode_overlay()
-        
+
         # 우측 패널
         y = UIDrawer.panel_header("점수:", self.score)
-        WINDOW.blit(FONTS['small'].render("레벨:", True, COLORS['font']), (GAME_WIDTH + 10, y))
-        WINDOW.blit(FONTS['small'].render(str(self.level), True, COLORS['font']), (GAME_WIDTH + 10, y + 25))
+        WINDOW.blit(TextCache.render('small', "레벨:", COLORS['font']), (GAME_WIDTH + 10, y))
+        WINDOW.blit(TextCache.render('small', str(self.level), COLORS['font']), (GAME_WIDTH + 10, y + 25))
         y += 50
-        WINDOW.blit(FONTS['small'].render("라인:", True, COLORS['font']), (GAME_WIDTH + 10, y))
-        WINDOW.blit(FONTS['small'].render(str(self.lines_cleared), True, COLORS['font']), (GAME_WIDTH + 10, y + 25))
+        WINDOW.blit(TextCache.render('small', "라인:", COLORS['font']), (GAME_WIDTH + 10, y))
+        WINDOW.blit(TextCache.render('small', str(self.lines_cleared), COLORS['font']), (GAME_WIDTH + 10, y + 25))
         y += 50
 
-        # 타이머 표시
-        elapsed_seconds = (pygame.time.get_ticks() - self.game_start_time) / 1000
-        remaining_time = max(0, self.time_limit - elapsed_seconds)
-        timer_color = COLORS['red'] if remaining_time <= 10 else COLORS['font']
-        WINDOW.blit(FONTS['small'].render("시간:", True, timer_color), (GAME_WIDTH + 10, y))
-        WINDOW.blit(FONTS['small'].render(f"{int(remaining_time)}초", True, timer_color), (GAME_WIDTH + 10, y + 25))
-        y += 50
+        # 타이머 표시 (멀티플레이는 시간 제한 없음)
+        if self.time_limit is not None:
+            elapsed_seconds = self.elapsed_ms / 1000
+            remaining_time = max(0, self.time_limit - elapsed_seconds)
+            timer_color = COLORS['red'] if remaining_time <= 10 else COLORS['font']
+            WINDOW.blit(TextCache.render('small', "시간:", timer_color), (GAME_WIDTH + 10, y))
+            WINDOW.blit(TextCache.render('small', f"{int(remaining_time)}초", timer_color), (GAME_WIDTH + 10, y + 25))
+            y += 50
 
         # 콤보와 B2B 표시
         if self.combo >= 0:
-            WINDOW.blit(FONTS['small'].render("콤보:", True, COLORS['yellow']), (GAME_WIDTH + 10, y))
-            WINDOW.blit(FONTS['small'].render(f"{self.combo + 1}", True, COLORS['yellow']), (GAME_WIDTH + 10, y + 25))
+            WINDOW.blit(TextCache.render('small', "콤보:", COLORS['yellow']), (GAME_WIDTH + 10, y))
+            WINDOW.blit(TextCache.render('small', f"{self.combo + 1}", COLORS['yellow']), (GAME_WIDTH + 10, y + 25))
             y += 50
         
         if self.back_to_back:
-            WINDOW.blit(FONTS['small'].render("B2B!", True, COLORS['gold']), (GAME_WIDTH + 10, y))
+            WINDOW.blit(TextCache.render('small', "B2B!", COLORS['gold']), (GAME_WIDTH + 10, y))
             y += 35
+
+        if self.clear_label_timer > 0 and self.clear_label:
+            WINDOW.blit(TextCache.render('tiny', self.clear_label, COLORS['purple']), (GAME_WIDTH + 10, y))
+            y += 25
         
         # 홀드 블록 표시
-        WINDOW.blit(FONTS['small'].render("홀드:", True, COLORS['font']), (GAME_WIDTH + 10, y))
+        WINDOW.blit(TextCache.render('small', "홀드:", COLORS['font']), (GAME_WIDTH + 10, y))
         y += 30
         
         if self.hold_block:
@@ -2156,7 +3437,7 @@ class Tetris:
         y += 10
 
         # 다음 블록 4개 미리보기
-        WINDOW.blit(FONTS['small'].render("다음:", True, COLORS['font']), (GAME_WIDTH + 10, y))
+        WINDOW.blit(TextCache.render('small', "다음:", COLORS['font']), (GAME_WIDTH + 10, y))
         y += 30
 
         preview_size = 15  # 4개를 보여주기 위해 크기 축소
@@ -2194,21 +3475,14 @@ class Tetris:
             "Shift C: 홀드"
         ]
         for i, text in enumerate(controls):
-            WINDOW.blit(FONTS['tiny'].render(text, True, COLORS['font']), 
+            WINDOW.blit(TextCache.render('tiny', text, COLORS['font']), 
                        (GAME_WIDTH + 10, y + i * 16))
         
         y += len(controls) * 16 + 10
         UIDrawer.panel_separator(y)
-        UIDrawer.leaderboard(self.leaderboard, y + 10)
-        
-        # 오버레이
-        if self.entering_pw:
-            UIDrawer.password_overlay(self.pw_input)
-        elif self.game_over:
-            UIDrawer.game_over_screen()
-        
-        pygame.display.update()
-    
+        if self.leaderboard is not None:
+            UIDrawer.leaderboard(self.leaderboard, y + 10)
+
     def handle_event(self, event):
         """이벤트 처리"""
         if event.type != pygame.KEYDOWN:
@@ -2231,57 +3505,409 @@ class Tetris:
         else:
             if event.key == pygame.K_ESCAPE:
                 return MENU
-            elif event.key == pygame.K_F12 and not self.game_over:
+            elif event.key == pygame.K_F12 and not self.game_over and not self.is_multiplayer:
                 self.entering_pw = True
             elif not self.game_over:
                 # 좌우하 방향키는 update()에서 처리하므로 제외
-                
-                # 하드 드롭 (SPACE, NUMPAD8)
-                if event.key in [pygame.K_SPACE, pygame.K_KP8]:
-                    self.hard_drop()
-                
-                # 시계방향 회전 (UP, X, NUMPAD1, NUMPAD5, NUMPAD9)
-                elif event.key in [pygame.K_UP, pygame.K_x, pygame.K_KP1, pygame.K_KP5, pygame.K_KP9]:
-                    self.rotate_block(clockwise=True)
-                
-                # 반시계방향 회전 (CTRL, Z, NUMPAD3, NUMPAD7)
-                elif event.key in [pygame.K_LCTRL, pygame.K_RCTRL, pygame.K_z, pygame.K_KP3, pygame.K_KP7]:
-                    self.rotate_block(clockwise=False)
-                
-                # 180도 회전 (A)
-                elif event.key == pygame.K_a:
-                    self.rotate_180()
-                
-                # 홀드 (SHIFT, C, NUMPAD0)
-                elif event.key in [pygame.K_LSHIFT, pygame.K_RSHIFT, pygame.K_c, pygame.K_KP0]:
-                    self.hold_piece()
+                action = TETRIS_ACTION_KEYS.get(event.key)
+                if action:
+                    self.apply_action(action)
         
         return GAME_TETRIS
 
 def run_tetris():
     """테트리스 게임 실행"""
     game = Tetris()
-    clock = pygame.time.Clock()
+    frames = FixedStepLoop("테트리스")
 
     while True:
-        dt = clock.tick(FPS)
-
-        # 게임 오버 후 5초 자동 메뉴 복귀
-        if game.game_over:
-            game.game_over_timer += 1
-            if game.game_over_timer >= 300:  # 5초 (60 FPS * 5)
-                return MENU
+        events = frames.wait()
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 return None
             result = game.handle_event(event)
             if result != GAME_TETRIS:
                 return result
 
-        game.update(dt)
+        for _ in range(frames.steps):
+            # 게임 오버 후 5초 자동 메뉴 복귀
+            if game.game_over:
+                game.game_over_timer += 1
+                if game.game_over_timer >= 300:  # 5초 (60 스텝 * 5)
+                    return MENU
+            game.update(frames.STEP_MS)
         game.draw()
 
+def run_tetris_benchmark(pieces=20000, seed=1):
+    """화면 없이 엔진만 step()으로 돌려서 초당 처리 블록 수 측정
+
+    블록마다 무작위 회전 1틱 + 좌우 이동(누름/뗌 반복) + 하드 드롭 1틱.
+    dt=0으로 진행하므로 키 반복 타이머 없이 틱마다 한 칸씩 움직인다.
+    """
+    pieces = int(pieces)
+    rng = random.Random(int(seed))
+    game = TetrisEngine(is_multiplayer=True, seed=rng.getrandbits(32))
+    ticks = games = lines = 0
+    rotations = (0, TETRIS_INPUT_ROTATE_CW, TETRIS_INPUT_ROTATE_CCW, TETRIS_INPUT_ROTATE_180)
+
+    start = time.perf_counter()
+    for _ in range(pieces):
+        game.step(rng.choice(rotations), 0)
+        shift = rng.randint(-5, 5)
+        key = TETRIS_INPUT_LEFT if shift < 0 else TETRIS_INPUT_RIGHT
+        for _ in range(abs(shift)):
+            game.step(key, 0)
+            game.step(0, 0)
+        game.step(TETRIS_INPUT_HARD_DROP, 0)
+        ticks = ticks + 2 + 2 * abs(shift)
+        if game.game_over:
+            games += 1
+            lines += game.lines_cleared
+            game = TetrisEngine(is_multiplayer=True, seed=rng.getrandbits(32))
+    elapsed = time.perf_counter() - start
+
+    print(f"블록 {pieces}개, {ticks}틱, 게임 {games + 1}판 (지운 줄 {lines + game.lines_cleared})")
+    print(f"  {pieces / elapsed:,.0f} 블록/초, {ticks / elapsed:,.0f} 틱/초 "
+          f"(실시간 60FPS의 {ticks / elapsed / FPS:,.0f}배)")
+
+def run_bitboard_benchmark(count=20000, seed=1):
+    """list-of-lists 보드와 비트보드의 충돌 판정/줄 검사 속도 비교"""
+    count = int(count)
+    rng = random.Random(int(seed))
+    boards = {'list': TetrisEngine(is_multiplayer=True, bitboard=False),
+              'bitboard': TetrisEngine(is_multiplayer=True, bitboard=True)}
+    grid = [[0] * TETRIS_GRID_WIDTH for _ in range(TETRIS_GRID_HEIGHT)]
+    for y in range(TETRIS_GRID_HEIGHT // 2, TETRIS_GRID_HEIGHT):
+        for x in range(TETRIS_GRID_WIDTH):
+            if rng.random() < 0.7:
+                grid[y][x] = TETRIS_COLORS['J']
+        grid[y][rng.randrange(TETRIS_GRID_WIDTH)] = 0  # 꽉 찬 줄 없게
+    for game in boards.values():
+        game.grid = [row[:] for row in grid]
+        game.mark_grid_changed()
+
+    # 무작위 블록/위치 (보드 밖 포함)
+    probes = []
+    for _ in range(count):
+        block = TetrisBlock(rng.choice(TETRIS_PIECE_ORDER))
+        for _ in range(rng.randrange(4)):
+            block.rotate()
+        block.x = rng.randint(-2, TETRIS_GRID_WIDTH)
+        block.y = rng.randint(-2, TETRIS_GRID_HEIGHT)
+        probes.append(block)
+
+    def best_us(func, repeat=5):
+        """repeat번 재서 가장 빠른 값 (1회당 us)"""
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best / count * 1e6
+
+    results = {}
+    print(f"충돌 판정 {count}회, 줄 검사 {count}회 (아래 절반이 70% 찬 보드, 5회 중 최고)")
+    for name, game in boards.items():
+        valid = game.valid_position
+        clear = game.clear_lines
+        results[name] = [valid(block) for block in probes]
+        collide_us = best_us(lambda: [valid(block) for block in probes])
+        clear_us = best_us(lambda: [clear() for _ in range(count)])
+
+        # 실제 플레이: 무작위 위치에 하드 드롭
+        play = TetrisEngine(is_multiplayer=True, seed=int(seed), bitboard=name == 'bitboard')
+        play_rng = random.Random(int(seed))
+        pieces = count // 4
+        start = time.perf_counter()
+        for _ in range(pieces):
+            for _ in range(play_rng.randrange(4)):
+                play.rotate_block()
+            play.move(play_rng.randint(-5, 5), 0)
+            while play.move(-1 if play_rng.random() < 0.5 else 1, 0) and play_rng.random() < 0.5:
+                pass
+            play.hard_drop()
+            if play.game_over:
+                play = TetrisEngine(is_multiplayer=True, seed=play_rng.getrandbits(32),
+                                    bitboard=name == 'bitboard')
+        pieces_per_sec = pieces / (time.perf_counter() - start)
+        print(f"  {name:8s} 충돌 {collide_us:5.2f}us  줄 검사 {clear_us:5.2f}us  "
+              f"플레이 {pieces_per_sec:,.0f} 블록/초")
+
+    same = results['list'] == results['bitboard']
+    print(f"두 방식 판정 결과 일치: {'OK' if same else 'FAIL'}")
+    return same
+
+def run_rotation_test(count=100000):
+    """SRS 회전 표/킥 확인 + 회전 속도 (예전 zip 회전과 비교)"""
+    count = int(count)
+    checks = []
+
+    def check(name, ok):
+        checks.append(ok)
+        print(f"  [{'OK' if ok else 'FAIL'}] {name}")
+
+    same = True
+    for name in TETRIS_SHAPES:
+        block = TetrisBlock(name)
+        spawn = block.shape
+        block.rotate(1)
+        block.rotate(3)
+        same &= block.shape is spawn
+        for _ in range(4):
+            block.rotate()
+        same &= block.shape is spawn
+    check("4번 회전 / 시계+반시계 = 원래 모양", same)
+    check("JLSTZ 0→R 킥 (y 아래쪽 기준)",
+          TETRIS_KICKS['T'][(0, 1)] == [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)])
+    check("I 스폰 위치 (3~6열, 맨 윗줄)",
+          [(TetrisBlock('I').x + x, TetrisBlock('I').y + y)
+           for y, row in enumerate(TetrisBlock('I').shape) for x, c in enumerate(row) if c]
+          == [(3, 0), (4, 0), (5, 0), (6, 0)])
+
+    # 오른쪽 벽에 붙은 세로 I를 돌리면 킥으로 안쪽으로 들어옴
+    game = TetrisEngine(is_multiplayer=True, seed=1)
+    game.current_block = TetrisBlock('I')
+    game.current_block.rotation = 1
+    game.current_block.x, game.current_block.y = TETRIS_GRID_WIDTH - 3, 5
+    while game.move(1, 0):
+        pass
+    check("벽에 붙은 I 회전 (벽 킥)", game.rotate_block() and game.last_kick > 0)
+
+    # T스핀 트리플: 0→R 회전의 5번째 킥(왼쪽 1, 아래 2)으로만 들어가는 자리
+    game = TetrisEngine(is_multiplayer=True, seed=1)
+    fill = TETRIS_COLORS['J']
+    rows = {15: "1111100000", 16: "1111000000", 17: "1111011111",
+            18: "1111001111", 19: "1111011111"}
+    for y, pattern in rows.items():
+        game.grid[y] = [fill if c == '1' else 0 for c in pattern]
+    game.mark_grid_changed()
+    game.current_block = TetrisBlock('T')
+    game.current_block.x, game.current_block.y = 4, 15
+    rotated = game.rotate_block() and game.last_kick == 4
+    spin = game.detect_t_spin()
+    game.lock_block()
+    check("T스핀 트리플 킥 (5번째 시도)", rotated and spin == 'full' and game.lines_cleared == 3)
+
+    block = TetrisBlock('T')
+    start = time.perf_counter()
+    for _ in range(count):
+        block.rotate()
+    table_us = (time.perf_counter() - start) / count * 1e6
+
+    shape = [row[:] for row in TETRIS_SHAPES['T']]
+    start = time.perf_counter()
+    for _ in range(count):
+        shape = [list(row) for row in zip(*shape[::-1])]
+    zip_us = (time.perf_counter() - start) / count * 1e6
+
+    game = TetrisEngine(is_multiplayer=True, seed=1)
+    game.move(0, 8)
+    start = time.perf_counter()
+    for _ in range(count):
+        game.rotate_block(clockwise=True)
+    kick_us = (time.perf_counter() - start) / count * 1e6
+    print(f"회전 {count}회: 표 조회 {table_us:.2f}us, 예전 zip 회전 {zip_us:.2f}us, "
+          f"킥 포함 rotate_block {kick_us:.2f}us")
+
+    print(f"{sum(checks)}/{len(checks)} 통과")
+    return all(checks)
+
+def run_drop_benchmark(count=20000, seed=1):
+    """열 높이 기반 낙하 거리와 한 칸씩 내려가며 확인하는 방식 비교"""
+    count = int(count)
+    rng = random.Random(int(seed))
+    game = TetrisEngine(is_multiplayer=True, seed=int(seed))
+    for y in range(TETRIS_GRID_HEIGHT // 2, TETRIS_GRID_HEIGHT):
+        for x in range(TETRIS_GRID_WIDTH):
+            if rng.random() < 0.6:
+                game.grid[y][x] = TETRIS_COLORS['J']
+    game.mark_grid_changed()
+
+    # 무작위 위치에 있는 블록들 (보드 안쪽 빈 공간, 즉 튀어나온 곳 아래 포함)
+    blocks = []
+    while len(blocks) < count:
+        block = TetrisBlock(rng.choice(TETRIS_PIECE_ORDER))
+        block.rotate(rng.randrange(4))
+        block.x = rng.randint(-1, TETRIS_GRID_WIDTH - 1)
+        block.y = rng.randint(-1, TETRIS_GRID_HEIGHT - 2)
+        if game.valid_position(block):
+            blocks.append(block)
+
+    def step_down():
+        distance = 0
+        while game.valid_position(offset_y=distance + 1):
+            distance += 1
+        return distance
+
+    results = {}
+    for name, func in (('한 칸씩', step_down), ('열 높이', game.drop_distance)):
+        start = time.perf_counter()
+        out = []
+        for block in blocks:
+            game.current_block = block
+            out.append(func())
+        results[name] = out
+        print(f"  {name}: {(time.perf_counter() - start) / count * 1e6:6.2f}us/블록")
+
+    # 같은 블록에 대해 매 프레임 다시 묻는 경우 (고스트 + 착지 확인)
+    game.current_block = blocks[0]
+    start = time.perf_counter()
+    for _ in range(count):
+        game.drop_distance()
+    print(f"  캐시 적중: {(time.perf_counter() - start) / count * 1e6:6.2f}us/회")
+
+    same = results['한 칸씩'] == results['열 높이']
+    print(f"두 방식 결과 일치: {'OK' if same else 'FAIL'} (평균 낙하 {sum(results['열 높이']) / count:.1f}칸)")
+    return same
+
+def run_render_benchmark(frames=600, seed=1):
+    """Tetris 화면 한 프레임 비용: 매번 전체 다시 그리기 vs 바뀐 부분만 (CPU가 0.5초마다 한 블록)"""
+    frames, seed = int(frames), int(seed)
+    for name, full in (('전체 다시 그리기', True), ('바뀐 부분만', False)):
+        game = Tetris(is_multiplayer=True, seed=seed)
+        bot = TetrisBot('normal', seed=seed)
+        rng = random.Random(seed)
+        pixels = 0
+        start = time.perf_counter()
+        for frame in range(frames):
+            if frame % 30 == 29:
+                bot.play(game)
+            elif frame % 6 == 0:
+                game.move(rng.choice((-1, 1)), 0)
+            game.update(1000 / FPS, 0)
+            rects = game.renderer.render(game, full)
+            pygame.display.update(rects)
+            pixels += sum(rect.width * rect.height for rect in rects)
+        elapsed = time.perf_counter() - start
+        print(f"  {name}: {elapsed / frames * 1000:.3f}ms/프레임, "
+              f"화면 갱신 {pixels / frames / (WIDTH * HEIGHT) * 100:.1f}%")
+
+def run_text_benchmark(frames=300):
+    """글자 캐시 확인: 2048 화면과 테트리스 전체 화면을 계속 그릴 때 프레임당 래스터화 횟수"""
+    frames = int(frames)
+    game_2048 = Game2048()
+    tetris = Tetris(is_multiplayer=True, seed=1)
+
+    def frame():
+        game_2048.draw()
+        tetris.renderer.render(tetris, full=True)
+
+    max_bytes = TextCache.MAX_BYTES
+    steady_misses = None
+    for name, limit in (('캐시 없음', 0), ('캐시', max_bytes)):
+        TextCache.clear()
+        TextCache.MAX_BYTES = limit
+        frame()  # 첫 프레임은 캐시를 채움
+        before = TextCache.stats()
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame()
+        elapsed = time.perf_counter() - start
+        after = TextCache.stats()
+        steady_misses = after['misses'] - before['misses']
+        print(f"  {name}: {elapsed / frames * 1000:.3f}ms/프레임, "
+              f"프레임당 래스터화 {steady_misses / frames:.1f}회, 적중 {(after['hits'] - before['hits']) / frames:.1f}회")
+    TextCache.MAX_BYTES = max_bytes
+    stats = TextCache.stats()
+    print(f"캐시 {stats['items']}개, {stats['bytes'] / 1024:.0f}KB")
+    return steady_misses == 0
+
+def run_particle_benchmark(frames=300, seed=1):
+    """파티클 도장 캐시 확인: 줄이 계속 터지는 블록 블라스트 화면에서 파티클 그리기 시간"""
+    frames, seed = int(frames), int(seed)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+
+    def play():
+        """같은 시드로 파티클을 계속 터뜨리며 그리기, (그리기 시간, 그린 파티클 수) 반환"""
+        random.seed(seed)
+        particles = ParticleSystem()
+        drawn = 0
+        elapsed = 0.0
+        for step in range(frames):
+            if step % 10 == 0:
+                for i in range(8):
+                    particles.add_explosion(200 + i * 50, 300, BLOCKBLAST_COLORS[i % len(BLOCKBLAST_COLORS)], 25)
+                    particles.add_sparkle(200 + i * 50, 300, 15)
+                particles.add_confetti(GAME_WIDTH // 2, HEIGHT // 2, 100)
+            particles.update()
+            surface.fill(COLORS['black'])
+            start = time.perf_counter()
+            particles.draw(surface)
+            elapsed += time.perf_counter() - start
+            drawn += len(particles)
+        return elapsed, drawn
+
+    max_bytes = StampCache.MAX_BYTES
+    results = {}
+    for name, limit in (('캐시 없음', 0), ('캐시', max_bytes)):
+        StampCache.clear()
+        StampCache.MAX_BYTES = limit
+        elapsed, drawn = play()
+        stats = StampCache.stats()
+        results[name] = elapsed
+        print(f"  {name}: {elapsed / frames * 1000:.3f}ms/프레임 (평균 {drawn / frames:.0f}개), "
+              f"도장 새로 그림 {stats['misses']}회, 적중 {stats['hits']}회")
+    StampCache.MAX_BYTES = max_bytes
+    stats = StampCache.stats()
+    print(f"도장 {stats['items']}개, {stats['bytes'] / 1024:.0f}KB, "
+          f"{results['캐시 없음'] / results['캐시']:.1f}배 빠름")
+    return results['캐시'] < results['캐시 없음']
+
+def run_floating_text_benchmark(rounds=20):
+    """떠오르는 텍스트 확인: 블록 블라스트 콤보/점수 팝업을 예전 방식(매 프레임 래스터화+확대)과 비교"""
+    rounds = int(rounds)
+    popups = [("+1500", COLORS['green'], 'huge'), ("+480", COLORS['gold'], 'large'),
+              ("COMBO x3!", COLORS['orange'], 'large'), ("+10", COLORS['blue'], 'small')]
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    reference = pygame.Surface((WIDTH, HEIGHT))
+
+    def draw_reference(t, target):
+        """예전 FloatingText.draw"""
+        alpha = int(255 * (1 - t.age / t.lifetime))
+        if alpha > 0:
+            text_surf = FONTS[t.size].render(t.text, True, t.color)
+            text_surf.set_alpha(alpha)
+            scale = 1.0 + (1 - t.age / t.lifetime) * 0.3
+            if scale != 1.0:
+                text_surf = pygame.transform.scale(
+                    text_surf, (int(text_surf.get_width() * scale), int(text_surf.get_height() * scale)))
+            target.blit(text_surf, (int(t.x - text_surf.get_width() // 2), int(t.y)))
+
+    def play(draw, target, check=False):
+        """팝업을 조금씩 어긋나게 띄우며 전부 사라질 때까지 그리기, (그리기 시간, 다른 프레임 수) 반환"""
+        elapsed = 0.0
+        mismatches = 0
+        for _ in range(rounds):
+            texts = FloatingTextSystem()
+            for step in range(60 + 10 * len(popups)):
+                if step % 10 == 0 and step // 10 < len(popups):
+                    text, color, size = popups[step // 10]
+                    texts.add_text(400, 500, text, color, size)
+                target.fill(COLORS['black'])
+                start = time.perf_counter()
+                for t in texts.texts:
+                    draw(t, target)
+                elapsed += time.perf_counter() - start
+                if check:
+                    reference.fill(COLORS['black'])
+                    for t in texts.texts:
+                        draw_reference(t, reference)
+                    if pygame.image.tobytes(reference, 'RGB') != pygame.image.tobytes(target, 'RGB'):
+                        mismatches += 1
+                texts.update()
+        return elapsed, mismatches
+
+    _, mismatches = play(FloatingText.draw, surface, check=True)
+    old, _ = play(draw_reference, reference)
+    new, _ = play(FloatingText.draw, surface)
+    frames = rounds * (60 + 10 * len(popups))
+    print(f"  예전: {old / frames * 1000:.3f}ms/프레임")
+    print(f"  확대본: {new / frames * 1000:.3f}ms/프레임 ({old / new:.1f}배 빠름)")
+    print(f"예전 방식과 다른 프레임: {mismatches}/{frames}")
+    return mismatches == 0
+
 # ==================== 테트리스 멀티플레이 (Tetrio 스타일) ====================
 
 # Tetrio 공격 데미지 테이블
@@ -2299,13 +3925,1482 @@ TETRIO_ATTACK_TABLE = {
     'all_clear': 10   # Perfect Clear
 }
 
+# ==================== 공격/쓰레기 줄 ====================
+class TetrisAttack:
+    """줄 제거 결과 → 공격 줄 수 (TETRIO_ATTACK_TABLE 기준)"""
+    CLEAR_NAMES = {1: 'single', 2: 'double', 3: 'triple', 4: 'tetris'}
+    T_SPIN_NAMES = {1: 't_spin_single', 2: 't_spin_double', 3: 't_spin_triple'}
+
+    @staticmethod
+    def is_difficult(lines, t_spin):
+        """B2B 대상 클리어 (4줄, 줄을 지운 T스핀)"""
+        return lines == 4 or (lines > 0 and t_spin is not None)
+
+    @staticmethod
+    def calculate(lines, t_spin=None, combo=0, back_to_back=False, all_clear=False):
+        """공격 줄 수 계산
+
+        combo: 이번 클리어가 몇 번째 연속 클리어인지 (첫 클리어 = 0)
+        back_to_back: 직전 어려운 클리어가 이어지고 있는지
+        """
+        if lines <= 0:
+            return 0
+        table = TETRIO_ATTACK_TABLE
+        if t_spin == 'mini':
+            attack = table['t_spin_mini']
+        elif t_spin == 'full':
+            attack = table[TetrisAttack.T_SPIN_NAMES[min(lines, 3)]]
+        else:
+            attack = table[TetrisAttack.CLEAR_NAMES[min(lines, 4)]]
+
+        if back_to_back and TetrisAttack.is_difficult(lines, t_spin):
+            attack += table['b2b_bonus']
+        combo_table = table['combo_table']
+        attack += combo_table[min(max(combo, 0), len(combo_table) - 1)]
+        if all_clear:
+            attack += table['all_clear']
+        return attack
+
+    @staticmethod
+    def label(lines, t_spin=None, all_clear=False):
+        """화면에 보여줄 클리어 이름"""
+        if t_spin == 'mini':
+            name = "T-SPIN MINI"
+        elif t_spin == 'full':
+            name = "T-SPIN " + TetrisAttack.CLEAR_NAMES[min(lines, 3)].upper()
+        else:
+            name = TetrisAttack.CLEAR_NAMES[min(lines, 4)].upper()
+        return name + (" + ALL CLEAR" if all_clear else "")
+
+class GarbageQueue:
+    """받을 쓰레기 줄 대기열 (공격 하나 = [줄 수, 구멍 위치])
+
+    추가는 deque 끝에 O(1), 상쇄/꺼내기는 앞에서부터 소비하므로
+    공격 하나당 분할 상환 O(1). 남은 줄 수(total)는 따로 유지한다.
+    """
+    def __init__(self):
+        self.entries = deque()
+        self.total = 0
+
+    def push(self, lines, hole):
+        if lines > 0:
+            self.entries.append([lines, hole])
+            self.total += lines
+
+    def cancel(self, attack):
+        """내 공격으로 먼저 온 쓰레기 줄부터 상쇄. 상쇄하고 남은 공격 줄 수 반환"""
+        entries = self.entries
+        while attack > 0 and entries:
+            entry = entries[0]
+            used = min(attack, entry[0])
+            entry[0] -= used
+            attack -= used
+            self.total -= used
+            if entry[0] == 0:
+                entries.popleft()
+        return attack
+
+    def take(self, max_lines):
+        """먼저 온 것부터 최대 max_lines줄 꺼내기 → [(줄 수, 구멍 위치), ...]"""
+        entries = self.entries
+        batches = []
+        while max_lines > 0 and entries:
+            entry = entries[0]
+            lines = min(max_lines, entry[0])
+            batches.append((lines, entry[1]))
+            entry[0] -= lines
+            max_lines -= lines
+            self.total -= lines
+            if entry[0] == 0:
+                entries.popleft()
+        return batches
+
+def run_attack_test(events=200000):
+    """T스핀/공격 계산/쓰레기 줄 확인 + 대기열 처리 시간 측정"""
+    events = int(events)
+    checks = []
+
+    def check(name, ok):
+        checks.append(ok)
+        print(f"  [{'OK' if ok else 'FAIL'}] {name}")
+
+    # T스핀 더블: 아래 두 줄에 T 모양 구멍, 왼쪽 위에 지붕
+    game = TetrisEngine(is_multiplayer=True, seed=1)
+    fill = TETRIS_COLORS['J']
+    game.grid[19] = [fill] * TETRIS_GRID_WIDTH
+    game.grid[18] = [fill] * TETRIS_GRID_WIDTH
+    game.grid[19][4] = 0
+    game.grid[18][3] = game.grid[18][4] = game.grid[18][5] = 0
+    game.grid[17][3] = fill
+    game.mark_grid_changed()
+    game.current_block = TetrisBlock('T')
+    game.current_block.rotation = 2  # 아래를 향한 T
+    game.current_block.x, game.current_block.y = 3, 17
+    game.last_move_rotated = True
+    check("T스핀 판정", game.detect_t_spin() == 'full')
+    game.lock_block()
+    check("T스핀 더블 = 4줄 공격", game.outgoing_attack == 4 and game.lines_cleared == 2)
+    check("T스핀 후 B2B", game.back_to_back)
+
+    calc = TetrisAttack.calculate
+    check("테트리스 4, B2B 테트리스 5", calc(4) == 4 and calc(4, back_to_back=True) == 5)
+    check("B2B는 어려운 클리어에만", calc(2, back_to_back=True) == 1)
+    check("콤보 보너스", calc(1, combo=2) == 1 and calc(1, combo=50) == 5)
+    check("올 클리어", calc(4, all_clear=True) == 14)
+
+    queue = GarbageQueue()
+    queue.push(3, 0)
+    queue.push(4, 5)
+    left = queue.cancel(5)
+    check("상쇄 (7줄 대기 - 공격 5 = 2줄 대기, 남은 공격 0)", left == 0 and queue.total == 2)
+    check("상쇄 후 남은 공격", queue.cancel(6) == 4 and queue.total == 0)
+
+    game = TetrisEngine(is_multiplayer=True, seed=2)
+    game.receive_garbage(3)
+    game.receive_garbage(7)
+    game.hard_drop()
+    bottom = game.grid[-TETRIS_GARBAGE_CAP:]
+    holes = [row.count(0) for row in bottom]
+    check("한 번에 최대 8줄, 줄마다 구멍 1개",
+          holes == [1] * TETRIS_GARBAGE_CAP and game.garbage_queue.total == 2)
+
+    # 4명이 계속 공격을 주고받는 상황: 추가/상쇄/꺼내기 한 번당 시간
+    rng = random.Random(0)
+    queues = [GarbageQueue() for _ in range(4)]
+    ops = [(rng.randrange(4), rng.randrange(3), rng.randint(1, 6)) for _ in range(events)]
+    start = time.perf_counter()
+    for target, op, lines in ops:
+        queue = queues[target]
+        if op == 0:
+            queue.push(lines, lines)
+        elif op == 1:
+            queue.cancel(lines)
+        else:
+            queue.take(lines)
+    per_op = (time.perf_counter() - start) / events * 1e6
+    print(f"대기열 처리 {events}회: 1회당 {per_op:.2f}us (남은 대기 {sum(q.total for q in queues)}줄)")
+
+    print(f"{sum(checks)}/{len(checks)} 통과")
+    return all(checks)
+
+# ==================== 멀티플레이 통신 프로토콜 ====================
+class MsgType(IntEnum):
+    """메시지 종류 (1바이트)"""
+    WELCOME = 1       # 서버 → 클라이언트: player_id 배정
+    PLAYER_COUNT = 2  # 서버 → 전체: 대기실 인원
+    GAME_START = 3    # 서버 → 전체: 대전 시작
+    STATE = 4         # 보드 전체 상태 (동기화 없이 한 번에 보낼 때)
+    DISCONNECT = 5    # 연결 끊김 알림
+    BOARD_KEY = 6     # 보드 키프레임 (전체 보드 + 시퀀스 번호)
+    BOARD_DELTA = 7   # 보드 변경분 (바뀐 줄만 + 시퀀스 번호)
+    KEYFRAME_REQUEST = 8  # 특정 플레이어에게 키프레임 요청
+    INPUTS = 9        # 락스텝: 틱별 입력 묶음
+    CHECKSUM = 10     # 락스텝: 특정 틱의 보드 체크섬
+    ATTACK = 11       # 특정 플레이어에게 쓰레기 줄 공격
+    GARBAGE = 12      # 락스텝: 공격을 받은 틱 (상대 시뮬레이션에 같은 틱에 적용)
+
+# 보드 칸 코드 (4비트): 0 = 빈칸, 1~7 = 블록 종류, 8 = 쓰레기 줄, 15 = 알 수 없는 색
+TETRIS_PIECE_ORDER = ['I', 'O', 'T', 'S', 'Z', 'J', 'L']
+TETRIS_CELL_COLORS = [0] + [TETRIS_COLORS[name] for name in TETRIS_PIECE_ORDER] + [TETRIS_GARBAGE_COLOR]
+TETRIS_UNKNOWN_CELL = 15
+TETRIS_UNKNOWN_COLOR = (128, 128, 128)
+
+class TetrisProtocol:
+    """바이너리 메시지 인코더/디코더 (pickle 대체)
+
+    페이로드 = 헤더(버전, 종류, 보낸 사람) + 종류별 본문.
+    10x20 보드는 칸당 4비트로 100바이트에 담는다.
+    TCP 스트림 위의 프레이밍(4바이트 길이 접두)은 TetrisNetwork가 담당한다.
+    """
+    VERSION = 4
+    NO_PLAYER = 255
+    HEADER = struct.Struct('!BBB')          # version, type, sender
+    BYTE = struct.Struct('!B')
+    START = struct.Struct('!BBI')           # player_count, flags, seed
+    INPUTS = struct.Struct('!IB')           # 시작 틱, 틱 수 (+ 틱당 입력 1바이트)
+    CHECKSUM = struct.Struct('!II')         # 틱, crc32
+    ATTACK = struct.Struct('!BB')           # 대상 player_id, 줄 수
+    GARBAGE = struct.Struct('!IB')          # 받은 틱, 줄 수
+    STATE = struct.Struct('!IBBBbbBH')      # score, flags, rank, block, x, y, dims, shape bits
+    SEQ = struct.Struct('!H')               # 보드 동기화 시퀀스 번호
+    ROW_MASK = struct.Struct('!I')          # 바뀐 줄 비트마스크 (20줄)
+    GRID_BYTES = TETRIS_GRID_WIDTH * TETRIS_GRID_HEIGHT // 2
+
+    FLAG_ALIVE = 1
+    FLAG_BLOCK = 2
+    FLAG_LOCKSTEP = 1  # GAME_START 플래그
+
+    TYPE_NAMES = {t.value: (t, t.name.lower()) for t in MsgType}
+    CELL_CODES = {color: code for code, color in enumerate(TETRIS_CELL_COLORS)}
+    PIECE_CODES = {name: i + 1 for i, name in enumerate(TETRIS_PIECE_ORDER)}
+    # 바이트 하나 → (앞 칸 색, 뒤 칸 색)
+    PAIR_DECODE = [
+        tuple(TETRIS_CELL_COLORS[code] if code < len(TETRIS_CELL_COLORS) else TETRIS_UNKNOWN_COLOR
+              for code in (b >> 4, b & 0x0F))
+        for b in range(256)
+    ]
+
+    # 같은 줄(빈 줄, 가득 찬 줄 등)이 반복되므로 줄 단위 변환 결과를 캐시
+    ROW_CACHE_LIMIT = 4096
+    _pack_row_cache = {}
+    _unpack_row_cache = {}
+
+    @staticmethod
+    def pack_row(row):
+        key = tuple(row)
+        packed = TetrisProtocol._pack_row_cache.get(key)
+        if packed is None:
+            codes = TetrisProtocol.CELL_CODES
+            flat = [codes.get(cell, TETRIS_UNKNOWN_CELL) for cell in row]
+            packed = bytes((flat[i] << 4) | flat[i + 1] for i in range(0, len(flat), 2))
+            if len(TetrisProtocol._pack_row_cache) >= TetrisProtocol.ROW_CACHE_LIMIT:
+                TetrisProtocol._pack_row_cache.clear()
+            TetrisProtocol._pack_row_cache[key] = packed
+        return packed
+
+    @staticmethod
+    def unpack_row(data):
+        row = TetrisProtocol._unpack_row_cache.get(data)
+        if row is None:
+            pairs = TetrisProtocol.PAIR_DECODE
+            row = tuple(color for b in data for color in pairs[b])
+            if len(TetrisProtocol._unpack_row_cache) >= TetrisProtocol.ROW_CACHE_LIMIT:
+                TetrisProtocol._unpack_row_cache.clear()
+            TetrisProtocol._unpack_row_cache[data] = row
+        return list(row)
+
+    @staticmethod
+    def pack_grid(grid):
+        """보드를 칸당 4비트로 압축"""
+        cache = TetrisProtocol._pack_row_cache
+        pack_row = TetrisProtocol.pack_row
+        parts = []
+        for row in grid:
+            packed = cache.get(tuple(row))
+            parts.append(packed if packed is not None else pack_row(row))
+        return b''.join(parts)
+
+    @staticmethod
+    def unpack_grid(data):
+        """압축된 보드를 색 리스트 보드로 복원"""
+        cache = TetrisProtocol._unpack_row_cache
+        unpack_row = TetrisProtocol.unpack_row
+        half = TETRIS_GRID_WIDTH // 2
+        grid = []
+        for i in range(0, len(data), half):
+            chunk = data[i:i + half]
+            row = cache.get(chunk)
+            grid.append(list(row) if row is not None else unpack_row(chunk))
+        return grid
+
+    @staticmethod
+    def pack_shape(shape):
+        """블록 모양(최대 4x4)을 (크기, 비트마스크)로 변환"""
+        bits = 0
+        for cell in (c for row in shape for c in row):
+            bits = (bits << 1) | (1 if cell else 0)
+        return (len(shape) << 4) | len(shape[0]), bits
+
+    @staticmethod
+    def unpack_shape(dims, bits):
+        h, w = dims >> 4, dims & 0x0F
+        shift = h * w
+        shape = []
+        for _ in range(h):
+            row = []
+            for _ in range(w):
+                shift -= 1
+                row.append((bits >> shift) & 1)
+            shape.append(row)
+        return shape
+
+    @staticmethod
+    def pack_status(data):
+        """점수/생존/순위/현재 블록 (STATE, BOARD_* 공통 부분)"""
+        flags = TetrisProtocol.FLAG_ALIVE if data.get('player_alive', True) else 0
+        block = data.get('current_block')
+        name = x = y = dims = bits = 0
+        if block:
+            flags |= TetrisProtocol.FLAG_BLOCK
+            name = TetrisProtocol.PIECE_CODES[block['name']]
+            x, y = block['x'], block['y']
+            dims, bits = TetrisProtocol.pack_shape(block['shape'])
+        return TetrisProtocol.STATE.pack(data.get('score', 0), flags, data.get('player_rank') or 0,
+                                         name, x, y, dims, bits)
+
+    @staticmethod
+    def unpack_status(payload, offset, data):
+        score, flags, rank, name, x, y, dims, bits = TetrisProtocol.STATE.unpack_from(payload, offset)
+        data['score'] = score
+        data['player_alive'] = bool(flags & TetrisProtocol.FLAG_ALIVE)
+        data['player_rank'] = rank or None
+        data['current_block'] = None
+        if flags & TetrisProtocol.FLAG_BLOCK:
+            if not 1 <= name <= len(TETRIS_PIECE_ORDER):
+                raise ValueError(f"블록 종류 코드 오류: {name}")
+            data['current_block'] = {'name': TETRIS_PIECE_ORDER[name - 1], 'x': x, 'y': y,
+                                     'shape': TetrisProtocol.unpack_shape(dims, bits)}
+        return offset + TetrisProtocol.STATE.size
+
+    @staticmethod
+    def encode(data):
+        """메시지(dict) → 바이트"""
+        msg_type = MsgType[data['type'].upper()]
+        sender = data.get('player_id')
+        header = TetrisProtocol.HEADER.pack(
+            TetrisProtocol.VERSION, msg_type,
+            TetrisProtocol.NO_PLAYER if sender is None else sender)
+
+        if msg_type == MsgType.WELCOME or msg_type == MsgType.DISCONNECT:
+            return header
+        if msg_type == MsgType.PLAYER_COUNT:
+            return header + TetrisProtocol.BYTE.pack(data['count'])
+        if msg_type == MsgType.GAME_START:
+            flags = TetrisProtocol.FLAG_LOCKSTEP if data.get('lockstep') else 0
+            return header + TetrisProtocol.START.pack(data['player_count'], flags, data.get('seed', 0))
+        if msg_type == MsgType.KEYFRAME_REQUEST:
+            return header + TetrisProtocol.BYTE.pack(data['target'])
+        if msg_type == MsgType.INPUTS:
+            inputs = data['inputs']
+            return header + TetrisProtocol.INPUTS.pack(data['tick'], len(inputs)) + bytes(inputs)
+        if msg_type == MsgType.CHECKSUM:
+            return header + TetrisProtocol.CHECKSUM.pack(data['tick'], data['checksum'])
+        if msg_type == MsgType.ATTACK:
+            return header + TetrisProtocol.ATTACK.pack(data['target'], min(data['lines'], 255))
+        if msg_type == MsgType.GARBAGE:
+            return header + TetrisProtocol.GARBAGE.pack(data['tick'], min(data['lines'], 255))
+        if msg_type == MsgType.STATE:
+            return header + TetrisProtocol.pack_status(data) + TetrisProtocol.pack_grid(data['grid'])
+
+        seq = TetrisProtocol.SEQ.pack(data['seq'])
+        status = TetrisProtocol.pack_status(data)
+        if msg_type == MsgType.BOARD_KEY:
+            return header + seq + status + TetrisProtocol.pack_grid(data['grid'])
+
+        # BOARD_DELTA: 바뀐 줄 비트마스크 + 바뀐 줄들
+        rows = data['rows']
+        mask = 0
+        for y in rows:
+            mask |= 1 << y
+        packed = b''.join([TetrisProtocol.pack_row(rows[y]) for y in sorted(rows)])
+        return header + seq + status + TetrisProtocol.ROW_MASK.pack(mask) + packed
+
+    @staticmethod
+    def decode(payload):
+        """바이트 → 메시지(dict). 형식이 맞지 않으면 ValueError"""
+        try:
+            version, type_code, sender = TetrisProtocol.HEADER.unpack_from(payload)
+            if version != TetrisProtocol.VERSION:
+                raise ValueError(f"프로토콜 버전 불일치: {version}")
+            msg_type, type_name = TetrisProtocol.TYPE_NAMES[type_code]
+            offset = TetrisProtocol.HEADER.size
+            data = {'type': type_name,
+                    'player_id': None if sender == TetrisProtocol.NO_PLAYER else sender}
+
+            if msg_type == MsgType.PLAYER_COUNT:
+                data['count'] = TetrisProtocol.BYTE.unpack_from(payload, offset)[0]
+            elif msg_type == MsgType.GAME_START:
+                data['player_count'], flags, data['seed'] = TetrisProtocol.START.unpack_from(payload, offset)
+                data['lockstep'] = bool(flags & TetrisProtocol.FLAG_LOCKSTEP)
+            elif msg_type == MsgType.KEYFRAME_REQUEST:
+                data['target'] = TetrisProtocol.BYTE.unpack_from(payload, offset)[0]
+            elif msg_type == MsgType.INPUTS:
+                data['tick'], count = TetrisProtocol.INPUTS.unpack_from(payload, offset)
+                offset += TetrisProtocol.INPUTS.size
+                data['inputs'] = payload[offset:offset + count]
+                if len(data['inputs']) != count:
+                    raise ValueError("입력 데이터 길이 오류")
+            elif msg_type == MsgType.CHECKSUM:
+                data['tick'], data['checksum'] = TetrisProtocol.CHECKSUM.unpack_from(payload, offset)
+            elif msg_type == MsgType.ATTACK:
+                data['target'], data['lines'] = TetrisProtocol.ATTACK.unpack_from(payload, offset)
+            elif msg_type == MsgType.GARBAGE:
+                data['tick'], data['lines'] = TetrisProtocol.GARBAGE.unpack_from(payload, offset)
+            elif msg_type in (MsgType.STATE, MsgType.BOARD_KEY, MsgType.BOARD_DELTA):
+                if msg_type != MsgType.STATE:
+                    data['seq'] = TetrisProtocol.SEQ.unpack_from(payload, offset)[0]
+                    offset += TetrisProtocol.SEQ.size
+                offset = TetrisProtocol.unpack_status(payload, offset, data)
+
+                if msg_type == MsgType.BOARD_DELTA:
+                    (mask,) = TetrisProtocol.ROW_MASK.unpack_from(payload, offset)
+                    offset += TetrisProtocol.ROW_MASK.size
+                    half = TETRIS_GRID_WIDTH // 2
+                    rows = {}
+                    for y in range(TETRIS_GRID_HEIGHT):
+                        if mask >> y & 1:
+                            chunk = payload[offset:offset + half]
+                            if len(chunk) != half:
+                                raise ValueError("줄 데이터 길이 오류")
+                            rows[y] = TetrisProtocol.unpack_row(chunk)
+                            offset += half
+                    data['rows'] = rows
+                else:
+                    grid_data = payload[offset:offset + TetrisProtocol.GRID_BYTES]
+                    if len(grid_data) != TetrisProtocol.GRID_BYTES:
+                        raise ValueError("보드 데이터 길이 오류")
+                    data['grid'] = TetrisProtocol.unpack_grid(grid_data)
+            return data
+        except (struct.error, IndexError, KeyError) as e:
+            raise ValueError(f"잘못된 메시지: {e}")
+
+    @staticmethod
+    def set_sender(payload, player_id):
+        """페이로드의 보낸 사람 바이트만 교체 (서버 중계용)"""
+        return payload[:2] + bytes((player_id,)) + payload[3:]
+
+# ==================== 보드 상태 동기화 ====================
+class BoardSyncSender:
+    """내 보드를 키프레임 + 줄 단위 변경분으로 보내는 쪽
+
+    대부분의 프레임은 블록 위치만 바뀌고, 보드는 블록 고정/줄 제거 때만 몇 줄 바뀐다.
+    바뀐 줄만 보내고 KEYFRAME_INTERVAL개마다 전체 보드를 보내며,
+    아무것도 바뀌지 않은 프레임은 보내지 않는다.
+    """
+    KEYFRAME_INTERVAL = 60
+
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.since_keyframe = 0
+        self.force_keyframe = True
+        self.last_rows = None
+        self.last_status = None
+
+    def request_keyframe(self):
+        """다음 메시지를 키프레임으로 (상대가 누락을 알렸을 때)"""
+        self.force_keyframe = True
+
+    def make_message(self, game, player_id, rank):
+        """이번 프레임에 보낼 메시지 (보낼 것이 없으면 None)"""
+        message = _tetris_state_message(game, player_id, rank)
+        rows = [tuple(row) for row in game.grid]
+        block = message['current_block']
+        status = (message['score'], message['player_alive'], rank,
+                  block['name'], block['x'], block['y'], tuple(map(tuple, block['shape'])))
+
+        if (self.force_keyframe or self.last_rows is None
+                or self.since_keyframe >= self.keyframe_interval):
+            message['type'] = 'board_key'
+            message['grid'] = [list(row) for row in rows]
+            self.force_keyframe = False
+            self.since_keyframe = 0
+        else:
+            last_rows = self.last_rows
+            changed = {y: list(row) for y, row in enumerate(rows) if row != last_rows[y]}
+            if not changed and status == self.last_status:
+                return None
+            message['type'] = 'board_delta'
+            message['rows'] = changed
+            del message['grid']
+
+        message['seq'] = self.seq
+        self.seq = (self.seq + 1) & 0xFFFF
+        self.since_keyframe += 1
+        self.last_rows = rows
+        self.last_status = status
+        return message
+
+class BoardSyncReceiver:
+    """상대 한 명의 보드를 키프레임 + 변경분으로 복원하는 쪽
+
+    시퀀스 번호가 건너뛰면 변경분을 버리고 다음 키프레임까지 기다린다.
+    키프레임 요청은 끊긴 구간마다 한 번만 한다 (awaiting_key).
+    """
+    def __init__(self, player_id):
+        self.player_id = player_id
+        self.expected_seq = None
+        self.awaiting_key = False  # 키프레임을 요청해 놓고 기다리는 중
+        self.lost = 0
+        self.state = {'player_id': player_id, 'player_alive': True, 'grid': None, 'current_block': None}
+
+    def apply(self, data):
+        """메시지 적용. 키프레임을 새로 요청해야 하면 True 반환 (이미 요청했으면 False)"""
+        seq = data['seq']
+        if data['type'] == 'board_key':
+            self.state['grid'] = data['grid']
+            self.awaiting_key = False
+        elif self.expected_seq is None or seq != self.expected_seq:
+            # 키프레임을 받기 전이거나 중간 메시지가 빠짐
+            if self.expected_seq is not None:
+                self.lost += 1
+                debug_log('NET_ERR', f"P{self.player_id} 보드 시퀀스 누락 ({self.expected_seq} → {seq})")
+                self.expected_seq = None
+            if self.awaiting_key:
+                return False
+            self.awaiting_key = True
+            return True
+        else:
+            grid = self.state['grid']
+            for y, row in data['rows'].items():
+                grid[y] = row
+
+        self.expected_seq = (seq + 1) & 0xFFFF
+        for key in ('score', 'player_alive', 'player_rank', 'current_block'):
+            self.state[key] = data[key]
+        return False
+
+def run_sync_benchmark(frames=3600, seed=1):
+    """전체 보드 전송과 변경분 동기화의 대역폭 비교 (무작위 플레이 60 FPS)"""
+    frames = int(frames)
+    rng = random.Random(int(seed))
+    game = TetrisEngine(is_multiplayer=True)
+    sender = BoardSyncSender()
+    receiver = BoardSyncReceiver(1)
+    full_bytes = sync_bytes = sync_messages = keyframes = 0
+    frame_header = TetrisNetwork.HEADER.size
+
+    for _ in range(frames):
+        roll = rng.random()
+        if roll < 0.10:
+            game.move(rng.choice((-1, 1)), 0)
+        elif roll < 0.15:
+            game.rotate_block(clockwise=rng.random() < 0.5)
+        elif roll < 0.165:
+            game.hard_drop()
+        game.update(1000 / FPS)
+        if game.game_over:
+            game = TetrisEngine(is_multiplayer=True)
+
+        full_bytes += frame_header + len(TetrisProtocol.encode(_tetris_state_message(game, 1, None)))
+        message = sender.make_message(game, 1, None)
+        if message is None:
+            continue
+        payload = TetrisProtocol.encode(message)
+        sync_bytes += frame_header + len(payload)
+        sync_messages += 1
+        keyframes += message['type'] == 'board_key'
+        receiver.apply(TetrisProtocol.decode(payload))
+        assert receiver.state['grid'] == game.grid, "복원한 보드가 다름"
+
+    seconds = frames / FPS
+    print(f"{frames}프레임 ({seconds:.0f}초) 무작위 플레이, 플레이어 1명 기준")
+    print(f"  전체 보드 매 프레임: {full_bytes / seconds / 1024:7.2f} KB/s")
+    print(f"  키프레임 + 변경분:   {sync_bytes / seconds / 1024:7.2f} KB/s "
+          f"(메시지 {sync_messages}개, 키프레임 {keyframes}개)")
+    print(f"  감소율: {full_bytes / max(1, sync_bytes):.1f}배, "
+          f"4명 미러링 시 수신량 {sync_bytes * 3 / seconds / 1024:.2f} KB/s")
+
+# ==================== 락스텝 동기화 ====================
+LOCKSTEP_TICK_MS = 1000 / FPS  # 락스텝은 프레임 시간과 상관없이 고정 틱으로 진행
+
+class LockstepSender:
+    """내 입력을 틱 단위로 모아 보내는 쪽
+
+    보드 대신 틱당 1바이트 입력만 보내고, 받는 쪽은 같은 seed의 Tetris를
+    같은 입력으로 돌려서 보드를 똑같이 재현한다.
+    CHECKSUM_INTERVAL틱마다 체크섬을 보내 재현 결과가 어긋났는지 확인한다.
+    """
+    INPUT_BATCH = 4          # 4틱(약 67ms)씩 묶어서 전송
+    CHECKSUM_INTERVAL = 60   # 1초마다 체크섬
+
+    def __init__(self, batch=INPUT_BATCH):
+        self.batch = batch
+        self.start_tick = 0
+        self.pending = bytearray()
+
+    @staticmethod
+    def player_seed(match_seed, player_id):
+        """대전 seed에서 플레이어별 블록 순서 seed 계산"""
+        if match_seed is None:
+            return None
+        return match_seed * TetrisNetwork.MAX_PLAYERS + player_id
+
+    def record(self, game, player_id, inputs):
+        """game.step() 직후 호출. 이번 틱에 보낼 메시지 목록 반환"""
+        self.pending.append(inputs)
+        checksum_due = game.tick % self.CHECKSUM_INTERVAL == 0
+        messages = []
+        if len(self.pending) >= self.batch or checksum_due or game.game_over:
+            messages.append({'type': 'inputs', 'player_id': player_id,
+                             'tick': self.start_tick, 'inputs': bytes(self.pending)})
+            self.start_tick = game.tick
+            self.pending = bytearray()
+        if checksum_due:
+            messages.append({'type': 'checksum', 'player_id': player_id,
+                             'tick': game.tick, 'checksum': game.checksum()})
+        return messages
+
+class LockstepPeer:
+    """상대 한 명의 입력 로그로 상대 보드를 직접 시뮬레이션하는 쪽
+
+    입력이 빠지거나 체크섬이 다르면 비동기(desync)로 보고 시뮬레이션을 멈춘다.
+    키프레임 요청(True 반환)은 비동기가 처음 생길 때 한 번뿐이고, 그 뒤에는 desynced라서 False.
+    """
+    def __init__(self, player_id, seed):
+        self.player_id = player_id
+        self.game = TetrisEngine(is_multiplayer=True, seed=seed)
+        self.local_checksums = {}   # tick -> 내 시뮬레이션 체크섬
+        self.remote_checksums = {}  # tick -> 상대가 보낸 체크섬
+        self.garbage_events = {}    # tick -> [받은 줄 수, ...]
+        self.desynced = False
+        self.state = {'player_id': player_id, 'player_alive': True, 'grid': None, 'current_block': None}
+        self._refresh_state()
+
+    def apply_inputs(self, start_tick, inputs):
+        """입력 묶음 적용. 새로 비동기가 되면 True 반환"""
+        if self.desynced:
+            return False
+        game = self.game
+        if start_tick > game.tick:
+            return self._mark_desync(f"입력 누락 (틱 {game.tick} → {start_tick})")
+        for tick_inputs in inputs[game.tick - start_tick:]:
+            for lines in self.garbage_events.pop(game.tick, ()):
+                game.receive_garbage(lines)
+            game.step(tick_inputs, LOCKSTEP_TICK_MS)
+            if game.tick % LockstepSender.CHECKSUM_INTERVAL == 0:
+                self.local_checksums[game.tick] = game.checksum()
+                if self._compare(game.tick):
+                    return True
+        self._refresh_state()
+        return False
+
+    def add_garbage(self, tick, lines):
+        """상대가 tick에 받은 공격 기록. 이미 지난 틱이면 비동기 (새로 비동기가 되면 True)"""
+        if self.desynced:
+            return False
+        if tick < self.game.tick:
+            return self._mark_desync(f"지난 틱의 공격 (틱 {tick} < {self.game.tick})")
+        self.garbage_events.setdefault(tick, []).append(lines)
+        return False
+
+    def apply_checksum(self, tick, checksum):
+        """상대 체크섬 적용. 새로 비동기가 되면 True 반환"""
+        if self.desynced:
+            return False
+        self.remote_checksums[tick] = checksum
+        return self._compare(tick)
+
+    def _compare(self, tick):
+        local = self.local_checksums.get(tick)
+        remote = self.remote_checksums.get(tick)
+        if local is None or remote is None:
+            return False
+        del self.local_checksums[tick], self.remote_checksums[tick]
+        if local != remote:
+            return self._mark_desync(f"체크섬 불일치 (틱 {tick})")
+        return False
+
+    def _mark_desync(self, reason):
+        self.desynced = True
+        debug_log('NET_ERR', f"P{self.player_id} 락스텝 비동기: {reason}")
+        return True
+
+    def _refresh_state(self):
+        message = _tetris_state_message(self.game, self.player_id, None)
+        for key in ('grid', 'current_block', 'score', 'player_alive'):
+            self.state[key] = message[key]
+
+def run_lockstep_test(ticks=3600, seed=7):
+    """입력 로그만으로 상대 보드가 똑같이 재현되는지 확인 + 보드 동기화와 전송량 비교"""
+    ticks = int(ticks)
+    rng = random.Random(int(seed))
+    frame_header = TetrisNetwork.HEADER.size
+    match_seed = rng.getrandbits(32)
+
+    game = TetrisEngine(is_multiplayer=True, seed=LockstepSender.player_seed(match_seed, 1))
+    sender = LockstepSender()
+    peer = LockstepPeer(1, LockstepSender.player_seed(match_seed, 1))
+    sync_sender = BoardSyncSender()
+    lockstep_bytes = sync_bytes = checksums = 0
+
+    for _ in range(ticks):
+        roll = rng.random()
+        inputs = 0
+        if roll < 0.10:
+            inputs = rng.choice((TETRIS_INPUT_LEFT, TETRIS_INPUT_RIGHT, TETRIS_INPUT_DOWN))
+        elif roll < 0.15:
+            inputs = rng.choice((TETRIS_INPUT_ROTATE_CW, TETRIS_INPUT_ROTATE_CCW, TETRIS_INPUT_HOLD))
+        elif roll < 0.165:
+            inputs = TETRIS_INPUT_HARD_DROP
+        game.step(inputs, LOCKSTEP_TICK_MS)
+        for message in sender.record(game, 1, inputs):
+            payload = TetrisProtocol.encode(message)
+            lockstep_bytes += frame_header + len(payload)
+            data = TetrisProtocol.decode(payload)
+            if data['type'] == 'inputs':
+                if peer.apply_inputs(data['tick'], data['inputs']):
+                    print(f"재현 중 비동기 발생 (틱 {game.tick}): FAIL")
+                    return False
+            else:
+                checksums += 1
+                if peer.apply_checksum(data['tick'], data['checksum']):
+                    print(f"체크섬 불일치 (틱 {data['tick']}): FAIL")
+                    return False
+        message = sync_sender.make_message(game, 1, None)
+        if message is not None:
+            sync_bytes += frame_header + len(TetrisProtocol.encode(message))
+        if game.game_over:
+            break
+
+    played = game.tick
+    ok = peer.game.grid == game.grid and peer.game.score == game.score
+    print(f"{played}틱 무작위 플레이 (seed {match_seed}), 체크섬 {checksums}회 일치: {'OK' if ok else 'FAIL'}")
+
+    # 한 칸을 바꿔 비동기가 검출되는지 확인
+    peer.game.grid[TETRIS_GRID_HEIGHT - 1][0] = TETRIS_COLORS['I'] if not peer.game.grid[-1][0] else 0
+    detected = False
+    for _ in range(LockstepSender.CHECKSUM_INTERVAL):
+        game.step(0, LOCKSTEP_TICK_MS)
+        for message in sender.record(game, 1, 0):
+            if message['type'] == 'inputs':
+                detected |= peer.apply_inputs(message['tick'], message['inputs'])
+            else:
+                detected |= peer.apply_checksum(message['tick'], message['checksum'])
+    print(f"보드 변조 후 비동기 검출: {'OK' if detected else 'FAIL'}")
+
+    seconds = played / FPS
+    print(f"  락스텝 입력 로그:    {lockstep_bytes / seconds:7.1f} B/s")
+    print(f"  키프레임 + 변경분:   {sync_bytes / seconds:7.1f} B/s")
+    return ok and detected
+
+def run_protocol_benchmark(count=20000):
+    """바이너리 프로토콜과 pickle 인코딩/디코딩 속도 비교"""
+    count = int(count)
+    game = TetrisEngine(is_multiplayer=True)
+    for y in range(TETRIS_GRID_HEIGHT // 2, TETRIS_GRID_HEIGHT):
+        for x in range(TETRIS_GRID_WIDTH):
+            if (x + y) % 7:
+                game.grid[y][x] = TETRIS_COLORS[TETRIS_PIECE_ORDER[(x * y) % 7]]
+    message = _tetris_state_message(game, 1, None)
+
+    codecs = [
+        ('binary', TetrisProtocol.encode, TetrisProtocol.decode),
+        ('pickle', lambda d: pickle.dumps(d, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+    ]
+    print(f"보드 상태 메시지 {count}회 인코딩/디코딩")
+    for name, encode, decode in codecs:
+        payload = encode(message)
+        assert decode(payload)['grid'] == message['grid']
+
+        start = time.perf_counter()
+        for _ in range(count):
+            encode(message)
+        enc_us = (time.perf_counter() - start) / count * 1e6
+
+        start = time.perf_counter()
+        for _ in range(count):
+            decode(payload)
+        dec_us = (time.perf_counter() - start) / count * 1e6
+
+        print(f"  {name:7s} {len(payload):5d} bytes  encode {enc_us:7.2f}us  decode {dec_us:7.2f}us  "
+              f"(4명 60FPS: {len(payload) * 3 * FPS / 1024:.1f} KB/s)")
+
+class NetPeer:
+    """연결된 상대 소켓과 송수신 버퍼"""
+    def __init__(self, sock, player_id=None):
+        self.sock = sock
+        self.player_id = player_id
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()
+        self.connecting = False
+
+class TetrisNetwork:
+    """테트리스 멀티플레이 네트워크 (논블로킹 소켓, 최대 4명)
+
+    서버(호스트)는 player_id 0, 클라이언트는 접속 순서대로 1~3을 받는다.
+    모든 소켓은 논블로킹이며 메서드를 호출할 때마다 selector를 timeout=0으로
+    돌려서 송수신하므로 60 FPS 렌더 루프가 accept/recv에서 멈추지 않는다.
+    클라이언트가 보낸 메시지는 서버가 player_id를 붙여 다른 클라이언트에게 중계한다.
+    """
+    DEFAULT_PORT = 5555
+    MAX_PLAYERS = 4
+    MAX_FRAME_SIZE = 64 * 1024  # 이보다 큰 프레임은 비정상 상대로 보고 연결 종료
+    HEADER = struct.Struct('!I')  # 프레임 길이 (4바이트, 빅엔디안)
+
+    def __init__(self, is_server, host='', port=DEFAULT_PORT):
+        self.is_server = is_server
+        self.selector = selectors.DefaultSelector()
+        self.peers = {}  # socket -> NetPeer
+        self.inbox = deque()
+        self.player_id = 0 if is_server else None
+        self.player_count = 1
+        self.connected = False
+        self.failed = False
+        self.closed = False
+        self.listener = None
+        self.port = port
+
+        if is_server:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind((host, port))
+            self.listener.listen(self.MAX_PLAYERS)
+            self.listener.setblocking(False)
+            self.port = self.listener.getsockname()[1]
+            self.connected = True
+            debug_log('NET_CONN', f"서버 시작 (포트 {self.port})")
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            peer = NetPeer(sock, player_id=0)
+            peer.connecting = True
+            err = sock.connect_ex((host or 'localhost', port))
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                sock.close()
+                self.failed = True
+                debug_log('NET_ERR', f"서버 연결 실패: {os.strerror(err)}")
+                return
+            self.peers[sock] = peer
+            self.selector.register(sock, selectors.EVENT_READ | selectors.EVENT_WRITE, peer)
+
+    # ---------- 프레임 인코딩 ----------
+    def encode(self, data):
+        """메시지를 길이 접두 프레임으로 변환"""
+        return self.frame(TetrisProtocol.encode(data))
+
+    def frame(self, payload):
+        return self.HEADER.pack(len(payload)) + payload
+
+    # ---------- 공개 API ----------
+    def get_player_count(self):
+        """현재 접속한 플레이어 수 (호스트 포함)"""
+        self.poll()
+        if self.is_server:
+            return 1 + len(self.peers)
+        return self.player_count
+
+    def accept_connection(self):
+        """대기 중인 접속을 모두 받음 (서버 전용, 막히지 않음)"""
+        if not self.is_server or self.closed:
+            return
+        while True:
+            try:
+                conn, addr = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                debug_log('NET_ERR', f"accept 실패: {e}")
+                break
+
+            if 1 + len(self.peers) >= self.MAX_PLAYERS:
+                debug_log('NET_CONN', f"인원 초과로 접속 거절: {addr}")
+                conn.close()
+                continue
+
+            conn.setblocking(False)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            peer = NetPeer(conn, player_id=self._allocate_player_id())
+            self.peers[conn] = peer
+            self.selector.register(conn, selectors.EVENT_READ, peer)
+            debug_log('NET_CONN', f"플레이어 {peer.player_id} 접속: {addr}")
+            self._queue(peer, {'type': 'welcome', 'player_id': peer.player_id})
+        self.poll()
+
+    def send_data(self, data):
+        """메시지 전송 (서버는 모든 클라이언트에게, 클라이언트는 서버에게)"""
+        if self.closed:
+            return
+        frame = self.encode(data)
+        for peer in list(self.peers.values()):
+            self._queue_frame(peer, frame)
+        self.poll()
+
+    def get_received_data(self):
+        """수신한 메시지를 하나 꺼냄 (없으면 None)"""
+        self.poll()
+        if self.inbox:
+            return self.inbox.popleft()
+        return None
+
+    def close(self):
+        """모든 소켓 종료"""
+        if self.closed:
+            return
+        self.closed = True
+        for sock in list(self.peers):
+            self._drop(self.peers[sock], notify=False)
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        self.selector.close()
+        self.connected = False
+        debug_log('NET_CONN', "네트워크 종료")
+
+    # ---------- 내부 처리 ----------
+    def poll(self):
+        """읽기/쓰기 가능한 소켓을 처리 (timeout=0, 막히지 않음)"""
+        if self.closed or not self.peers:
+            return
+        for key, mask in self.selector.select(timeout=0):
+            peer = key.data
+            if peer.sock not in self.peers:
+                continue
+            if peer.connecting:
+                if mask & selectors.EVENT_WRITE:
+                    self._finish_connect(peer)
+                continue
+            if mask & selectors.EVENT_READ:
+                self._read(peer)
+            if mask & selectors.EVENT_WRITE and peer.sock in self.peers:
+                self._flush(peer)
+
+    def _allocate_player_id(self):
+        used = {p.player_id for p in self.peers.values()}
+        for pid in range(1, self.MAX_PLAYERS):
+            if pid not in used:
+                return pid
+        return None
+
+    def _finish_connect(self, peer):
+        err = peer.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err != 0:
+            debug_log('NET_ERR', f"서버 연결 실패: {os.strerror(err)}")
+            self.failed = True
+            self._drop(peer, notify=False)
+            return
+        peer.connecting = False
+        self.connected = True
+        debug_log('NET_CONN', "서버 연결 성공")
+        self._update_events(peer)
+
+    def _read(self, peer):
+        try:
+            chunk = peer.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            debug_log('NET_ERR', f"수신 실패 (플레이어 {peer.player_id}): {e}")
+            self._drop(peer)
+            return
+        if not chunk:
+            self._drop(peer)
+            return
+
+        peer.inbuf += chunk
+        header_size = self.HEADER.size
+        while len(peer.inbuf) >= header_size:
+            (length,) = self.HEADER.unpack_from(peer.inbuf)
+            if length > self.MAX_FRAME_SIZE:
+                debug_log('NET_ERR', f"비정상 프레임 크기 {length} (플레이어 {peer.player_id})")
+                self._drop(peer)
+                return
+            if len(peer.inbuf) < header_size + length:
+                break
+            payload = bytes(peer.inbuf[header_size:header_size + length])
+            del peer.inbuf[:header_size + length]
+            if self.is_server:
+                # 보낸 사람은 서버가 확정 (클라이언트가 적은 값은 무시)
+                payload = TetrisProtocol.set_sender(payload, peer.player_id)
+            try:
+                data = TetrisProtocol.decode(payload)
+            except ValueError as e:
+                debug_log('NET_ERR', f"메시지 해석 실패 (플레이어 {peer.player_id}): {e}")
+                self._drop(peer)
+                return
+            self._on_message(peer, payload, data)
+            if peer.sock not in self.peers:
+                return
+
+    def _on_message(self, peer, payload, data):
+        if self.is_server:
+            # 다시 인코딩하지 않고 받은 페이로드를 그대로 다른 클라이언트에게 중계
+            frame = self.frame(payload)
+            for other in list(self.peers.values()):
+                if other is not peer:
+                    self._queue_frame(other, frame)
+        else:
+            msg_type = data.get('type')
+            if msg_type == 'welcome':
+                self.player_id = data.get('player_id')
+                debug_log('NET_CONN', f"플레이어 번호 배정: {self.player_id}")
+            elif msg_type == 'player_count':
+                self.player_count = data.get('count', self.player_count)
+        self.inbox.append(data)
+
+    def _queue(self, peer, data):
+        self._queue_frame(peer, self.encode(data))
+
+    def _queue_frame(self, peer, frame):
+        if peer.sock not in self.peers:
+            return
+        peer.outbuf += frame
+        if not peer.connecting:
+            self._flush(peer)
+
+    def _flush(self, peer):
+        """보낼 수 있는 만큼 보내고 나머지는 버퍼에 남김"""
+        while peer.outbuf:
+            try:
+                sent = peer.sock.send(peer.outbuf)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                debug_log('NET_ERR', f"송신 실패 (플레이어 {peer.player_id}): {e}")
+                self._drop(peer)
+                return
+            del peer.outbuf[:sent]
+        self._update_events(peer)
+
+    def _update_events(self, peer):
+        events = selectors.EVENT_READ
+        if peer.outbuf:
+            events |= selectors.EVENT_WRITE
+        self.selector.modify(peer.sock, events, peer)
+
+    def _drop(self, peer, notify=True):
+        """연결 종료 처리"""
+        if self.peers.pop(peer.sock, None) is None:
+            return
+        try:
+            self.selector.unregister(peer.sock)
+        except (KeyError, ValueError):
+            pass
+        peer.sock.close()
+        if not notify:
+            return
+        debug_log('NET_CONN', f"플레이어 {peer.player_id} 연결 끊김")
+        message = {'type': 'disconnect', 'player_id': peer.player_id}
+        if self.is_server:
+            for other in list(self.peers.values()):
+                self._queue(other, message)
+        else:
+            self.connected = False
+        self.inbox.append(message)
+
+def run_network_loopback_test(num_players=4):
+    """한 프로세스에서 호스트 1명 + 클라이언트 3명을 루프백으로 연결해 보는 테스트"""
+    def pump_until(condition, timeout=2.0):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            server.accept_connection()
+            for c in clients:
+                c.poll()
+            if condition():
+                return True
+            time.sleep(0.001)
+        return False
+
+    def drain(net):
+        messages = []
+        while True:
+            data = net.get_received_data()
+            if data is None:
+                return messages
+            messages.append(data)
+
+    server = TetrisNetwork(is_server=True, host='127.0.0.1', port=0)
+    clients = [TetrisNetwork(is_server=False, host='127.0.0.1', port=server.port)
+               for _ in range(num_players - 1)]
+    results = []
+
+    def check(name, ok):
+        results.append(ok)
+        print(f"[{'OK' if ok else 'FAIL'}] {name}")
+
+    try:
+        check("모든 클라이언트 접속",
+              pump_until(lambda: server.get_player_count() == num_players
+                         and all(c.player_id is not None for c in clients)))
+        check("player_id 배정",
+              sorted(c.player_id for c in clients) == list(range(1, num_players)))
+
+        extra = TetrisNetwork(is_server=False, host='127.0.0.1', port=server.port)
+        check("5번째 접속 거절", pump_until(lambda: extra.poll() or not extra.peers))
+        extra.close()
+
+        server.send_data({'type': 'player_count', 'count': server.get_player_count()})
+        check("플레이어 수 브로드캐스트",
+              pump_until(lambda: all(c.player_count == num_players for c in clients)))
+        for c in clients:
+            drain(c)
+
+        sender = clients[0]
+        grid = [[0] * TETRIS_GRID_WIDTH for _ in range(TETRIS_GRID_HEIGHT)]
+        grid[-1] = [COLORS['cyan']] * (TETRIS_GRID_WIDTH - 1) + [0]
+        sender.send_data({'type': 'state', 'grid': grid, 'score': 1234})
+        received = {id(c): [] for c in clients[1:]}
+        server_got = []
+
+        def relayed():
+            server_got.extend(drain(server))
+            for c in clients[1:]:
+                received[id(c)].extend(drain(c))
+            return server_got and all(received.values())
+        check("클라이언트 상태 중계", pump_until(relayed))
+        check("중계 메시지에 보낸 사람 표시",
+              all(m[0].get('player_id') == sender.player_id and m[0].get('grid') == grid
+                  for m in received.values()))
+
+        # 프레임이 여러 조각으로 나뉘어 도착해도 재조립되는지 확인
+        frame = sender.encode({'type': 'state', 'grid': grid, 'score': 777})
+        raw = next(iter(sender.peers.values())).sock
+        raw.send(frame[:5])
+        pump_until(lambda: False, timeout=0.05)
+        raw.send(frame[5:])
+        check("나뉜 프레임 재조립",
+              pump_until(lambda: any(m.get('score') == 777 for m in drain(server))))
+
+        # 한 번의 recv에 여러 프레임이 붙어 와도 모두 꺼내지는지 확인
+        for i in range(50):
+            sender.send_data({'type': 'state', 'grid': grid, 'score': i})
+        burst = []
+        check("연속 프레임 분리",
+              pump_until(lambda: burst.extend(drain(server)) or len(burst) == 50)
+              and [m['score'] for m in burst] == list(range(50)))
+
+        # 키프레임 + 변경분으로 다른 클라이언트의 보드가 복원되는지 확인
+        game = Tetris(is_multiplayer=True)
+        sync = BoardSyncSender()
+        watcher = clients[1]
+        receiver = BoardSyncReceiver(sender.player_id)
+        drain(watcher)
+
+        def sync_step():
+            message = sync.make_message(game, sender.player_id, None)
+            if message is not None:
+                sender.send_data(message)
+            return message
+
+        sync_step()
+        game.hard_drop()
+        game.hard_drop()
+        delta = sync_step()
+
+        def synced():
+            for m in drain(watcher):
+                if m.get('type') in ('board_key', 'board_delta'):
+                    receiver.apply(m)
+            return receiver.state['grid'] == game.grid and receiver.expected_seq == 2
+        check("보드 변경분 동기화", delta['type'] == 'board_delta' and pump_until(synced))
+
+        leaver = clients.pop()
+        leaver_id = leaver.player_id
+        leaver.close()
+        check("연결 끊김 알림",
+              pump_until(lambda: any(m.get('type') == 'disconnect' and m.get('player_id') == leaver_id
+                                     for m in drain(clients[0]))))
+        check("남은 플레이어 수", server.get_player_count() == num_players - 1)
+    finally:
+        for c in clients:
+            c.close()
+        server.close()
+
+    passed = sum(results)
+    print(f"{passed}/{len(results)} 통과")
+    return passed == len(results)
+
+# ==================== 테트리스 CPU 플레이어 ====================
+def _build_bot_placements():
+    """블록별로 모양이 서로 다른 회전만 추림 (O는 1개, I/S/Z는 2개, 나머지는 4개)"""
+    placements = {}
+    for name, orientations in TETRIS_ROTATIONS.items():
+        seen = set()
+        placements[name] = []
+        for rotation, (_, (masks, min_x, max_x), bottoms) in enumerate(orientations):
+            key = tuple((dy - masks[0][0], mask) for dy, mask in masks)
+            if key not in seen:
+                seen.add(key)
+                placements[name].append((rotation, masks, min_x, max_x, bottoms))
+    return placements
+
+TETRIS_BOT_PLACEMENTS = _build_bot_placements()  # 이름 → [(회전, 줄 마스크, 왼쪽, 오른쪽, 열별 바닥)]
+TETRIS_ROW_POPCOUNT = bytes(bin(bits).count('1') for bits in range(1 << TETRIS_GRID_WIDTH))
+TETRIS_ROW_COLUMNS = [tuple(x for x in range(TETRIS_GRID_WIDTH) if bits >> x & 1)
+                      for bits in range(1 << TETRIS_GRID_WIDTH)]  # 줄 비트 → 채워진 열 번호
+
+class TetrisBot:
+    """CPU 플레이어: 모든 회전 x 열에 떨어뜨려 보고 평가 점수가 가장 높은 자리에 놓는다
+
+    보드는 비트보드(줄마다 int)로, 블록은 미리 계산한 줄 마스크로만 다루므로
+    한 수를 정하는 데 1ms가 걸리지 않는다. 난이도는 탐색 범위(홀드, 다음 블록까지
+    내다보기)와 놓는 속도(초당 블록 수)로 나눈다.
+    """
+    # 평가 가중치: 높이 합, 지운 줄, 구멍, 울퉁불퉁함
+    WEIGHTS = (-0.510066, 0.760666, -0.35663, -0.184483)
+    # lookahead: 점수가 좋은 자리 몇 개에 대해 다음 블록까지 놓아 볼지 (0이면 현재 블록만)
+    # noise: 평가 점수에 섞는 무작위 값 (실수하는 정도)
+    LEVELS = {
+        'easy': {'pps': 1.0, 'hold': False, 'lookahead': 0, 'noise': 0.6},
+        'normal': {'pps': 2.0, 'hold': True, 'lookahead': 0, 'noise': 0.0},
+        'hard': {'pps': 3.0, 'hold': True, 'lookahead': 3, 'noise': 0.0},
+    }
+
+    def __init__(self, level='normal', seed=None):
+        settings = self.LEVELS[level]
+        self.level = level
+        self.pps = settings['pps']
+        self.use_hold = settings['hold']
+        self.lookahead = settings['lookahead']
+        self.noise = settings['noise']
+        self.rng = random.Random(seed)
+        self.decisions = 0
+        self.think_ms = 0.0      # 결정에 걸린 시간 합
+        self.max_think_ms = 0.0
+
+    @staticmethod
+    def column_tops(rows):
+        """열마다 가장 위 칸의 y (빈 열은 보드 높이)"""
+        tops = [TETRIS_GRID_HEIGHT] * TETRIS_GRID_WIDTH
+        seen = 0
+        for y, bits in enumerate(rows):
+            new = bits & ~seen
+            while new:
+                low = new & -new
+                tops[low.bit_length() - 1] = y
+                new ^= low
+            seen |= bits
+            if seen == TETRIS_FULL_MASK:
+                break
+        return tops
+
+    @staticmethod
+    def placements(rows, shape_name):
+        """놓을 수 있는 모든 자리 [(회전, x, 놓은 뒤 줄들, 지운 줄 수)]
+
+        스폰 위치에서 회전하고 옆으로 옮긴 뒤 그대로 떨어뜨리는 자리만 본다.
+        위에서 곧게 떨어지면 처음 닿는 곳은 열의 맨 위 칸이므로 열 높이만으로 착지 y가 나온다.
+        """
+        tops = TetrisBot.column_tops(rows)
+        result = []
+        for rotation, masks, min_x, max_x, bottoms in TETRIS_BOT_PLACEMENTS[shape_name]:
+            for x in range(-min_x, TETRIS_GRID_WIDTH - max_x):
+                y = min(tops[x + dx] - dy for dx, dy in bottoms) - 1
+                if y + masks[0][0] < 0:
+                    continue  # 보드 위로 넘침
+                new_rows = rows[:]
+                left = x + min_x
+                lines = 0
+                for dy, mask in masks:
+                    new_rows[y + dy] |= mask << left
+                    if new_rows[y + dy] == TETRIS_FULL_MASK:
+                        lines += 1
+                if lines:
+                    new_rows = [0] * lines + [bits for bits in new_rows if bits != TETRIS_FULL_MASK]
+                result.append((rotation, x, new_rows, lines))
+        return result
+
+    @classmethod
+    def evaluate(cls, rows, lines):
+        """보드 평가 점수 (클수록 좋음)"""
+        heights = [0] * TETRIS_GRID_WIDTH
+        seen = holes = 0
+        y = 0
+        while y < TETRIS_GRID_HEIGHT and not rows[y]:
+            y += 1  # 위쪽 빈 줄은 건너뜀
+        for y in range(y, TETRIS_GRID_HEIGHT):
+            bits = rows[y]
+            holes += TETRIS_ROW_POPCOUNT[seen & ~bits]  # 위에 블록이 있는 빈 칸
+            new = bits & ~seen
+            if new:
+                height = TETRIS_GRID_HEIGHT - y
+                for x in TETRIS_ROW_COLUMNS[new]:
+                    heights[x] = height
+                seen |= bits
+        bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+        w_height, w_lines, w_holes, w_bump = cls.WEIGHTS
+        return w_height * sum(heights) + w_lines * lines + w_holes * holes + w_bump * bumpiness
+
+    def choose(self, game):
+        """이번 블록을 놓을 자리 (홀드 여부, 회전, x). 놓을 곳이 없으면 None"""
+        start = time.perf_counter()
+        rows = game.row_bits
+        if rows is None:
+            rows = [sum(1 << x for x, cell in enumerate(row) if cell) for row in game.grid]
+        upcoming = game.next_pieces
+        current = game.current_block.shape_name
+
+        # (홀드 여부, 놓을 블록, 그다음 블록)
+        options = [(False, current, upcoming[0] if upcoming else None)]
+        if self.use_hold and game.can_hold:
+            if game.hold_block is not None:
+                options.append((True, game.hold_block, upcoming[0] if upcoming else None))
+            elif upcoming:
+                # 빈 홀드에 넣으면 다음 블록이 나오고 그다음은 두 번째 블록
+                options.append((True, upcoming[0], upcoming[1] if len(upcoming) > 1 else None))
+
+        scored = []
+        for use_hold, name, next_name in options:
+            if use_hold and name == current:
+                continue
+            for rotation, x, new_rows, lines in self.placements(rows, name):
+                scored.append((self.evaluate(new_rows, lines), use_hold, rotation, x, new_rows, lines, next_name))
+
+        best = None
+        if scored:
+            scored.sort(key=lambda option: option[0], reverse=True)
+            candidates = scored
+            scores = [option[0] for option in scored]
+            if self.lookahead and all(option[6] for option in scored[:self.lookahead]):
+                # 상위 몇 개만 다음 블록까지 놓아 보고, 모두 두 수를 합친 점수로 다시 비교
+                w_lines = self.WEIGHTS[1]
+                candidates = scored[:self.lookahead]
+                scores = []
+                for _, _, _, _, new_rows, lines, next_name in candidates:
+                    follow = [self.evaluate(rows2, lines2)
+                              for _, _, rows2, lines2 in self.placements(new_rows, next_name)]
+                    # 다음 블록을 놓을 곳이 없으면 지는 자리
+                    scores.append(max(follow) + w_lines * lines if follow else -math.inf)
+            if self.noise:
+                # 실수는 같은 기준으로 매긴 최종 점수에 섞음
+                scores = [score + self.rng.uniform(-self.noise, self.noise) for score in scores]
+            best = candidates[max(range(len(candidates)), key=scores.__getitem__)]
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.decisions += 1
+        self.think_ms += elapsed
+        self.max_think_ms = max(self.max_think_ms, elapsed)
+        return None if best is None else best[1:4]
+
+    def play(self, game):
+        """한 수 두기: 고른 자리로 옮겨서 하드 드롭"""
+        choice = self.choose(game)
+        if choice is not None:
+            use_hold, rotation, x = choice
+            if use_hold:
+                game.hold_piece()
+                if game.game_over:
+                    return
+            block = game.current_block
+            before = (block.rotation, block.x)
+            block.rotation, block.x = rotation, x
+            if not game.valid_position():
+                block.rotation, block.x = before  # 스폰 위치에서 못 돌리면 그대로 떨어뜨림
+        game.hard_drop()
+
+class TetrisBotNetwork:
+    """CPU 상대를 네트워크 플레이어처럼 붙이는 가짜 네트워크
+
+    TetrisNetwork와 같은 메서드(send_data/get_received_data/close)를 가지므로
+    _run_tetris_match를 그대로 쓴다. 사람은 P0, CPU는 P1부터이며
+    실제 상대처럼 보드 동기화 메시지와 공격 메시지를 주고받는다.
+    CPU는 받은 메시지를 꺼내 갈 때 흐른 시간만큼 진행한다.
+    """
+    def __init__(self, bot_count=TetrisNetwork.MAX_PLAYERS - 1, level='normal', seed=None):
+        self.is_server = True
+        self.player_id = 0
+        self.player_count = bot_count + 1
+        self.connected = True
+        self.failed = False
+        self.inbox = deque()
+        self.human_alive = True
+        self.attack_turn = 0
+        self.bots = {}  # player_id -> (TetrisEngine, TetrisBot, BoardSyncSender)
+        self.wait_ms = {}  # player_id -> 다음 블록을 놓을 때까지 남은 시간
+        for pid in range(1, bot_count + 1):
+            game = TetrisEngine(is_multiplayer=True, seed=LockstepSender.player_seed(seed, pid))
+            bot = TetrisBot(level, seed=None if seed is None else seed + pid)
+            self.bots[pid] = (game, bot, BoardSyncSender())
+            self.wait_ms[pid] = 1000 / bot.pps
+        self.last_time = time.perf_counter()
+        debug_log('GAME', f"CPU 대전 ({bot_count}명, 난이도 {level})")
+
+    def get_player_count(self):
+        return self.player_count
+
+    def send_data(self, data):
+        """내 메시지를 CPU 쪽에 반영 (공격, 생존 여부, 키프레임 요청)"""
+        if not isinstance(data, dict):
+            return
+        msg_type = data.get('type')
+        if msg_type == 'attack':
+            entry = self.bots.get(data.get('target'))
+            if entry is not None and not entry[0].game_over:
+                entry[0].receive_garbage(data['lines'])
+        elif msg_type in ('board_key', 'board_delta'):
+            self.human_alive = data.get('player_alive', True)
+        elif msg_type == 'keyframe_request':
+            entry = self.bots.get(data.get('target'))
+            if entry is not None:
+                entry[2].request_keyframe()
+
+    def get_received_data(self):
+        if not self.inbox:
+            self._advance()
+        return self.inbox.popleft() if self.inbox else None
+
+    def close(self):
+        self.connected = False
+
+    def _advance(self):
+        """지난 호출 이후 흐른 시간만큼 CPU 진행 (한 틱이 안 지났으면 건너뜀)"""
+        now = time.perf_counter()
+        dt = (now - self.last_time) * 1000
+        if dt < LOCKSTEP_TICK_MS:
+            return
+        self.last_time = now
+        dt = min(dt, 250)  # 창을 끌거나 멈췄다 돌아와도 한꺼번에 몰아서 두지 않음
+
+        for pid, (game, bot, sync_sender) in self.bots.items():
+            if not game.game_over:
+                self.wait_ms[pid] -= dt
+                if self.wait_ms[pid] <= 0:
+                    self.wait_ms[pid] += 1000 / bot.pps
+                    bot.play(game)
+                    if game.outgoing_attack:
+                        self._send_attack(pid, game.outgoing_attack)
+                        game.outgoing_attack = 0
+            message = sync_sender.make_message(game, pid, None)
+            if message is not None:
+                self.inbox.append(message)
+
+    def _send_attack(self, pid, lines):
+        """살아 있는 다른 플레이어에게 돌아가며 공격"""
+        targets = [0] if self.human_alive else []
+        targets += [p for p, entry in self.bots.items() if p != pid and not entry[0].game_over]
+        if not targets:
+            return
+        target = targets[self.attack_turn % len(targets)]
+        self.attack_turn += 1
+        if target == 0:
+            self.inbox.append({'type': 'attack', 'player_id': pid, 'target': 0, 'lines': lines})
+        else:
+            self.bots[target][0].receive_garbage(lines)
+
+def run_bot_match(games=10, level='normal', max_pieces=1000, seed=1):
+    """CPU끼리 1:1 대전을 games판 돌려 탐색 속도와 공격력 측정
+
+    화면/시간 없이 번갈아 한 수씩 두므로 pieces/sec는 탐색+규칙 처리 속도이고,
+    attack/min은 그 난이도의 놓는 속도(pps)로 환산한 값이다.
+    """
+    global DEBUG_MODE
+    games, max_pieces, seed = int(games), int(max_pieces), int(seed)
+    debug, DEBUG_MODE = DEBUG_MODE, False  # 공격마다 찍히는 로그 끄기
+    pieces = attack = 0
+    wins = [0, 0]
+    bots = []
+    start = time.perf_counter()
+    for match in range(games):
+        players = [TetrisEngine(is_multiplayer=True, seed=seed * 1000 + match * 2 + i) for i in range(2)]
+        match_bots = [TetrisBot(level, seed=seed * 1000 + match * 2 + i) for i in range(2)]
+        bots += match_bots
+        turns = 0
+        while not any(game.game_over for game in players) and turns < max_pieces:
+            for i, (game, bot) in enumerate(zip(players, match_bots)):
+                bot.play(game)
+                if game.outgoing_attack:
+                    players[1 - i].receive_garbage(game.outgoing_attack)
+                    game.outgoing_attack = 0
+                if game.game_over:
+                    break
+            turns += 1
+        pieces += sum(bot.decisions for bot in match_bots)
+        attack += sum(game.total_attack for game in players)
+        alive = [not game.game_over for game in players]
+        if alive.count(True) == 1:
+            wins[alive.index(True)] += 1
+    elapsed = time.perf_counter() - start
+    DEBUG_MODE = debug
+
+    decisions = sum(bot.decisions for bot in bots)
+    think_avg = sum(bot.think_ms for bot in bots) / max(decisions, 1)
+    think_max = max(bot.max_think_ms for bot in bots)
+    pps = TetrisBot.LEVELS[level]['pps']
+    per_piece = attack / max(pieces, 1)
+    print(f"CPU 대전 {games}판 ({level}, 최대 {max_pieces}수): 블록 {pieces}개, "
+          f"승리 P1 {wins[0]} / P2 {wins[1]} / 무승부 {games - sum(wins)}")
+    print(f"  {pieces / elapsed:,.0f} pieces/sec, 결정 평균 {think_avg:.3f}ms (최대 {think_max:.2f}ms)")
+    print(f"  공격 {attack}줄: 블록당 {per_piece:.3f}줄, {pps}pps 기준 {per_piece * pps * 60:.1f} attack/min")
+    return think_avg < 1.0
+
 def _show_error_screen(message):
     """에러 화면 표시 및 대기"""
     WINDOW.fill(COLORS['bg'])
-    error_text = FONTS['medium'].render(message, True, COLORS['red'])
+    error_text = TextCache.render('medium', message, COLORS['red'])
     error_rect = error_text.get_rect(center=(WIDTH//2, HEIGHT//2))
     WINDOW.blit(error_text, error_rect)
-    help_text = FONTS['small'].render("ESC: 메뉴로", True, COLORS['font'])
+    help_text = TextCache.render('small', "ESC: 메뉴로", COLORS['font'])
     help_rect = help_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
     WINDOW.blit(help_text, help_rect)
     pygame.display.update()
@@ -2318,10 +5413,11 @@ def _show_error_screen(message):
                 return MENU
 
 def _waiting_room(network, is_server):
-    """대기실 (2-4명 플레이어)"""
+    """대기실 (2-4명 플레이어). 시작하면 game_start 메시지(플레이어 수, seed, 락스텝 여부) 반환"""
     clock = pygame.time.Clock()
     local_ip = "localhost"
     client_player_count = 1  # 클라이언트가 표시할 플레이어 수
+    lockstep = False  # 서버가 L키로 선택
 
     if is_server:
         try:
@@ -2344,10 +5440,16 @@ def _waiting_room(network, is_server):
             data = network.get_received_data()
             if data and isinstance(data, dict):
                 if data.get('type') == 'game_start':
-                    return data.get('player_count', 2)  # 플레이어 수 반환
+                    return data
                 elif data.get('type') == 'player_count':
                     client_player_count = data.get('count', 1)
                     player_count = client_player_count
+                elif data.get('type') == 'disconnect':
+                    network.close()
+                    return _show_error_screen("서버와의 연결이 끊어졌습니다")
+            if network.failed:
+                network.close()
+                return _show_error_screen("서버에 연결할 수 없습니다")
 
         # 이벤트 처리
         for event in pygame.event.get():
@@ -2358,11 +5460,16 @@ def _waiting_room(network, is_server):
                 if event.key == pygame.K_ESCAPE:
                     network.close()
                     return MENU
+                # L: 락스텝 모드 켜기/끄기 (서버만)
+                if event.key == pygame.K_l and is_server:
+                    lockstep = not lockstep
                 # 스페이스바: 게임 시작 (서버만, 최소 2명)
                 if event.key == pygame.K_SPACE and is_server and player_count >= 2:
-                    # 클라이언트들에게 게임 시작 신호 전송 (플레이어 수 포함)
-                    network.send_data({'type': 'game_start', 'player_count': player_count})
-                    return player_count  # 플레이어 수 반환
+                    # 클라이언트들에게 게임 시작 신호 전송 (플레이어 수, 공용 seed 포함)
+                    start = {'type': 'game_start', 'player_count': player_count,
+                             'seed': random.getrandbits(32), 'lockstep': lockstep}
+                    network.send_data(start)
+                    return start
 
         # 새 연결 시도 (서버만, 최대 4명)
         if is_server and player_count < 4:
@@ -2372,18 +5479,18 @@ def _waiting_room(network, is_server):
         WINDOW.fill(COLORS['bg'])
 
         # 제목
-        title = FONTS['large'].render("대기실", True, COLORS['font'])
+        title = TextCache.render('large', "대기실", COLORS['font'])
         title_rect = title.get_rect(center=(WIDTH//2, 100))
         WINDOW.blit(title, title_rect)
 
         # 서버 IP (서버만)
         if is_server:
-            ip_text = FONTS['medium'].render(f"서버 IP: {local_ip}", True, COLORS['blue'])
+            ip_text = TextCache.render('medium', f"서버 IP: {local_ip}", COLORS['blue'])
             ip_rect = ip_text.get_rect(center=(WIDTH//2, 180))
             WINDOW.blit(ip_text, ip_rect)
 
         # 플레이어 수
-        count_text = FONTS['large'].render(f"플레이어: {player_count}/4", True, COLORS['gold'])
+        count_text = TextCache.render('large', f"플레이어: {player_count}/4", COLORS['gold'])
         count_rect = count_text.get_rect(center=(WIDTH//2, 280))
         WINDOW.blit(count_text, count_rect)
 
@@ -2395,24 +5502,343 @@ def _waiting_room(network, is_server):
             else:
                 status = "스페이스바를 눌러 게임 시작!"
                 color = COLORS['green']
+        elif not network.connected:
+            status = "서버에 연결하는 중..."
+            color = COLORS['font']
         else:
             status = "호스트가 게임을 시작하기를 기다리는 중..."
             color = COLORS['font']
 
-        status_text = FONTS['medium'].render(status, True, color)
+        status_text = TextCache.render('medium', status, color)
         status_rect = status_text.get_rect(center=(WIDTH//2, 380))
         WINDOW.blit(status_text, status_rect)
 
+        # 동기화 방식 (서버만)
+        if is_server:
+            mode_text = TextCache.render('small', f"L: 락스텝 모드 {'켜짐' if lockstep else '꺼짐'}",
+                                         COLORS['green'] if lockstep else COLORS['font'])
+            WINDOW.blit(mode_text, mode_text.get_rect(center=(WIDTH//2, 440)))
+
         # 도움말
-        help_text = FONTS['small'].render("ESC: 취소", True, COLORS['font'])
+        help_text = TextCache.render('small', "ESC: 취소", COLORS['font'])
         help_rect = help_text.get_rect(center=(WIDTH//2, HEIGHT - 50))
         WINDOW.blit(help_text, help_rect)
 
         pygame.display.update()
 
+def select_tetris_mode():
+    """멀티플레이 방식 선택 (방 만들기 / 참가하기 / CPU와 연습)"""
+    modes = [
+        ('host', '방 만들기', pygame.K_1),
+        ('join', '참가하기', pygame.K_2),
+        ('cpu', 'CPU와 연습', pygame.K_3)
+    ]
+    buttons = [pygame.Rect(WIDTH//2 - 200, 230 + i * 100, 400, 70) for i in range(len(modes))]
+    frames = FrameScheduler("멀티플레이 방식 선택")
+
+    while True:
+        if frames.redraw:
+            WINDOW.fill(COLORS['bg'])
+            UIDrawer.text_centered("테트리스 멀티플레이", 100, 'large')
+            for i, (btn, (_, name, _)) in enumerate(zip(buttons, modes)):
+                UIDrawer.button(btn, f"{i+1}. {name}")
+            UIDrawer.text_centered("클릭하거나 숫자키(1,2,3)를 눌러 선택", 610, 'small')
+            UIDrawer.text_centered("ESC: 메뉴로 돌아가기", 650, 'small')
+            pygame.display.update()
+
+        for event in frames.wait():
+            if event.type == pygame.QUIT:
+                return None
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                for i, btn in enumerate(buttons):
+                    if btn.collidepoint(pygame.mouse.get_pos()):
+                        return modes[i][0]
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return MENU
+                for mode_id, _, key in modes:
+                    if event.key == key:
+                        return mode_id
+
+def _input_server_ip():
+    """참가할 서버 IP 입력"""
+    ip_input = ""
+    clock = pygame.time.Clock()
+
+    while True:
+        clock.tick(FPS)
+        WINDOW.fill(COLORS['bg'])
+        UIDrawer.text_centered("서버 IP 입력", 150, 'huge')
+        UIDrawer.text_centered("호스트 화면에 표시된 IP를 입력하세요", 220, 'small')
+
+        box_rect = pygame.Rect(WIDTH//2 - 200, 300, 400, 80)
+        pygame.draw.rect(WINDOW, COLORS['white'], box_rect, border_radius=15)
+        pygame.draw.rect(WINDOW, COLORS['outline'], box_rect, 4, border_radius=15)
+        if ip_input:
+            ip_text = TextCache.render('large', ip_input, COLORS['font'])
+        else:
+            ip_text = TextCache.render('medium', "localhost", (150, 150, 150))
+        WINDOW.blit(ip_text, ip_text.get_rect(center=box_rect.center))
+
+        UIDrawer.text_centered("ENTER: 접속 | ESC: 취소", 450, 'small')
+        pygame.display.update()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return None
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return MENU
+                elif event.key == pygame.K_RETURN:
+                    return ip_input or "localhost"
+                elif event.key == pygame.K_BACKSPACE:
+                    ip_input = ip_input[:-1]
+                elif (event.unicode.isdigit() or event.unicode == '.') and len(ip_input) < 15:
+                    ip_input += event.unicode
+
+def _draw_opponent_board(state, x, y, cell_size=10):
+    """상대 보드 미니맵 그리기"""
+    board_rect = pygame.Rect(x, y, TETRIS_GRID_WIDTH * cell_size, TETRIS_GRID_HEIGHT * cell_size)
+    pygame.draw.rect(WINDOW, (40, 40, 40), board_rect)
+
+    grid = state.get('grid')
+    if grid:
+        for gy, row in enumerate(grid):
+            for gx, cell in enumerate(row):
+                if cell:
+                    pygame.draw.rect(WINDOW, cell, (x + gx * cell_size, y + gy * cell_size,
+                                                    cell_size - 1, cell_size - 1))
+
+    block = state.get('current_block')
+    if block and state.get('player_alive', True):
+        for by, row in enumerate(block['shape']):
+            for bx, cell in enumerate(row):
+                if cell and block['y'] + by >= 0:
+                    pygame.draw.rect(WINDOW, TETRIS_COLORS[block['name']],
+                                     (x + (block['x'] + bx) * cell_size,
+                                      y + (block['y'] + by) * cell_size,
+                                      cell_size - 1, cell_size - 1))
+
+    pygame.draw.rect(WINDOW, COLORS['outline'], board_rect, 2)
+
+    label = TextCache.render('tiny', f"P{state.get('player_id', '?')}  {state.get('score', 0):,}점", COLORS['font'])
+    WINDOW.blit(label, (x, y - 18))
+
+    if not state.get('player_alive', True):
+        overlay = pygame.Surface(board_rect.size)
+        overlay.set_alpha(160)
+        overlay.fill(COLORS['black'])
+        WINDOW.blit(overlay, board_rect.topleft)
+        rank = state.get('player_rank')
+        txt = TextCache.render('small', f"{rank}위" if rank else "탈락", COLORS['red'])
+        WINDOW.blit(txt, txt.get_rect(center=board_rect.center))
+
+# 상대 미니맵 위치 (메인 보드 좌우 빈 공간)
+OPPONENT_BOARD_POSITIONS = [
+    ((TETRIS_OFFSET_X - TETRIS_GRID_WIDTH * 10) // 2, 60),
+    ((TETRIS_OFFSET_X - TETRIS_GRID_WIDTH * 10) // 2, 330),
+    (TETRIS_OFFSET_X + TETRIS_GRID_WIDTH * TETRIS_BLOCK_SIZE + (TETRIS_OFFSET_X - TETRIS_GRID_WIDTH * 10) // 2, 60),
+]
+
+def _tetris_state_message(game, player_id, rank):
+    """내 보드 상태 메시지"""
+    block = game.current_block
+    return {
+        'type': 'state',
+        'player_id': player_id,
+        'grid': game.grid,
+        'current_block': {'name': block.shape_name, 'shape': block.shape, 'x': block.x, 'y': block.y},
+        'score': game.score,
+        'player_alive': not game.game_over or rank == 1,
+        'player_rank': rank,
+    }
+
+def _run_tetris_match(network, player_count, seed=None, lockstep=False):
+    """멀티플레이 대전 루프
+
+    lockstep이면 보드 대신 입력 로그를 보내고 상대 보드는 직접 시뮬레이션한다.
+    비동기가 검출된 상대에게는 키프레임을 요청해 그 상대만 보드 동기화로 전환한다.
+    """
+    game = Tetris(is_multiplayer=True, seed=LockstepSender.player_seed(seed, network.player_id))
+    sync_sender = BoardSyncSender()
+    board_sync = not lockstep  # 락스텝에서는 키프레임 요청을 받았을 때만 보드 전송
+    lockstep_sender = LockstepSender()
+    peers = {}  # player_id -> LockstepPeer
+    receivers = {}  # player_id -> BoardSyncReceiver
+    opponents = {}  # player_id -> 복원된 상태
+    attack_turn = 0  # 공격 대상 순번 (살아 있는 상대를 돌아가며)
+    my_rank = None
+    result_timer = 0
+    clock = pygame.time.Clock()
+    lockstep_time = 0.0   # 락스텝: 아직 틱으로 진행하지 않은 시간 (ms)
+    pending_actions = 0   # 락스텝: 다음 틱에 넣을 누른 키
+    debug_log('GAME', f"대전 시작 (플레이어 {player_count}명, 나: P{network.player_id})")
+
+    while True:
+        dt = clock.tick(FPS)
+
+        # 수신 처리 (쌓인 메시지 모두)
+        while True:
+            data = network.get_received_data()
+            if data is None:
+                break
+            if not isinstance(data, dict):
+                continue
+            msg_type = data.get('type')
+            pid = data.get('player_id')
+            if msg_type in ('board_key', 'board_delta'):
+                receiver = receivers.get(pid)
+                if receiver is None:
+                    receiver = receivers[pid] = BoardSyncReceiver(pid)
+                    opponents[pid] = receiver.state
+                if receiver.apply(data):
+                    network.send_data({'type': 'keyframe_request', 'player_id': network.player_id,
+                                       'target': pid})
+            elif msg_type == 'attack':
+                if data.get('target') == network.player_id and not game.game_over:
+                    debug_log('ATTACK', f"P{pid}의 공격 {data['lines']}줄")
+                    game.receive_garbage(data['lines'])
+                    if lockstep:
+                        # 입력 묶음보다 먼저 보내므로 상대는 같은 틱에 적용할 수 있음
+                        network.send_data({'type': 'garbage', 'player_id': network.player_id,
+                                           'tick': game.tick, 'lines': data['lines']})
+            elif msg_type in ('inputs', 'checksum', 'garbage'):
+                if not lockstep or pid in receivers:
+                    continue
+                peer = peers.get(pid)
+                if peer is None:
+                    peer = peers[pid] = LockstepPeer(pid, LockstepSender.player_seed(seed, pid))
+                    opponents[pid] = peer.state
+                if msg_type == 'inputs':
+                    need_keyframe = peer.apply_inputs(data['tick'], data['inputs'])
+                elif msg_type == 'garbage':
+                    need_keyframe = peer.add_garbage(data['tick'], data['lines'])
+                else:
+                    need_keyframe = peer.apply_checksum(data['tick'], data['checksum'])
+                if need_keyframe:
+                    network.send_data({'type': 'keyframe_request', 'player_id': network.player_id,
+                                       'target': pid})
+            elif msg_type == 'keyframe_request':
+                if data.get('target') == network.player_id:
+                    board_sync = True
+                    sync_sender.request_keyframe()
+            elif msg_type == 'disconnect':
+                state = opponents.setdefault(pid, {'player_id': pid})
+                state['player_alive'] = False
+                debug_log('PLAYER', f"P{pid} 연결 끊김")
+
+        dead_opponents = sum(1 for st in opponents.values() if not st.get('player_alive', True))
+        alive_count = player_count - dead_opponents - (1 if game.game_over else 0)
+        if game.game_over and my_rank is None:
+            my_rank = alive_count + 1
+            debug_log('PLAYER', f"탈락 ({my_rank}위)")
+        if not game.game_over and dead_opponents >= player_count - 1:
+            my_rank = 1
+            game.game_over = True
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                network.close()
+                return None
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                network.close()
+                return MENU
+            if not lockstep:
+                game.handle_event(event)
+            elif event.type == pygame.KEYDOWN:
+                pending_actions |= TETRIS_ACTION_KEYS.get(event.key, 0)
+
+        if not lockstep:
+            game.update(dt)
+        elif not game.game_over:
+            # 흐른 시간만큼 고정 틱 진행 (프레임이 밀려도 게임 속도는 그대로, FixedStepLoop와 같은 방식)
+            lockstep_time = min(lockstep_time + dt, FixedStepLoop.MAX_CATCHUP_MS)
+            held = Tetris.read_held_keys()
+            while lockstep_time >= LOCKSTEP_TICK_MS and not game.game_over:
+                lockstep_time -= LOCKSTEP_TICK_MS
+                inputs = pending_actions | held
+                pending_actions = 0  # 누른 키는 한 틱에만
+                game.step(inputs, LOCKSTEP_TICK_MS)
+                for message in lockstep_sender.record(game, network.player_id, inputs):
+                    network.send_data(message)
+        if board_sync:
+            message = sync_sender.make_message(game, network.player_id, my_rank)
+            if message is not None:
+                network.send_data(message)
+
+        # 공격 전송 (살아 있는 상대를 돌아가며)
+        targets = sorted(p for p, st in opponents.items() if st.get('player_alive', True))
+        if game.outgoing_attack and targets:
+            target = targets[attack_turn % len(targets)]
+            attack_turn += 1
+            network.send_data({'type': 'attack', 'player_id': network.player_id,
+                               'target': target, 'lines': game.outgoing_attack})
+            debug_log('ATTACK', f"P{target}에게 {game.outgoing_attack}줄 공격")
+            game.outgoing_attack = 0
+
+        # 결과 표시 후 5초 뒤 메뉴로
+        if my_rank is not None and alive_count <= 1:
+            result_timer += 1
+            if result_timer >= 300:
+                network.close()
+                return MENU
+
+        game.draw(update_display=False)
+        for state, (ox, oy) in zip(sorted(opponents.values(), key=lambda st: st.get('player_id') or 0),
+                                   OPPONENT_BOARD_POSITIONS):
+            _draw_opponent_board(state, ox, oy)
+
+        if my_rank is not None:
+            won = my_rank == 1
+            UIDrawer.text_centered("승리!" if won else f"{my_rank}위", HEIGHT//2 - 60, 'large',
+                                   COLORS['green'] if won else COLORS['red'])
+            if alive_count > 1:
+                UIDrawer.text_centered("다른 플레이어의 경기를 관전 중...", HEIGHT//2, 'medium')
+            UIDrawer.text_centered("ESC: 메뉴로", HEIGHT//2 + 40, 'medium')
+
+        if not network.is_server and not network.connected:
+            network.close()
+            return _show_error_screen("서버와의 연결이 끊어졌습니다")
+
+        pygame.display.update()
+
+def run_tetris_multiplayer():
+    """테트리스 멀티플레이 (호스트/참가 → 대기실 → 대전)"""
+    mode = select_tetris_mode()
+    if mode in [None, MENU]:
+        return mode
+
+    if mode == 'cpu':
+        level = select_difficulty()
+        if level in [None, MENU]:
+            return level
+        network = TetrisBotNetwork(level=level)
+        return _run_tetris_match(network, network.player_count)
+
+    if mode == 'host':
+        try:
+            network = TetrisNetwork(is_server=True)
+        except OSError as e:
+            debug_log('NET_ERR', f"서버 시작 실패: {e}")
+            return _show_error_screen("서버를 열 수 없습니다")
+    else:
+        host = _input_server_ip()
+        if host in [None, MENU]:
+            return host
+        network = TetrisNetwork(is_server=False, host=host)
+        if network.failed:
+            return _show_error_screen("서버에 연결할 수 없습니다")
+
+    start = _waiting_room(network, network.is_server)
+    if start in [None, MENU]:
+        return start
+    return _run_tetris_match(network, start.get('player_count', 2),
+                             seed=start.get('seed'), lockstep=start.get('lockstep', False))
+
 class GameObject:
     def __init__(self, x, y):
         self.x, self.y, self.active = x, y, True
+        self.prev_x, self.prev_y = x, y  # 직전 스텝 위치 (FixedStepLoop 보간용)
 
 class Paddle(GameObject):
     def __init__(self, width=PADDLE_CONFIG['width']):
@@ -2465,6 +5891,9 @@ class Paddle(GameObject):
         pygame.draw.rect(WINDOW, color, self.rect, border_radius=5)
 
 class Ball(GameObject):
+    """공: 한 프레임 이동을 충돌 시각(TOI)마다 나눠서 진행 (빨라도 벽돌/패들을 뚫지 않음)"""
+    MAX_HITS_PER_FRAME = 8  # 한 프레임에 처리하는 충돌 수 상한 (구석에 끼었을 때 무한 반복 방지)
+
     def __init__(self, x=None, y=None, speed=BALL_CONFIG['speed'], spawn_down=False):
         super().__init__(x or GAME_WIDTH // 2, y or HEIGHT - 100)
         self.radius, self.base_speed = BALL_CONFIG['radius'], speed
@@ -2480,7 +5909,12 @@ class Ball(GameObject):
             self.boost, self.boost_end = True, pygame.time.get_ticks() + duration
             self.dx, self.dy, self.speed = self.dx * 2, self.dy * 2, self.base_speed * 2
     
-    def update(self):
+    def update(self, paddle=None, bricks=None, on_brick_hit=None):
+        """한 프레임 이동. bricks는 BrickGrid, on_brick_hit(brick)은 벽돌에 부딪힐 때마다 호출
+
+        남은 이동 중 가장 먼저 닿는 것(벽 → 패들 → 벽돌 줄/열 순서로 같은 시각이면 앞의 것)까지
+        움직여 튕기고, 남은 시간으로 다시 찾는다. 한 프레임에 여러 번 부딪힐 수 있다.
+        """
         if not self.active:
             return
         
@@ -2488,14 +5922,59 @@ class Ball(GameObject):
             self.boost = False
             self.dx, self.dy, self.speed = self.dx / 2, self.dy / 2, self.base_speed
         
-        self.x, self.y = self.x + self.dx, self.y + self.dy
-        
-        if self.x - self.radius <= 0 or self.x + self.radius >= GAME_WIDTH:
-            self.dx = -self.dx
-            self.x = max(self.radius, min(GAME_WIDTH - self.radius, self.x))
-        if self.y - self.radius <= 0:
-            self.dy, self.y = -self.dy, self.radius
-    
+        remaining = 1.0  # 이번 프레임에 남은 이동 (속도 단위)
+        for _ in range(self.MAX_HITS_PER_FRAME):
+            hit = self.first_hit(remaining, paddle, bricks)
+            if hit is None:
+                break
+            t, nx, ny, target = hit
+            self.x, self.y = self.x + self.dx * t, self.y + self.dy * t
+            remaining -= t
+            if target is not None and target is paddle:
+                hit_pos = (self.x - paddle.rect.x) / paddle.width
+                angle = -60 + hit_pos * 120
+                speed = math.sqrt(self.dx**2 + self.dy**2)
+                self.dx = speed * math.sin(math.radians(angle))
+                self.dy = -speed * math.cos(math.radians(angle))
+                self.y = paddle.rect.y - self.radius
+            else:
+                dot = self.dx * nx + self.dy * ny
+                self.dx, self.dy = self.dx - 2 * dot * nx, self.dy - 2 * dot * ny
+                if target is not None and on_brick_hit:
+                    on_brick_hit(target)  # 벽이 아니면 벽돌
+        else:
+            remaining = 0.0  # 상한까지 부딪혔으면 이번 프레임은 여기서 멈춤
+        self.x, self.y = self.x + self.dx * remaining, self.y + self.dy * remaining
+
+    def first_hit(self, limit, paddle, bricks):
+        """limit 안에 가장 먼저 닿는 것 (t, 법선 x, 법선 y, 대상) 반환. 벽이면 대상은 None"""
+        x, y, dx, dy, r = self.x, self.y, self.dx, self.dy, self.radius
+        best = None
+        # 벽 (왼쪽, 오른쪽, 위)
+        for t, nx, ny in (((r - x) / dx if dx < 0 else None, 1, 0),
+                          ((GAME_WIDTH - r - x) / dx if dx > 0 else None, -1, 0),
+                          ((r - y) / dy if dy < 0 else None, 0, 1)):
+            if t is not None and t <= limit and (best is None or max(t, 0.0) < best[0]):
+                best = (max(t, 0.0), nx, ny, None)
+        # 패들: 윗면에 위에서 닿을 때만 (공 중심이 패들 가로 범위 안)
+        if paddle is not None and dy > 0:
+            rect = paddle.rect
+            t = (rect.top - r - y) / dy
+            if t < 0 and y - r <= rect.bottom and rect.left <= x <= rect.right:
+                t = 0.0  # 패들이 움직여서 이미 겹침
+            if 0 <= t <= limit and (best is None or t < best[0]) and rect.left <= x + dx * t <= rect.right:
+                best = (t, 0, -1, paddle)
+        # 벽돌
+        if bricks is not None:
+            end_x, end_y = x + dx * limit, y + dy * limit
+            area = pygame.Rect(int(min(x, end_x) - r) - 1, int(min(y, end_y) - r) - 1,
+                               int(abs(end_x - x) + 2 * r) + 3, int(abs(end_y - y) + 2 * r) + 3)
+            for brick in bricks.query(area):
+                hit = sweep_circle_rect(x, y, dx, dy, r, brick.rect, limit)
+                if hit and (best is None or hit[0] < best[0]):
+                    best = (hit[0], hit[1], hit[2], brick)
+        return best
+
     def draw(self):
         color = COLORS['yellow'] if self.boost else COLORS['white']
         pygame.draw.circle(WINDOW, color, (int(self.x), int(self.y)), self.radius)
@@ -2526,9 +6005,111 @@ class Brick(GameObject):
         if self.active:
             pygame.draw.rect(WINDOW, self.color, self.rect, border_radius=5)
             if self.type in ['1', '2', '3'] and self.dur > 1:
-                txt = FONTS['tiny'].render(str(self.dur), True, COLORS['white'])
+                txt = TextCache.render('tiny', str(self.dur), COLORS['white'])
                 WINDOW.blit(txt, txt.get_rect(center=self.rect.center))
 
+class BrickGrid:
+    """벽돌 위치 색인: BRICK_CONFIG 격자 칸 (줄, 열) → 벽돌
+
+    벽돌은 격자 칸마다 하나씩 놓이므로 공이 지나간 사각형이 걸친 칸만 보면 된다.
+    깨진 벽돌은 remove()로 빼고, 혹시 빠지지 않은 벽돌도 query()에서 active를 다시 확인한다.
+    """
+    def __init__(self, bricks):
+        self.cells = {}
+        self.rows = 0
+        for brick in bricks:
+            if brick.active:
+                cell = self.cell_of(brick)
+                self.cells[cell] = brick
+                self.rows = max(self.rows, cell[0] + 1)
+
+    @staticmethod
+    def cell_of(brick):
+        return ((brick.rect.y - BRICK_TOP) // BRICK_CONFIG['height'], brick.rect.x // BRICK_CONFIG['width'])
+
+    def __len__(self):
+        """남은 벽돌 수"""
+        return len(self.cells)
+
+    def remove(self, brick):
+        self.cells.pop(self.cell_of(brick), None)
+
+    def query(self, rect):
+        """rect가 걸친 칸의 벽돌 (줄 → 열 순서, 벽돌 목록과 같은 순서)"""
+        top = max(0, (rect.top - BRICK_TOP) // BRICK_CONFIG['height'])
+        bottom = min(self.rows - 1, (rect.bottom - BRICK_TOP) // BRICK_CONFIG['height'])
+        if top > bottom:
+            return []
+        left = max(0, rect.left // BRICK_CONFIG['width'])
+        right = min(BRICK_CONFIG['cols'] - 1, rect.right // BRICK_CONFIG['width'])
+        cells = self.cells
+        return [brick for row in range(top, bottom + 1) for col in range(left, right + 1)
+                for brick in (cells.get((row, col)),) if brick is not None and brick.active]
+
+def _sweep_circle_corner(x, y, dx, dy, radius, cx, cy, limit):
+    """(x, y)에서 (dx, dy)로 움직이는 원이 모서리 점 (cx, cy)에 닿는 시각과 법선"""
+    fx, fy = x - cx, y - cy
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - radius * radius
+    disc = b * b - 4 * a * c
+    if a == 0 or disc < 0 or b >= 0:
+        return None  # 안 닿거나 멀어지는 중
+    t = max(0.0, (-b - math.sqrt(disc)) / (2 * a))
+    if t > limit:
+        return None
+    nx, ny = fx + dx * t, fy + dy * t
+    length = math.hypot(nx, ny)
+    return t, nx / length, ny / length
+
+def sweep_circle_rect(x, y, dx, dy, radius, rect, limit=1.0):
+    """움직이는 원과 사각형의 첫 충돌 (t, 법선 x, 법선 y). limit 안에 안 닿으면 None
+
+    사각형을 반지름만큼 키운 상자에 대해 선분 검사를 하고, 닿은 곳이 모서리 쪽이면
+    모서리 점에 대한 원 검사로 다시 구한다. 이미 겹쳐 있으면 안으로 들어가는 중일 때만 t=0.
+    """
+    left, right = rect.left - radius, rect.right + radius
+    top, bottom = rect.top - radius, rect.bottom + radius
+    inf = float('inf')
+    if dx:
+        tx0, tx1 = sorted(((left - x) / dx, (right - x) / dx))
+    elif left < x < right:
+        tx0, tx1 = -inf, inf
+    else:
+        return None
+    if dy:
+        ty0, ty1 = sorted(((top - y) / dy, (bottom - y) / dy))
+    elif top < y < bottom:
+        ty0, ty1 = -inf, inf
+    else:
+        return None
+    t0, t1 = max(tx0, ty0), min(tx1, ty1)
+    if t0 > t1 or t1 <= 0 or t0 > limit:
+        return None
+
+    if t0 < 0:
+        # 시작할 때 이미 키운 상자 안: 진짜로 겹쳤는지 가장 가까운 점으로 확인
+        qx, qy = min(max(x, rect.left), rect.right), min(max(y, rect.top), rect.bottom)
+        if (x - qx) ** 2 + (y - qy) ** 2 >= radius * radius:
+            return _sweep_circle_corner(x, y, dx, dy, radius, qx, qy, limit)  # 모서리 옆 빈 곳
+        if (qx, qy) != (x, y):
+            dist = math.hypot(x - qx, y - qy)
+            nx, ny = (x - qx) / dist, (y - qy) / dist
+        elif abs((x - rect.centerx) / (rect.width / 2)) > abs((y - rect.centery) / (rect.height / 2)):
+            nx, ny = (1 if x > rect.centerx else -1), 0
+        else:
+            nx, ny = 0, (1 if y > rect.centery else -1)
+        return (0.0, nx, ny) if dx * nx + dy * ny < 0 else None
+
+    px, py = x + dx * t0, y + dy * t0
+    cx = rect.left if px < rect.left else rect.right if px > rect.right else None
+    cy = rect.top if py < rect.top else rect.bottom if py > rect.bottom else None
+    if cx is not None and cy is not None:
+        return _sweep_circle_corner(x, y, dx, dy, radius, cx, cy, limit)
+    if tx0 > ty0:
+        return t0, (-1 if dx > 0 else 1), 0
+    return t0, 0, (-1 if dy > 0 else 1)
+
 class Item(GameObject):
     def update(self):
         self.y += 3
@@ -2539,9 +6120,9 @@ class Item(GameObject):
         if self.active:
             pygame.draw.circle(WINDOW, (50, 150, 255), (int(self.x), int(self.y)), 15)
             pygame.draw.circle(WINDOW, (100, 180, 255), (int(self.x), int(self.y)), 12)
-            txt = FONTS['tiny'].render("SPD", True, COLORS['white'])
+            txt = TextCache.render('tiny', "SPD", COLORS['white'])
             WINDOW.blit(txt, (self.x - txt.get_width()//2, self.y - 8))
-            txt2 = FONTS['tiny'].render("x2", True, COLORS['white'])
+            txt2 = TextCache.render('tiny', "x2", COLORS['white'])
             WINDOW.blit(txt2, (self.x - txt2.get_width()//2, self.y + 1))
 
 class PaddleItem(GameObject):
@@ -2554,9 +6135,9 @@ class PaddleItem(GameObject):
         if self.active:
             pygame.draw.circle(WINDOW, (255, 150, 50), (int(self.x), int(self.y)), 15)
             pygame.draw.circle(WINDOW, (255, 180, 100), (int(self.x), int(self.y)), 12)
-            txt = FONTS['tiny'].render("PAD", True, COLORS['white'])
+            txt = TextCache.render('tiny', "PAD", COLORS['white'])
             WINDOW.blit(txt, (self.x - txt.get_width()//2, self.y - 8))
-            txt2 = FONTS['tiny'].render("+", True, COLORS['white'])
+            txt2 = TextCache.render('tiny', "+", COLORS['white'])
             WINDOW.blit(txt2, (self.x - txt2.get_width()//2, self.y + 1))
 
 def select_difficulty():
@@ -2565,26 +6146,26 @@ def select_difficulty():
         ('normal', '보통', pygame.K_2),
         ('hard', '어려움', pygame.K_3)
     ]
+    buttons = [pygame.Rect(WIDTH//2 - 200, 230 + i * 100, 400, 70) for i in range(len(difficulties))]
+    frames = FrameScheduler("난이도 선택")
     
     while True:
-        WINDOW.fill(COLORS['bg'])
-        UIDrawer.text_centered("난이도 선택", 100, 'large')
-        
-        buttons = []
-        for i, (_, name, _) in enumerate(difficulties):
-            btn = pygame.Rect(WIDTH//2 - 200, 230 + i * 100, 400, 70)
-            pygame.draw.rect(WINDOW, (237, 229, 218), btn, border_radius=10)
-            pygame.draw.rect(WINDOW, COLORS['outline'], btn, 3, border_radius=10)
-            
-            txt_diff = FONTS['medium'].render(f"{i+1}. {name}", True, COLORS['font'])
-            WINDOW.blit(txt_diff, (WIDTH//2 - txt_diff.get_width()//2, 255 + i * 100))
-            buttons.append(btn)
-        
-        UIDrawer.text_centered("클릭하거나 숫자키(1,2,3)를 눌러 선택", 610, 'small')
-        UIDrawer.text_centered("ESC: 메뉴로 돌아가기", 650, 'small')
-        pygame.display.update()
+        if frames.redraw:
+            WINDOW.fill(COLORS['bg'])
+            UIDrawer.text_centered("난이도 선택", 100, 'large')
+
+            for i, (btn, (_, name, _)) in enumerate(zip(buttons, difficulties)):
+                pygame.draw.rect(WINDOW, (237, 229, 218), btn, border_radius=10)
+                pygame.draw.rect(WINDOW, COLORS['outline'], btn, 3, border_radius=10)
+
+                txt_diff = TextCache.render('medium', f"{i+1}. {name}", COLORS['font'])
+                WINDOW.blit(txt_diff, (WIDTH//2 - txt_diff.get_width()//2, 255 + i * 100))
+
+            UIDrawer.text_centered("클릭하거나 숫자키(1,2,3)를 눌러 선택", 610, 'small')
+            UIDrawer.text_centered("ESC: 메뉴로 돌아가기", 650, 'small')
+            pygame.display.update()
         
-        for event in pygame.event.get():
+        for event in frames.wait():
             if event.type == pygame.QUIT:
                 return None
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -2627,7 +6208,7 @@ def create_bricks(settings):
                 new_balls = 1 if idx in ball_indices else 0
                 has_paddle_item = idx in paddle_indices
                 bricks.append(Brick(col * BRICK_CONFIG['width'] + 2, 
-                                  row * BRICK_CONFIG['height'] + 50, 
+                                  row * BRICK_CONFIG['height'] + BRICK_TOP, 
                                   brick_types[idx], new_balls, has_paddle_item))
                 idx += 1
     return bricks
@@ -2641,6 +6222,7 @@ def run_breakout():
     paddle = Paddle(settings['paddle'])
     balls = [Ball(speed=settings['speed'])]
     bricks = create_bricks(settings)
+    brick_grid = BrickGrid(bricks)
     items = []
     paddle_items = []  # 패들 아이템 리스트
     
@@ -2650,34 +6232,31 @@ def run_breakout():
     start_time, elapsed = None, 0
 
     lb = LeaderboardManager.load(GAME_BREAKOUT, difficulty)
-    clock = pygame.time.Clock()
+    frames = FixedStepLoop("블록깨기")
 
-    while True:
-        clock.tick(FPS)
+    def on_brick_hit(brick):
+        if not brick.hit():
+            return
+        brick_grid.remove(brick)
+        if brick.type == 'speed':
+            items.append(Item(brick.rect.centerx, brick.rect.centery))
+        
+        # 패들 아이템 드롭
+        if brick.has_paddle_item:
+            paddle_items.append(PaddleItem(brick.rect.centerx, brick.rect.centery))
+        
+        for _ in range(brick.new_balls_count):
+            new_ball = Ball(brick.rect.centerx, brick.rect.centery, settings['speed'], spawn_down=True)
+            new_ball.active = True
+            balls.append(new_ball)
 
-        # 게임 오버 후 5초 자동 메뉴 복귀
-        if game_over:
-            game_over_timer += 1
-            if game_over_timer >= 300:  # 5초 (60 FPS * 5)
-                return MENU
+    while True:
+        events = frames.wait()
         
         if game_started and not game_over and start_time:
             elapsed = (pygame.time.get_ticks() - start_time) / 1000
         
-        keys = pygame.key.get_pressed()
-        if not game_over and not entering_pw:
-            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                paddle.move(-1)
-                for ball in balls:
-                    if not ball.active:
-                        ball.x = paddle.rect.centerx
-            if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                paddle.move(1)
-                for ball in balls:
-                    if not ball.active:
-                        ball.x = paddle.rect.centerx
-        
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 return None
             
@@ -2704,99 +6283,78 @@ def run_breakout():
                             ball.active = True
                         game_started, start_time = True, pygame.time.get_ticks()
         
-        if not game_over and not entering_pw and game_started:
-            paddle.update()
+        for _ in range(frames.steps):
+            # 게임 오버 후 5초 자동 메뉴 복귀
+            if game_over:
+                game_over_timer += 1
+                if game_over_timer >= 300:  # 5초 (60 스텝 * 5)
+                    return MENU
+            frames.snapshot(balls, items, paddle_items)
             
-            for ball in balls:
-                ball.update()
-                
-                if ball.active:
-                    if (ball.y + ball.radius >= paddle.rect.y and 
-                        ball.y - ball.radius <= paddle.rect.bottom and
-                        paddle.rect.left <= ball.x <= paddle.rect.right):
-                        hit_pos = (ball.x - paddle.rect.x) / paddle.width
-                        angle = -60 + hit_pos * 120
-                        speed = math.sqrt(ball.dx**2 + ball.dy**2)
-                        ball.dx = speed * math.sin(math.radians(angle))
-                        ball.dy = -speed * math.cos(math.radians(angle))
-                        ball.y = paddle.rect.y - ball.radius
-                    
-                    for brick in bricks:
-                        if not brick.active:
-                            continue
-                        
-                        if (ball.x + ball.radius >= brick.rect.left and 
-                            ball.x - ball.radius <= brick.rect.right and
-                            ball.y + ball.radius >= brick.rect.top and 
-                            ball.y - ball.radius <= brick.rect.bottom):
-                            
-                            if brick.hit():
-                                if brick.type == 'speed':
-                                    items.append(Item(brick.rect.centerx, brick.rect.centery))
-                                
-                                # 패들 아이템 드롭
-                                if brick.has_paddle_item:
-                                    paddle_items.append(PaddleItem(brick.rect.centerx, brick.rect.centery))
-                                
-                                for _ in range(brick.new_balls_count):
-                                    new_ball = Ball(brick.rect.centerx, brick.rect.centery, settings['speed'], spawn_down=True)
-                                    new_ball.active = True
-                                    balls.append(new_ball)
-                            
-                            dx = ball.x - brick.rect.centerx
-                            dy = ball.y - brick.rect.centery
-                            
-                            if abs(dx / (brick.rect.width/2)) > abs(dy / (brick.rect.height/2)):
-                                ball.dx = -ball.dx
-                                ball.x = brick.rect.right + ball.radius if dx > 0 else brick.rect.left - ball.radius
-                            else:
-                                ball.dy = -ball.dy
-                                ball.y = brick.rect.bottom + ball.radius if dy > 0 else brick.rect.top - ball.radius
-                            break
+            keys = pygame.key.get_pressed()
+            if not game_over and not entering_pw:
+                if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+                    paddle.move(-1)
+                    for ball in balls:
+                        if not ball.active:
+                            ball.x = paddle.rect.centerx
+                if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+                    paddle.move(1)
+                    for ball in balls:
+                        if not ball.active:
+                            ball.x = paddle.rect.centerx
             
-            # 속도 아이템 처리
-            for item in items[:]:
-                if not item.active:
-                    items.remove(item)
-                    continue
-                item.update()
-                if (item.y + 15 >= paddle.rect.y and 
-                    item.y - 15 <= paddle.rect.bottom and
-                    item.x >= paddle.rect.left and 
-                    item.x <= paddle.rect.right):
-                    items.remove(item)
-                    for b in [b for b in balls if b.active]:
-                        b.apply_boost(5000)
-                    paddle.apply_boost(5000)
+            if not game_over and not entering_pw and game_started:
+                paddle.update()
             
-            # 패들 아이템 처리
-            for paddle_item in paddle_items[:]:
-                if not paddle_item.active:
-                    paddle_items.remove(paddle_item)
-                    continue
-                paddle_item.update()
-                if (paddle_item.y + 15 >= paddle.rect.y and 
-                    paddle_item.y - 15 <= paddle.rect.bottom and
-                    paddle_item.x >= paddle.rect.left and 
-                    paddle_item.x <= paddle.rect.right):
-                    paddle_items.remove(paddle_item)
-                    paddle.expand(10000)  # 10초간 확장
+                for ball in balls:
+                    ball.update(paddle, brick_grid, on_brick_hit)
             
-            balls = [b for b in balls if not (b.active and b.y > HEIGHT)]
+                # 속도 아이템 처리
+                for item in items[:]:
+                    if not item.active:
+                        items.remove(item)
+                        continue
+                    item.update()
+                    if (item.y + 15 >= paddle.rect.y and 
+                        item.y - 15 <= paddle.rect.bottom and
+                        item.x >= paddle.rect.left and 
+                        item.x <= paddle.rect.right):
+                        items.remove(item)
+                        for b in [b for b in balls if b.active]:
+                            b.apply_boost(5000)
+                        paddle.apply_boost(5000)
             
-            if not any(b.active for b in balls):
-                game_over, game_won = True, False
+                # 패들 아이템 처리
+                for paddle_item in paddle_items[:]:
+                    if not paddle_item.active:
+                        paddle_items.remove(paddle_item)
+                        continue
+                    paddle_item.update()
+                    if (paddle_item.y + 15 >= paddle.rect.y and 
+                        paddle_item.y - 15 <= paddle.rect.bottom and
+                        paddle_item.x >= paddle.rect.left and 
+                        paddle_item.x <= paddle.rect.right):
+                        paddle_items.remove(paddle_item)
+                        paddle.expand(10000)  # 10초간 확장
             
-            if all(not b.active for b in bricks) and not game_over:
-                game_over, game_won = True, True
-                lb = LeaderboardManager.update(GAME_BREAKOUT, int(elapsed), difficulty, student_id=CURRENT_STUDENT_ID)
+                balls = [b for b in balls if not (b.active and b.y > HEIGHT)]
+            
+                if not any(b.active for b in balls):
+                    game_over, game_won = True, False
+            
+                if not brick_grid and not game_over:
+                    game_over, game_won = True, True
+                    lb = LeaderboardManager.update(GAME_BREAKOUT, int(elapsed), difficulty, student_id=CURRENT_STUDENT_ID)
         
         WINDOW.fill(COLORS['bg'])
         pygame.draw.rect(WINDOW, (50, 50, 50), (0, 0, GAME_WIDTH, HEIGHT))
         
         paddle.draw()
+        frames.interpolate(balls, items, paddle_items)
         for obj in balls + bricks + items + paddle_items:
             obj.draw()
+        frames.restore()
         
         if not game_started and not game_over:
             UIDrawer.text_centered("스페이스바를 눌러 시작", HEIGHT//2, 'medium', COLORS['white'])
@@ -2808,11 +6366,11 @@ def run_breakout():
             UIDrawer.admin_mode_overlay()
         
         y = 20
-        WINDOW.blit(FONTS['small'].render("난이도:", True, COLORS['font']), (GAME_WIDTH + 10, y))
-        WINDOW.blit(FONTS['small'].render(difficulty.upper(), True, COLORS['font']), (GAME_WIDTH + 10, y + 25))
+        WINDOW.blit(TextCache.render('small', "난이도:", COLORS['font']), (GAME_WIDTH + 10, y))
+        WINDOW.blit(TextCache.render('small', difficulty.upper(), COLORS['font']), (GAME_WIDTH + 10, y + 25))
         y = UIDrawer.panel_header("시간:", f"{int(elapsed)}초", y + 60)
-        WINDOW.blit(FONTS['small'].render("공:", True, COLORS['font']), (GAME_WIDTH + 10, y))
-        WINDOW.blit(FONTS['small'].render(str(len([b for b in balls if b.active])), True, COLORS['font']), 
+        WINDOW.blit(TextCache.render('small', "공:", COLORS['font']), (GAME_WIDTH + 10, y))
+        WINDOW.blit(TextCache.render('small', str(len([b for b in balls if b.active])), COLORS['font']), 
                    (GAME_WIDTH + 10, y + 25))
         y += 50
         UIDrawer.panel_separator(y)
@@ -2825,6 +6383,141 @@ def run_breakout():
         
         pygame.display.update()
 
+def run_breakout_benchmark(balls=200, frames=600, seed=1):
+    """공 N개 스트레스: 벽돌 전체 검사 vs BrickGrid 충돌 처리 시간 (두 방식의 결과가 같은지도 확인)"""
+    ball_count, frames, seed = int(balls), int(frames), int(seed)
+
+    class FullScan:
+        """BrickGrid 없이 매번 벽돌 전부를 후보로 주는 비교용 색인"""
+        def __init__(self, bricks):
+            self.bricks = bricks
+
+        def __len__(self):
+            return sum(brick.active for brick in self.bricks)
+
+        def remove(self, brick):
+            pass
+
+        def query(self, rect):
+            return [brick for brick in self.bricks if brick.active]
+
+    def simulate(use_grid):
+        random.seed(seed)
+        bricks = create_bricks(DIFFICULTY['hard'])
+        for brick in bricks:
+            brick.dur = brick.max_dur = 20  # 벽돌이 너무 빨리 없어지지 않도록
+        grid = BrickGrid(bricks) if use_grid else FullScan(bricks)
+        balls = [Ball(random.uniform(50, GAME_WIDTH - 50), random.uniform(350, HEIGHT - 50)) for _ in range(ball_count)]
+        for ball in balls:
+            ball.active = True
+
+        def on_brick_hit(brick):
+            if brick.hit():
+                grid.remove(brick)
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            for ball in balls:
+                ball.update(None, grid, on_brick_hit)
+                if ball.y + ball.radius >= HEIGHT:  # 바닥에서도 튕김 (공 수 유지)
+                    ball.dy, ball.y = -abs(ball.dy), HEIGHT - ball.radius
+        elapsed = (time.perf_counter() - start) * 1000 / frames
+        state = ([(ball.x, ball.y, ball.dx, ball.dy) for ball in balls], [brick.dur for brick in bricks])
+        return elapsed, state, len(grid)
+
+    scan_ms, scan_state, _ = simulate(False)
+    grid_ms, grid_state, left = simulate(True)
+    same = scan_state == grid_state
+    print(f"  공 {ball_count}개, 벽돌 {len(scan_state[1])}개, {frames}프레임 (남은 벽돌 {left})")
+    print(f"  전체 검사: {scan_ms:.2f} ms/프레임, BrickGrid: {grid_ms:.2f} ms/프레임 "
+          f"({scan_ms / grid_ms:.1f}배), 결과 {'같음' if same else '다름'}")
+    return same
+
+def run_breakout_collision_test(speeds="2,4", seed=1):
+    """빠른 공 회귀 검사 (배속마다): 벽돌/패들 통과, 공 50개 장시간 (겹침, 판 밖, 속력, 재현성)"""
+    ok = True
+    base = BALL_CONFIG['speed']
+    for multiplier in (float(s) for s in speeds.split(',')):
+        speed = base * multiplier
+        failures = []
+
+        # 1) 아래에서 곧게 올라가다 벽돌 하나에 닿기 (출발 위치를 한 프레임 이동 거리 안에서 바꿔 가며)
+        for phase in range(20):
+            brick = Brick(3 * BRICK_CONFIG['width'] + 2, 4 * BRICK_CONFIG['height'] + BRICK_TOP, '1')
+            grid, hits = BrickGrid([brick]), []
+            ball = Ball(brick.rect.centerx, brick.rect.bottom + 200 + speed * phase / 20)
+            ball.dx, ball.dy, ball.active = 0.01 * speed, -speed, True
+            for _ in range(60):
+                ball.update(None, grid, lambda b: hits.append(b) or b.hit())
+                if ball.y < brick.rect.bottom + ball.radius - 1e-6:
+                    failures.append(f"벽돌 통과 (phase {phase})")
+                    break
+                if ball.dy > 0:
+                    break  # 튕겨 나옴
+            if len(hits) != 1 or ball.dy <= 0:
+                failures.append(f"벽돌 충돌 {len(hits)}번 (phase {phase})")
+
+        # 2) 위에서 곧게 떨어지다 패들에 닿기
+        for phase in range(20):
+            paddle = Paddle()
+            ball = Ball(paddle.rect.centerx, paddle.rect.top - 200 - speed * phase / 20)
+            ball.dx, ball.dy, ball.active = 0.0, speed, True
+            for _ in range(60):
+                ball.update(paddle)
+                if ball.y > paddle.rect.top - ball.radius + 1e-6:
+                    failures.append(f"패들 통과 (phase {phase})")
+                    break
+                if ball.dy < 0:
+                    break  # 튕겨 나옴
+            if ball.dy >= 0:
+                failures.append(f"패들에서 안 튕김 (phase {phase})")
+
+        # 3) 공 여러 개를 벽돌 사이에서 오래 돌리기 (두 번 돌려서 결과가 같은지도 비교)
+        def soak():
+            random.seed(seed)
+            bricks = create_bricks(DIFFICULTY['hard'])
+            grid = BrickGrid(bricks)
+            balls = [Ball(random.uniform(50, GAME_WIDTH - 50), random.uniform(350, HEIGHT - 50), speed)
+                     for _ in range(50)]
+            for ball in balls:
+                ball.active = True
+            problems = []
+
+            def on_brick_hit(brick):
+                if brick.hit():
+                    grid.remove(brick)
+
+            for frame in range(600):
+                for ball in balls:
+                    ball.update(None, grid, on_brick_hit)
+                    if ball.y + ball.radius >= HEIGHT:
+                        ball.dy, ball.y = -abs(ball.dy), HEIGHT - ball.radius
+                    if not (ball.radius - 1e-6 <= ball.x <= GAME_WIDTH - ball.radius + 1e-6
+                            and ball.y >= ball.radius - 1e-6):
+                        problems.append(f"판 밖 (프레임 {frame})")
+                    if abs(math.hypot(ball.dx, ball.dy) - speed) > 1e-6:
+                        problems.append(f"속력 변함 (프레임 {frame})")
+                    area = pygame.Rect(int(ball.x - ball.radius) - 1, int(ball.y - ball.radius) - 1,
+                                       2 * ball.radius + 3, 2 * ball.radius + 3)
+                    for brick in grid.query(area):
+                        qx = min(max(ball.x, brick.rect.left), brick.rect.right)
+                        qy = min(max(ball.y, brick.rect.top), brick.rect.bottom)
+                        if math.hypot(ball.x - qx, ball.y - qy) < ball.radius - 1e-6:
+                            problems.append(f"벽돌과 겹침 (프레임 {frame})")
+            state = [(ball.x, ball.y, ball.dx, ball.dy) for ball in balls], [brick.dur for brick in bricks]
+            return problems, state
+
+        problems, first = soak()
+        _, second = soak()
+        failures += problems
+        if first != second:
+            failures.append("같은 입력인데 결과가 다름")
+
+        print(f"  속도 {multiplier:g}배 ({speed:g}px/프레임): "
+              + ("통과" if not failures else f"실패 {len(failures)}건: {', '.join(failures[:5])}"))
+        ok &= not failures
+    return ok
+
 # ==================== 타이핑 게임 ====================
 class Cupcake(GameObject):
     """기본 공격용 컵케이크"""
@@ -2974,7 +6667,7 @@ class Robot(GameObject):
             pygame.draw.circle(WINDOW, COLORS['black'], 
                              (int(self.x + dx), int(self.y - eye_offset//2)), 3)
         
-        word_surface = FONTS['medium'].render(self.word, True, COLORS['black'])
+        word_surface = TextCache.render('medium', self.word, COLORS['black'])
         word_rect = word_surface.get_rect(center=(self.x, self.y + self.size))
         
         bg_color = (255, 220, 220) if self.is_special else COLORS['white']
@@ -2985,7 +6678,7 @@ class Robot(GameObject):
         
         if self.is_special:
             remaining = self.hits_required - self.hits_taken
-            hits_text = FONTS['small'].render(f"x{remaining}", True, COLORS['red'])
+            hits_text = TextCache.render('small', f"x{remaining}", COLORS['red'])
             WINDOW.blit(hits_text, hits_text.get_rect(center=(self.x, self.y + self.size + 25)))
     
     def hit(self, powerful=False):
@@ -3035,7 +6728,7 @@ class Heart(GameObject):
                  (self.x, self.y + 15), (self.x + 15, self.y - 8)]
         pygame.draw.polygon(WINDOW, COLORS['red'], points)
         
-        word_surface = FONTS['small'].render(self.word, True, COLORS['red'])
+        word_surface = TextCache.render('small', self.word, COLORS['red'])
         word_rect = word_surface.get_rect(center=(self.x, self.y + 30))
         bg_rect = word_rect.inflate(6, 4)
         pygame.draw.rect(WINDOW, COLORS['white'], bg_rect)
@@ -3069,7 +6762,7 @@ class CakeItem(GameObject):
             pygame.draw.circle(WINDOW, COLORS['red'], (int(self.x), int(self.y - 15)), 5)
 
         # 단어 표시
-        word_surface = FONTS['small'].render(self.word, True, COLORS['brown'])
+        word_surface = TextCache.render('small', self.word, COLORS['brown'])
         word_rect = word_surface.get_rect(center=(self.x, self.y + 35))
         bg_rect = word_rect.inflate(6, 4)
         pygame.draw.rect(WINDOW, (255, 245, 220), bg_rect)
@@ -3134,22 +6827,15 @@ def run_typing():
     start_time, elapsed = pygame.time.get_ticks(), 0
 
     lb = LeaderboardManager.load(GAME_TYPING)
-    clock = pygame.time.Clock()
+    frames = FixedStepLoop("타이핑")
 
     while True:
-        clock.tick(FPS)
-
-        # 게임 오버 후 5초 자동 메뉴 복귀
-        if game_over:
-            game_over_timer += 1
-            if game_over_timer >= 300:  # 5초 (60 FPS * 5)
-                pygame.key.stop_text_input()
-                return MENU
+        events = frames.wait()
         
         if not game_over and not stage_clear:
             elapsed = (pygame.time.get_ticks() - start_time) / 1000
         
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.key.stop_text_input()
                 return None
@@ -3239,7 +6925,17 @@ def run_typing():
                         score = target_score
                         stage_clear = True
         
-        if not game_over and not stage_clear and not entering_pw:
+        for _ in range(frames.steps):
+            # 게임 오버 후 5초 자동 메뉴 복귀
+            if game_over:
+                game_over_timer += 1
+                if game_over_timer >= 300:  # 5초 (60 스텝 * 5)
+                    pygame.key.stop_text_input()
+                    return MENU
+            if game_over or stage_clear or entering_pw:
+                continue
+            frames.snapshot(hearts, robots, cakes, particles, cake_items)
+            
             spawn_timer += 1
             if spawn_timer >= spawn_delay and len(robots) < 8:
                 robots.append(Robot(stage))
@@ -3318,19 +7014,21 @@ def run_typing():
         pygame.draw.rect(WINDOW, current_concept['ground_color'], (0, HEIGHT - 120, GAME_WIDTH, 120))
         draw_house()
         
+        frames.interpolate(hearts, robots, cakes, particles, cake_items)
         for obj in hearts + robots + cakes + particles + cake_items:
             obj.draw()
+        frames.restore()
         
-        stage_text = FONTS['title'].render(f"단계: {stage}", True, COLORS['black'])
-        score_text = FONTS['title'].render(f"점수: {score}", True, COLORS['black'])
+        stage_text = TextCache.render('title', f"단계: {stage}", COLORS['black'])
+        score_text = TextCache.render('title', f"점수: {score}", COLORS['black'])
         if target_score >= 1000:
-            progress_text = FONTS['tiny'].render(f"{score}/{target_score}", True, COLORS['black'])
+            progress_text = TextCache.render('tiny', f"{score}/{target_score}", COLORS['black'])
         else:
-            progress_text = FONTS['small'].render(f"{score}/{target_score}", True, COLORS['black'])
+            progress_text = TextCache.render('small', f"{score}/{target_score}", COLORS['black'])
         
         WINDOW.blit(stage_text, (10, 15))
         WINDOW.blit(score_text, (GAME_WIDTH // 2 - score_text.get_width() // 2, 15))
-        WINDOW.blit(FONTS['tiny'].render("목표:", True, COLORS['black']), (GAME_WIDTH - 160, 15))
+        WINDOW.blit(TextCache.render('tiny', "목표:", COLORS['black']), (GAME_WIDTH - 160, 15))
         WINDOW.blit(progress_text, (GAME_WIDTH - 160, 30))
 
         for i in range(max_hp):
@@ -3344,7 +7042,7 @@ def run_typing():
         # 케이크 보유량 표시 (3단계 이상부터)
         if stage >= 3:
             cake_x, cake_y = 10, 115
-            cake_label = FONTS['small'].render("케이크:", True, COLORS['brown'])
+            cake_label = TextCache.render('small', "케이크:", COLORS['brown'])
             WINDOW.blit(cake_label, (cake_x, cake_y))
             for i in range(3):
                 cx = cake_x + 70 + i * 35
@@ -3369,9 +7067,9 @@ def run_typing():
         
         display_text = current_input + composing_text
         if display_text:
-            input_text = FONTS['huge'].render(display_text, True, COLORS['black'])
+            input_text = TextCache.render('huge', display_text, COLORS['black'])
         else:
-            input_text = FONTS['small'].render("단어를 입력하세요...", True, (150, 150, 150))
+            input_text = TextCache.render('small', "단어를 입력하세요...", (150, 150, 150))
         
         input_rect = input_text.get_rect(midleft=(input_box.x + 15, input_box.centery))
         WINDOW.blit(input_text, input_rect)
@@ -3389,12 +7087,12 @@ def run_typing():
             UIDrawer.admin_mode_overlay()
             cheat_info = ["2키: 스킵", "무적 모드"]
             for i, info in enumerate(cheat_info):
-                txt = FONTS['tiny'].render(info, True, COLORS['white'])
+                txt = TextCache.render('tiny', info, COLORS['white'])
                 WINDOW.blit(txt, (WIDTH - 250, 50 + i * 15))
         
         y = UIDrawer.panel_header("점수:", score)
-        WINDOW.blit(FONTS['small'].render("시간:", True, COLORS['font']), (GAME_WIDTH + 10, y))
-        WINDOW.blit(FONTS['small'].render(f"{int(elapsed)}초", True, COLORS['font']), (GAME_WIDTH + 10, y + 25))
+        WINDOW.blit(TextCache.render('small', "시간:", COLORS['font']), (GAME_WIDTH + 10, y))
+        WINDOW.blit(TextCache.render('small', f"{int(elapsed)}초", COLORS['font']), (GAME_WIDTH + 10, y + 25))
         y += 50
         UIDrawer.panel_separator(y)
         UIDrawer.leaderboard(lb, y + 10, is_typing=True)
@@ -3427,12 +7125,105 @@ def run_typing():
     pygame.key.stop_text_input()
 
 # ==================== 블록블라스트 ====================
+class BlockBlastSampler:
+    """점수 구간별 블록 뽑기표 (누적 가중치)
+
+    구간마다 (상한, 모양 목록, 누적 가중치)를 한 번 만들어 두고 이분 탐색으로 뽑는다.
+    가중치는 BLOCKBLAST_WEIGHTS 위에 BLOCKBLAST_WEIGHTS_FILE을 덮어쓴 값이고,
+    reload()가 파일 수정 시각이 바뀌었을 때만 다시 읽는다 (블록 3개를 새로 받을 때마다 호출).
+    """
+    weights = dict(BLOCKBLAST_WEIGHTS)
+    brackets = []
+    mtime = None        # 마지막으로 읽은 가중치 파일의 수정 시각 (없으면 None)
+    source = "기본값"   # 지금 가중치를 어디서 가져왔는지
+
+    @classmethod
+    def build(cls, weights):
+        """가중치로 구간별 뽑기표 만들기 (잘못된 값이면 ValueError)"""
+        for group, weight in weights.items():
+            if group not in BLOCKBLAST_SHAPE_GROUPS:
+                raise ValueError(f"알 수 없는 블록 종류: {group}")
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not 0 <= weight < math.inf:
+                raise ValueError(f"{group} 가중치는 0 이상의 숫자여야 합니다: {weight!r}")
+
+        brackets = []
+        for limit, groups in BLOCKBLAST_SCORE_BRACKETS:
+            shapes, cum_weights, total = [], [], 0
+            for group in groups:
+                if weights[group] > 0:
+                    for shape in BLOCKBLAST_SHAPE_GROUPS[group]:
+                        total += weights[group]
+                        shapes.append(shape)
+                        cum_weights.append(total)
+            if not shapes:
+                raise ValueError(f"점수 {limit} 미만 구간에 나올 수 있는 블록이 없습니다")
+            brackets.append((limit, shapes, cum_weights))
+        cls.weights = dict(weights)
+        cls.brackets = brackets
+
+    @classmethod
+    def reload(cls):
+        """가중치 파일이 바뀌었으면 다시 읽기 (파일이 없어지면 기본값, 잘못된 파일이면 이전 값 유지)"""
+        try:
+            mtime = os.path.getmtime(BLOCKBLAST_WEIGHTS_FILE)
+        except OSError:
+            mtime = None
+        if mtime == cls.mtime:
+            return False
+        cls.mtime = mtime
+
+        weights = dict(BLOCKBLAST_WEIGHTS)
+        try:
+            if mtime is not None:
+                with open(BLOCKBLAST_WEIGHTS_FILE, 'r', encoding='utf-8') as f:
+                    overrides = json.load(f)
+                if not isinstance(overrides, dict):
+                    raise ValueError("{\"종류\": 가중치} 형식이어야 합니다")
+                weights.update(overrides)
+            cls.build(weights)
+        except (OSError, ValueError) as e:
+            debug_log('GAME', f"블록 가중치 파일 무시 ({BLOCKBLAST_WEIGHTS_FILE}): {e}")
+            return False
+        cls.source = BLOCKBLAST_WEIGHTS_FILE if mtime is not None else "기본값"
+        debug_log('GAME', f"블록 가중치 적용: {cls.weights}")
+        return True
+
+    @classmethod
+    def bracket(cls, score):
+        """점수에 맞는 (상한, 모양 목록, 누적 가중치)"""
+        for entry in cls.brackets:
+            if entry[0] is None or score < entry[0]:
+                return entry
+        return cls.brackets[-1]
+
+    @classmethod
+    def pick(cls, score):
+        """점수 구간에 맞게 모양 하나 뽑기"""
+        _, shapes, cum_weights = cls.bracket(score)
+        return shapes[bisect(cum_weights, random.random() * cum_weights[-1])]
+
+    @classmethod
+    def probabilities(cls, score):
+        """점수 구간의 [(모양, 확률)]"""
+        _, shapes, cum_weights = cls.bracket(score)
+        total = cum_weights[-1]
+        return [(shape, (cum - prev) / total)
+                for shape, cum, prev in zip(shapes, cum_weights, [0] + cum_weights[:-1])]
+
+BlockBlastSampler.build(BLOCKBLAST_WEIGHTS)
+BlockBlastSampler.reload()
+
 class BlockBlastPiece:
     def __init__(self, shape):
         self.shape = [row[:] for row in shape]
         self.color = random.choice(BLOCKBLAST_COLORS)
         self.width = len(self.shape[0]) if self.shape else 0
         self.height = len(self.shape)
+        # 채워진 칸의 (행, 열) 오프셋
+        self.cells = [(r, c) for r, row in enumerate(self.shape) for c, cell in enumerate(row) if cell]
+        # 비트마스크 배치 정보 (BLOCKBLAST_PLACEMENTS에 미리 계산됨)
+        placement = BLOCKBLAST_PLACEMENTS.get(tuple(map(tuple, self.shape)))
+        self.deltas, self.origins, self.masks = placement or _build_blockblast_masks(self.shape)
     
     def draw(self, x, y, cell_size, alpha=255):
         """블록 그리기"""
@@ -3457,9 +7248,14 @@ class BlockBlastPiece:
 class BlockBlast:
     def __init__(self):
         self.grid = [[0] * BLOCKBLAST_GRID_SIZE for _ in range(BLOCKBLAST_GRID_SIZE)]
+        # 채움 카운터와 비트마스크 (grid를 바꿀 때 fill_cell/empty_cell로 같이 갱신)
+        self.row_fill = [0] * BLOCKBLAST_GRID_SIZE  # 행마다 채워진 칸 수
+        self.col_fill = [0] * BLOCKBLAST_GRID_SIZE  # 열마다 채워진 칸 수
+        self.filled = 0                              # 전체 채워진 칸 수
+        self.mask = 0                                # 채워진 칸 비트 (r * 크기 + c번 비트)
         self.score = 0
         self.game_over = False
-        self.game_over_timer = 0
+        self.game_over_timer = 0  # 게임 오버 후 흐른 시간 (ms)
         self.entering_pw = False
         self.pw_input = ""
         self.leaderboard = LeaderboardManager.load(GAME_BLOCKBLAST)
@@ -3493,42 +7289,31 @@ class BlockBlast:
         self.need_game_over_check = False  # 게임오버 체크 필요 플래그
     
     def new_piece(self):
-        """새로운 블록 생성 (가중치 적용)"""
-        # 가중치를 고려한 블록 풀 생성
-        if self.score < 150:
-            # 초반: 쉬운 블록만
-            weighted_shapes = BLOCKBLAST_SHAPES_EASY * BLOCKBLAST_WEIGHTS['easy']
-        elif self.score < 400:
-            # 중반: 쉬운 블록 많이, 보통 블록 조금
-            weighted_shapes = (BLOCKBLAST_SHAPES_EASY * BLOCKBLAST_WEIGHTS['easy'] +
-                             BLOCKBLAST_SHAPES_NORMAL * BLOCKBLAST_WEIGHTS['normal'])
-        elif self.score < 700:
-            # 후반: 쉬운, 보통, L자형, 어려운 블록 균형있게
-            weighted_shapes = (BLOCKBLAST_SHAPES_EASY * BLOCKBLAST_WEIGHTS['easy'] +
-                             BLOCKBLAST_SHAPES_NORMAL * BLOCKBLAST_WEIGHTS['normal'] +
-                             BLOCKBLAST_SHAPES_LSHAPE * BLOCKBLAST_WEIGHTS['lshape'] +
-                             BLOCKBLAST_SHAPES_HARD * BLOCKBLAST_WEIGHTS['hard'])
-        else:
-            # 최후반: 모든 블록 (가중치 적용)
-            weighted_shapes = (BLOCKBLAST_SHAPES_EASY * BLOCKBLAST_WEIGHTS['easy'] +
-                             BLOCKBLAST_SHAPES_NORMAL * BLOCKBLAST_WEIGHTS['normal'] +
-                             BLOCKBLAST_SHAPES_LSHAPE * BLOCKBLAST_WEIGHTS['lshape'] +
-                             BLOCKBLAST_SHAPES_HARD * BLOCKBLAST_WEIGHTS['hard'])
-
-        shape = random.choice(weighted_shapes)
-        return BlockBlastPiece(shape)
+        """새로운 블록 생성 (점수 구간별 가중치 적용, BlockBlastSampler)"""
+        return BlockBlastPiece(BlockBlastSampler.pick(self.score))
 
     def can_place_anywhere(self, piece):
         """블록을 그리드 어디든 놓을 수 있는지 확인"""
-        for r in range(BLOCKBLAST_GRID_SIZE):
-            for c in range(BLOCKBLAST_GRID_SIZE):
-                if self.can_place(piece, r, c):
-                    return True
-        return False
+        if len(piece.cells) > BLOCKBLAST_GRID_SIZE * BLOCKBLAST_GRID_SIZE - self.filled:
+            return False  # 빈칸이 블록 칸 수보다 적음
+        return self.free_origins(piece) != 0
+
+    def free_origins(self, piece):
+        """블록을 놓을 수 있는 모든 원점 (r * 크기 + c번 비트)
+
+        원점 o에 놓으면 o + d칸(d: 칸별 오프셋)을 차지하므로, 보드를 d만큼 내린 것을 모두 OR하면
+        막힌 원점이 한 번에 나온다. 보드 밖으로 나가는 원점은 piece.origins에서 이미 빠져 있다.
+        """
+        board = self.mask
+        blocked = 0
+        for d in piece.deltas:
+            blocked |= board >> d
+        return piece.origins & ~blocked
 
     def generate_new_pieces(self):
         """3개의 새 블록을 생성 (최소 1개는 설치 가능하도록 보장)"""
         MAX_ATTEMPTS = 50  # 최대 시도 횟수
+        BlockBlastSampler.reload()  # 가중치 파일이 바뀌었으면 반영
 
         for attempt in range(MAX_ATTEMPTS):
             pieces = [self.new_piece() for _ in range(3)]
@@ -3546,42 +7331,51 @@ class BlockBlast:
 
     def can_place(self, piece, grid_row, grid_col):
         """블록을 놓을 수 있는지 확인"""
-        for row_idx, row in enumerate(piece.shape):
-            for col_idx, cell in enumerate(row):
-                if cell:
-                    r = grid_row + row_idx
-                    c = grid_col + col_idx
-                    if r < 0 or r >= BLOCKBLAST_GRID_SIZE or c < 0 or c >= BLOCKBLAST_GRID_SIZE:
-                        return False
-                    if self.grid[r][c] != 0:
-                        return False
-        return True
+        mask = piece.masks.get((grid_row, grid_col))  # 보드 밖으로 나가면 None
+        return mask is not None and not mask & self.mask
     
+    def fill_cell(self, r, c, color):
+        """빈칸 하나 채우기 (카운터 갱신)"""
+        self.grid[r][c] = color
+        self.row_fill[r] += 1
+        self.col_fill[c] += 1
+        self.filled += 1
+        self.mask |= 1 << (r * BLOCKBLAST_GRID_SIZE + c)
+
+    def empty_cell(self, r, c):
+        """칸 하나 비우기 (이미 비어 있으면 그대로)"""
+        if self.grid[r][c] != 0:
+            self.grid[r][c] = 0
+            self.row_fill[r] -= 1
+            self.col_fill[c] -= 1
+            self.filled -= 1
+            self.mask &= ~(1 << (r * BLOCKBLAST_GRID_SIZE + c))
+
     def place_piece(self, piece, grid_row, grid_col):
         """블록 배치"""
-        for row_idx, row in enumerate(piece.shape):
-            for col_idx, cell in enumerate(row):
-                if cell:
-                    r = grid_row + row_idx
-                    c = grid_col + col_idx
-                    self.grid[r][c] = piece.color
-        
-        # 줄 제거 확인
-        self.clear_lines()
-    
-    def clear_lines(self):
-        """완성된 행과 열 제거 (애니메이션 포함)"""
+        rows, cols = set(), set()
+        for row_idx, col_idx in piece.cells:
+            r = grid_row + row_idx
+            c = grid_col + col_idx
+            self.fill_cell(r, c, piece.color)
+            rows.add(r)
+            cols.add(c)
+
+        # 줄 제거 확인 (이번에 건드린 줄만)
+        self.clear_lines(rows, cols)
+
+    def clear_lines(self, rows=range(BLOCKBLAST_GRID_SIZE), cols=range(BLOCKBLAST_GRID_SIZE)):
+        """완성된 행과 열 제거 (애니메이션 포함)
+
+        rows/cols: 새로 완성됐을 수 있는 행/열 (기본: 전부). 제거 애니메이션 중인 줄은 항상 다시 포함한다.
+        """
         # 행 체크
-        rows_to_clear = []
-        for r in range(BLOCKBLAST_GRID_SIZE):
-            if all(self.grid[r][c] != 0 for c in range(BLOCKBLAST_GRID_SIZE)):
-                rows_to_clear.append(r)
+        rows_to_clear = sorted(r for r in set(rows).union(self.clearing_rows)
+                               if self.row_fill[r] == BLOCKBLAST_GRID_SIZE)
 
         # 열 체크
-        cols_to_clear = []
-        for c in range(BLOCKBLAST_GRID_SIZE):
-            if all(self.grid[r][c] != 0 for r in range(BLOCKBLAST_GRID_SIZE)):
-                cols_to_clear.append(c)
+        cols_to_clear = sorted(c for c in set(cols).union(self.clearing_cols)
+                               if self.col_fill[c] == BLOCKBLAST_GRID_SIZE)
 
         if rows_to_clear or cols_to_clear:
             # 애니메이션 시작
@@ -3632,10 +7426,17 @@ class BlockBlast:
             # 콤보 리셋
             self.combo_count = 0
 
-    def update_animation(self):
-        """애니메이션 업데이트"""
-        # 배경 애니메이션 타이머
-        self.background_time += 1
+    def is_animating(self):
+        """효과가 진행 중이라 매 프레임 다시 그려야 하는지 (배경 물결 제외)"""
+        return bool(PARTICLE_SYSTEM.count or FLOATING_TEXT_SYSTEM.texts or self.pulse_effects
+                    or self.dragging or self.screen_shake_timer or self.clear_animation_timer
+                    or self.combo_display_timer or self.perfect_display_timer or self.record_display_timer
+                    or (self.game_over and self.game_over_fade < 200))
+
+    def update_animation(self, frames=1):
+        """애니메이션 업데이트 (frames: 지난 호출 이후 흐른 프레임 수)"""
+        # 배경 애니메이션 타이머 (잠들어 있던 동안에도 물결은 흐른 시간만큼 진행)
+        self.background_time += frames
 
         # 화면 흔들림 업데이트
         if self.screen_shake_timer > 0:
@@ -3656,18 +7457,17 @@ class BlockBlast:
                 # 애니메이션 끝나면 실제로 제거
                 for r in self.clearing_rows:
                     for c in range(BLOCKBLAST_GRID_SIZE):
-                        self.grid[r][c] = 0
+                        self.empty_cell(r, c)
 
                 for c in self.clearing_cols:
                     for r in range(BLOCKBLAST_GRID_SIZE):
-                        self.grid[r][c] = 0
+                        self.empty_cell(r, c)
 
                 self.clearing_rows = []
                 self.clearing_cols = []
 
                 # PERFECT 체크 (모든 블록이 제거되었는지 확인)
-                all_cleared = all(self.grid[r][c] == 0 for r in range(BLOCKBLAST_GRID_SIZE) for c in range(BLOCKBLAST_GRID_SIZE))
-                if all_cleared:
+                if self.filled == 0:
                     self.perfect_display_timer = 180  # 3초 동안 표시
                     perfect_bonus = 1500
                     self.score += perfect_bonus
@@ -3704,14 +7504,7 @@ class BlockBlast:
     def check_game_over(self):
         """게임 오버 확인"""
         # 남아있는 블록 중 하나라도 놓을 수 있으면 게임 계속
-        for piece in self.available_pieces:
-            if piece is None:
-                continue
-            for r in range(BLOCKBLAST_GRID_SIZE):
-                for c in range(BLOCKBLAST_GRID_SIZE):
-                    if self.can_place(piece, r, c):
-                        return False
-        return True
+        return not any(self.can_place_anywhere(piece) for piece in self.available_pieces if piece is not None)
     
     def screen_to_grid(self, x, y, piece=None):
         """화면 좌표를 그리드 좌표로 변환 (블록 중심 기준)"""
@@ -3775,13 +7568,14 @@ class BlockBlast:
             )
         
         # 펄스 효과 그리기 (블록보다 먼저)
+        pulses = []
         for pulse_x, pulse_y, pulse_timer in self.pulse_effects:
             radius = int((30 - pulse_timer) * 2)  # 펄스가 커지는 반지름
             alpha = int(255 * (pulse_timer / 30))  # 점점 투명해짐
             if radius > 0 and alpha > 0:
-                pulse_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-                pygame.draw.circle(pulse_surf, (255, 215, 0, alpha), (radius, radius), radius, 3)
-                WINDOW.blit(pulse_surf, (int(pulse_x + shake_x - radius), int(pulse_y + shake_y - radius)))
+                pulse_surf = StampCache.get(radius, (255, 215, 0), alpha, 3)
+                pulses.append((pulse_surf, (int(pulse_x + shake_x - radius), int(pulse_y + shake_y - radius))))
+        StampCache.blit_all(WINDOW, pulses)
 
         # 배치된 블록들 (화면 흔들림 적용)
         for r in range(BLOCKBLAST_GRID_SIZE):
@@ -3916,7 +7710,7 @@ class BlockBlast:
             "자동으로 제거됩니다"
         ]
         for i, text in enumerate(controls):
-            WINDOW.blit(FONTS['tiny'].render(text, True, COLORS['font']), 
+            WINDOW.blit(TextCache.render('tiny', text, COLORS['font']), 
                        (GAME_WIDTH + 10, y + i * 18))
         
         y += len(controls) * 18 + 10
@@ -3935,28 +7729,28 @@ class BlockBlast:
             scale = 1.0 + (self.perfect_display_timer / 180.0) * 0.5
             perfect_text = "PERFECT!"
             # 큰 폰트로 표시
-            text_surf = FONTS['huge'].render(perfect_text, True, COLORS['gold'])
+            text_surf = TextCache.render('huge', perfect_text, COLORS['gold'])
             text_surf = pygame.transform.scale(text_surf,
                 (int(text_surf.get_width() * scale), int(text_surf.get_height() * scale)))
             text_rect = text_surf.get_rect(center=(GAME_WIDTH // 2, 150))
             # 그림자 효과
-            shadow_surf = FONTS['huge'].render(perfect_text, True, COLORS['black'])
+            shadow_surf = TextCache.render('huge', perfect_text, COLORS['black'])
             shadow_surf = pygame.transform.scale(shadow_surf,
                 (int(shadow_surf.get_width() * scale), int(shadow_surf.get_height() * scale)))
             WINDOW.blit(shadow_surf, (text_rect.x + 3, text_rect.y + 3))
             WINDOW.blit(text_surf, text_rect)
             # 보너스 점수 표시
             bonus_text = "+500"
-            bonus_surf = FONTS['medium'].render(bonus_text, True, COLORS['green'])
+            bonus_surf = TextCache.render('medium', bonus_text, COLORS['green'])
             WINDOW.blit(bonus_surf, (text_rect.centerx - bonus_surf.get_width() // 2, text_rect.bottom + 10))
 
         # 콤보 메시지
         if self.combo_display_timer > 0 and self.combo_count > 1:
             combo_text = f"COMBO x{self.combo_count}!"
-            combo_surf = FONTS['large'].render(combo_text, True, COLORS['orange'])
+            combo_surf = TextCache.render('large', combo_text, COLORS['orange'])
             combo_rect = combo_surf.get_rect(center=(GAME_WIDTH // 2, 220))
             # 그림자
-            shadow_surf = FONTS['large'].render(combo_text, True, COLORS['black'])
+            shadow_surf = TextCache.render('large', combo_text, COLORS['black'])
             WINDOW.blit(shadow_surf, (combo_rect.x + 2, combo_rect.y + 2))
             WINDOW.blit(combo_surf, combo_rect)
 
@@ -4077,20 +7871,21 @@ class BlockBlast:
 def run_blockblast():
     """블록블라스트 게임 실행"""
     game = BlockBlast()
-    clock = pygame.time.Clock()
+    frames = FixedStepLoop("블록블라스트")
 
     while True:
-        clock.tick(FPS)
+        # 효과가 없을 때는 배경 물결만 BLOCKBLAST_IDLE_REDRAW_MS마다 다시 그림
+        events = frames.wait(animating=game.is_animating(), timeout_ms=BLOCKBLAST_IDLE_REDRAW_MS)
 
         # 게임 오버 후 5초 자동 메뉴 복귀
         if game.game_over:
-            game.game_over_timer += 1
-            if game.game_over_timer >= 300:  # 5초 (60 FPS * 5)
+            game.game_over_timer += frames.dt
+            if game.game_over_timer >= 5000:  # 5초 (ms)
                 PARTICLE_SYSTEM.clear()  # 파티클 초기화
                 FLOATING_TEXT_SYSTEM.clear()  # 떠오르는 텍스트 초기화
                 return MENU
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 return None
             result = game.handle_event(event)
@@ -4099,13 +7894,162 @@ def run_blockblast():
                 FLOATING_TEXT_SYSTEM.clear()  # 떠오르는 텍스트 초기화
                 return result
 
-        # 애니메이션 업데이트
-        game.update_animation()
-        PARTICLE_SYSTEM.update()
-        FLOATING_TEXT_SYSTEM.update()
+        if not frames.redraw:
+            continue
+
+        # 애니메이션 업데이트 (잠들어 있던 시간도 스텝으로 따라잡음)
+        for _ in range(frames.steps):
+            game.update_animation()
+            PARTICLE_SYSTEM.update()
+            FLOATING_TEXT_SYSTEM.update()
 
         game.draw()
 
+def _blockblast_fits(grid, piece, grid_row, grid_col):
+    """칸을 하나씩 보는 배치 판정 (비트마스크 판정 확인용)"""
+    for row_idx, col_idx in piece.cells:
+        r = grid_row + row_idx
+        c = grid_col + col_idx
+        if r < 0 or r >= BLOCKBLAST_GRID_SIZE or c < 0 or c >= BLOCKBLAST_GRID_SIZE:
+            return False
+        if grid[r][c] != 0:
+            return False
+    return True
+
+def run_blockblast_benchmark(boards=200, seed=1):
+    """거의 꽉 찬 보드에서 칸 단위 스캔과 비트마스크의 "어디든 놓을 수 있나" 판정 속도 비교"""
+    boards = int(boards)
+    rng = random.Random(int(seed))
+    size = BLOCKBLAST_GRID_SIZE
+    pieces = [BlockBlastPiece(shape) for shape in BLOCKBLAST_SHAPES]
+    games = []
+    for _ in range(boards):
+        game = BlockBlast()
+        density = rng.uniform(0.8, 0.95)
+        for r in range(size):
+            for c in range(size):
+                if rng.random() < density:
+                    game.fill_cell(r, c, BLOCKBLAST_COLORS[0])
+        games.append(game)
+
+    def scan(game, piece):
+        """예전 can_place_anywhere: 64개 원점마다 칸 단위 판정"""
+        for r in range(size):
+            for c in range(size):
+                if _blockblast_fits(game.grid, piece, r, c):
+                    return True
+        return False
+
+    def mask(game, piece):
+        return game.free_origins(piece) != 0
+
+    results = {}
+    timings = {}
+    for name, fits in (('칸 스캔', scan), ('비트마스크', mask)):
+        start = time.perf_counter()
+        results[name] = [fits(game, piece) for game in games for piece in pieces]
+        timings[name] = (time.perf_counter() - start) / len(results[name]) * 1e6
+    fit = sum(results['비트마스크'])
+    print(f"보드 {boards}개 (80~95% 참) x 블록 {len(pieces)}종, 놓을 수 있음 {fit}/{len(results['칸 스캔'])}")
+    for name, us in timings.items():
+        print(f"  {name}: {us:.2f}us/판정")
+    print(f"{timings['칸 스캔'] / timings['비트마스크']:.0f}배 빠름, "
+          f"두 방식 결과 일치: {'OK' if results['칸 스캔'] == results['비트마스크'] else 'FAIL'}")
+    return results['칸 스캔'] == results['비트마스크']
+
+def run_blockblast_odds(score=None, samples=200000, seed=1):
+    """블록 출현 확률표 출력 (가중치 파일 반영), 뽑기 결과가 확률과 맞는지 확인
+
+    score를 주면 그 점수 구간만, 아니면 모든 구간을 출력한다.
+    예: python 학교게임(테트리스멀티).py --blockblast-odds 500
+    """
+    samples = int(samples)
+    random.seed(int(seed))
+    BlockBlastSampler.reload()
+    print(f"가중치 ({BlockBlastSampler.source}): {BlockBlastSampler.weights}")
+    group_of = {id(shape): group for group, shapes in BLOCKBLAST_SHAPE_GROUPS.items() for shape in shapes}
+
+    only = None if score is None else BlockBlastSampler.bracket(int(score))[0]
+    worst = worst_sigma = 0.0
+    lower = 0
+    for limit, _, _ in BlockBlastSampler.brackets:
+        if score is None or limit == only:
+            print(f"\n점수 {lower} ~ {'' if limit is None else limit - 1}:")
+            odds = BlockBlastSampler.probabilities(lower)
+            counts = {}
+            for _ in range(samples):
+                shape = BlockBlastSampler.pick(lower)
+                counts[id(shape)] = counts.get(id(shape), 0) + 1
+            for shape, p in odds:
+                drawn = counts.get(id(shape), 0) / samples
+                worst = max(worst, abs(drawn - p))
+                if 0 < p < 1:
+                    worst_sigma = max(worst_sigma, abs(drawn - p) / math.sqrt(p * (1 - p) / samples))
+                picture = '/'.join(''.join('■' if cell else '□' for cell in row) for row in shape)
+                print(f"  {group_of[id(shape)]:6s} {p * 100:5.2f}%  (뽑기 {drawn * 100:5.2f}%)  {picture}")
+        if limit is not None:
+            lower = limit
+
+    # 예전처럼 뽑을 때마다 목록을 곱해서 만들 때와 비교 (최후반 구간)
+    def rebuild():
+        return [shape for group, shapes in BLOCKBLAST_SHAPE_GROUPS.items()
+                for shape in shapes * BLOCKBLAST_WEIGHTS[group]]
+    start = time.perf_counter()
+    for _ in range(samples):
+        random.choice(rebuild())
+    old_us = (time.perf_counter() - start) / samples * 1e6
+    start = time.perf_counter()
+    for _ in range(samples):
+        BlockBlastSampler.pick(700)
+    new_us = (time.perf_counter() - start) / samples * 1e6
+    print(f"\n뽑기 1회: 목록 다시 만들기 {old_us:.2f}us → 뽑기표 {new_us:.2f}us")
+    print(f"확률과 뽑기 결과의 최대 차이: {worst * 100:.2f}%p (표준오차의 {worst_sigma:.1f}배)")
+    return worst_sigma < 5
+
+def run_blockblast_test(games=200, seed=1):
+    """블록블라스트 채움 카운터/비트마스크 확인: 무작위로 두면서 (애니메이션 도중에도) 전체 스캔 결과와 비교"""
+    games, seed = int(games), int(seed)
+    random.seed(seed)
+    size = BLOCKBLAST_GRID_SIZE
+    placements = clears = perfects = errors = 0
+    for _ in range(games):
+        game = BlockBlast()
+        for _ in range(200):
+            piece = BlockBlastPiece(random.choice(BLOCKBLAST_SHAPES))
+            spots = [(r, c) for r in range(-1, size) for c in range(-1, size)
+                     if _blockblast_fits(game.grid, piece, r, c)]
+            if ([(r, c) for r in range(-1, size) for c in range(-1, size) if game.can_place(piece, r, c)] != spots
+                    or game.can_place_anywhere(piece) != bool(spots)
+                    or game.free_origins(piece) != sum(1 << (r * size + c) for r, c in spots)):
+                errors += 1
+            if not spots:
+                break
+            game.place_piece(piece, *random.choice(spots))
+            placements += 1
+
+            full_rows = [r for r in range(size) if all(game.grid[r])]
+            full_cols = [c for c in range(size) if all(game.grid[r][c] for r in range(size))]
+            if (full_rows or full_cols) and (game.clearing_rows, game.clearing_cols) != (full_rows, full_cols):
+                errors += 1
+            clears += bool(full_rows or full_cols)
+
+            # 가끔은 제거 애니메이션 도중에 다음 블록을 둠
+            for _ in range(random.choice((0, 10, 30))):
+                had_lines = game.clear_animation_timer == 1
+                game.update_animation()
+                perfects += had_lines and game.perfect_display_timer == 180
+            if (game.row_fill != [sum(1 for v in row if v) for row in game.grid]
+                    or game.col_fill != [sum(1 for r in range(size) if game.grid[r][c]) for c in range(size)]
+                    or game.filled != sum(game.row_fill)
+                    or game.mask != sum(1 << (r * size + c) for r in range(size) for c in range(size)
+                                        if game.grid[r][c])):
+                errors += 1
+        PARTICLE_SYSTEM.clear()
+        FLOATING_TEXT_SYSTEM.clear()
+    print(f"{games}판, 배치 {placements}번, 줄 제거 {clears}번, PERFECT {perfects}번")
+    print(f"전체 스캔과 다른 결과: {errors}")
+    return errors == 0
+
 # ==================== 메인 ====================
 def main():
     current_game = MENU
@@ -4119,8 +8063,7 @@ def main():
         GAME_TETRIS: run_tetris,
         GAME_BLOCKBLAST: run_blockblast,
         LEADERBOARD: run_leaderboard,
-        
-        
+        GAME_TETRIS_MULTI: run_tetris_multiplayer,
     }
     
     while True:
@@ -4136,5 +8079,36 @@ def main():
     pygame.quit()
     sys.exit()
 
+# 개발용 명령 (예: python 학교게임(테트리스멀티).py --bench-sync)
+DEV_COMMANDS = {
+    '--net-test': run_network_loopback_test,
+    '--bench-protocol': run_protocol_benchmark,
+    '--bench-sync': run_sync_benchmark,
+    '--lockstep-test': run_lockstep_test,
+    '--attack-test': run_attack_test,
+    '--bench-tetris': run_tetris_benchmark,
+    '--bench-bitboard': run_bitboard_benchmark,
+    '--rotation-test': run_rotation_test,
+    '--bench-drop': run_drop_benchmark,
+    '--bench-render': run_render_benchmark,
+    '--bench-text': run_text_benchmark,
+    '--bench-particles': run_particle_benchmark,
+    '--bench-floating-text': run_floating_text_benchmark,
+    '--bench-idle': run_idle_benchmark,
+    '--bench-2048': run_2048_benchmark,
+    '--autoplay-2048': run_2048_autoplay,
+    '--bench-breakout': run_breakout_benchmark,
+    '--breakout-test': run_breakout_collision_test,
+    '--bench-blockblast': run_blockblast_benchmark,
+    '--blockblast-test': run_blockblast_test,
+    '--blockblast-odds': run_blockblast_odds,
+    '--bot-match': run_bot_match,
+}
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] in DEV_COMMANDS:
+        ok = DEV_COMMANDS[sys.argv[1]](*sys.argv[2:])
+        pygame.quit()
+        sys.exit(1 if ok is False else 0)
+    else:
+        main()